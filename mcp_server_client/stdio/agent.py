@@ -1,12 +1,17 @@
 # Generic Stdio MCP Client Agent
 import os
 import sys
+import glob
+import json
+import time
 import asyncio
 from dotenv import load_dotenv
 from google.genai import types
 
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.runners import InMemoryRunner
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
 from google.adk.tools.mcp_tool.mcp_toolset import (
     MCPToolset,
     StdioConnectionParams,
@@ -69,34 +74,265 @@ ACTIVE_SERVERS = [
     }
 ]
 
-# --- 3. TOOLSET INITIALIZATION ---
-def initialize_tools():
-    mcp_tools = []
-    for srv in ACTIVE_SERVERS:
-        if srv.get("enabled", False):
-            print(f"[*] Initializing {srv['name']} server...")
-            mcp_tools.append(
-                MCPToolset(
-                    connection_params=StdioConnectionParams(
-                        server_params=StdioServerParameters(
-                            command=srv["command"],
-                            args=[srv["path"]],
-                        ),
-                        timeout=30 # Increase timeout for tool execution
-                    ),
-                    errlog=sys.stderr
-                )
+# Startup Mode
+# Eager (default): all enabled servers start concurrently before the first prompt.
+# Lazy (MCP_LAZY_SERVERS=1): a server whose tool declarations are cached from an
+# earlier run starts only when the model first calls one of its tools.
+LAZY_SERVERS = os.getenv("MCP_LAZY_SERVERS", "0") == "1"
+STARTUP_TIMEOUT = float(os.getenv("MCP_SERVER_STARTUP_TIMEOUT", "60"))
+DECLARATION_CACHE = os.getenv("MCP_TOOL_DECLARATION_CACHE") or os.path.join(
+    os.path.expanduser("~"), ".cache", "mcp_server_client", "stdio_tool_declarations.json"
+)
+
+# --- 3. SERVER STARTUP ---
+class ManagedServer:
+    """One stdio server and its MCPToolset, owned by a dedicated task.
+
+    The stdio client's task group must be entered and exited by the same task,
+    so the owner task both opens the session (via get_tools) and closes the
+    toolset on stop(). Tool calls from other tasks reuse the open session.
+    """
+
+    def __init__(self, srv):
+        self.name = srv["name"]
+        self.path = srv["path"]
+        self.toolset = MCPToolset(
+            connection_params=StdioConnectionParams(
+                server_params=StdioServerParameters(
+                    command=srv["command"],
+                    args=[srv["path"]],
+                ),
+                timeout=30 # Increase timeout for tool execution
+            ),
+            errlog=sys.stderr
+        )
+        self.tools = {}
+        self.startup_seconds = None
+        self._ready = None
+        self._task = None
+        self._stop = asyncio.Event()
+
+    @property
+    def started(self):
+        return self._ready is not None and self._ready.done() and not self._ready.exception()
+
+    async def start(self, timeout=STARTUP_TIMEOUT):
+        """Start the server (once) and return its tools.
+
+        A startup that fails or takes longer than timeout is torn down, so the
+        next call starts the server afresh instead of waiting on it.
+        """
+        if self._ready is None:
+            self._ready = asyncio.get_running_loop().create_future()
+            self._task = asyncio.create_task(self._own(self._ready), name=f"mcp-{self.name}")
+        ready, task = self._ready, self._task
+        try:
+            return await asyncio.wait_for(asyncio.shield(ready), timeout)
+        except asyncio.TimeoutError:
+            if ready.done():
+                raise
+            error = TimeoutError(f"{self.name} did not start within {timeout:g}s")
+            ready.set_exception(error)
+            ready.exception()  # Raised here; other waiters still see it.
+            task.cancel()
+            await asyncio.wait({task})
+            raise error from None
+
+    async def _own(self, ready):
+        started = time.perf_counter()
+        try:
+            tools = await self.toolset.get_tools()
+        except BaseException as e:
+            # The stdio client must be exited by the task that entered it, so
+            # close the half-open session here before a later start() retries.
+            await self._close()
+            if self._ready is ready:
+                self._ready = self._task = None
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else RuntimeError(f"{self.name} startup cancelled"))
+            if isinstance(e, Exception):
+                return
+            raise
+        self.startup_seconds = time.perf_counter() - started
+        self.tools = {t.name: t for t in tools}
+        save_declarations(self, tools)
+        ready.set_result(tools)
+        try:
+            await self._stop.wait()
+        finally:
+            await self._close()
+
+    async def _close(self):
+        try:
+            await self.toolset.close()
+        except Exception as e:
+            print(f"[!] Error closing {self.name}: {e}")
+
+    async def tool(self, name):
+        """The live tool for name, starting the server on first use."""
+        if not self.started:
+            print(f"\n[*] Starting {self.name} server for {name}...")
+            await self.start()
+            print(f"[*] {self.name} ready in {self.startup_seconds:.2f}s")
+        if name not in self.tools:
+            # The cache now holds the live declarations, so the next run is correct.
+            raise RuntimeError(
+                f"{self.name} server no longer provides tool {name!r}; its cached declaration was stale"
             )
+        return self.tools[name]
+
+    async def stop(self):
+        if self._task is not None:
+            self._stop.set()
+            try:
+                await self._task
+            except Exception as e:
+                print(f"[!] Error stopping {self.name}: {e}")
+
+
+def _server_signature(path):
+    # The server script and its tool modules; any change invalidates the cache.
+    files = [path] + sorted(glob.glob(os.path.join(os.path.dirname(path), "tool_modules", "*.py")))
+    signature = []
+    for f in files:
+        try:
+            st = os.stat(f)
+        except OSError:
+            continue
+        signature.append([os.path.basename(f), st.st_mtime_ns, st.st_size])
+    return signature
+
+
+def _load_declaration_cache():
+    try:
+        with open(DECLARATION_CACHE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_declarations(server):
+    """Tool declarations recorded for this server, if its files are unchanged."""
+    entry = _load_declaration_cache().get(server.name)
+    if not entry or entry.get("path") != server.path or entry.get("signature") != _server_signature(server.path):
+        return None
+    try:
+        return [types.FunctionDeclaration.model_validate(d) for d in entry["tools"]]
+    except ValueError:
+        return None
+
+
+def save_declarations(server, tools):
+    try:
+        declarations = [t._get_declaration().model_dump(mode="json", exclude_none=True) for t in tools]
+    except Exception as e:
+        print(f"[!] Not caching {server.name} tool declarations: {e}")
+        return
+    cache = _load_declaration_cache()
+    cache[server.name] = {
+        "path": server.path,
+        "signature": _server_signature(server.path),
+        "tools": declarations,
+    }
+    try:
+        os.makedirs(os.path.dirname(DECLARATION_CACHE), exist_ok=True)
+        with open(DECLARATION_CACHE, "w") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"[!] Could not write {DECLARATION_CACHE}: {e}")
+
+
+class DeferredTool(BaseTool):
+    """Stands in for a server's tool from its cached declaration until first call."""
+
+    def __init__(self, server, declaration):
+        super().__init__(name=declaration.name, description=declaration.description or "")
+        self._server = server
+        self._declaration = declaration
+
+    def _get_declaration(self):
+        return self._declaration
+
+    async def run_async(self, *, args, tool_context):
+        tool = await self._server.tool(self.name)
+        return await tool.run_async(args=args, tool_context=tool_context)
+
+
+class DeferredToolset(BaseToolset):
+    """Cached declarations of a server that has not started; its live tools once it has."""
+
+    def __init__(self, server, declarations):
+        super().__init__()
+        self.server = server
+        self._deferred = [DeferredTool(server, d) for d in declarations]
+
+    async def get_tools(self, readonly_context=None):
+        if self.server.started:
+            return list(self.server.tools.values())
+        return list(self._deferred)
+
+    async def close(self):
+        await self.server.stop()
+
+
+def initialize_servers():
+    return [ManagedServer(srv) for srv in ACTIVE_SERVERS if srv.get("enabled", False)]
+
+
+async def start_servers(servers):
+    """Start servers concurrently, printing each one's startup time."""
+    if not servers:
+        return
+    started = time.perf_counter()
+
+    async def start(server):
+        print(f"[*] Initializing {server.name} server...")
+        try:
+            tools = await server.start()
+        except Exception as e:
+            print(f"[!] {server.name} failed to start: {e!r}")
+            return
+        print(f"[*] {server.name} ready in {server.startup_seconds:.2f}s ({len(tools)} tools)")
+
+    await asyncio.gather(*(start(server) for server in servers))
+    total = sum(server.startup_seconds or 0 for server in servers)
+    print(
+        f"[*] Started {len(servers)} servers in {time.perf_counter() - started:.2f}s "
+        f"(one after another: {total:.2f}s)"
+    )
+
+
+async def stop_servers(servers):
+    await asyncio.gather(*(server.stop() for server in servers))
+
+
+# --- 4. TOOLSET INITIALIZATION ---
+def initialize_tools(servers):
+    """One toolset per server; in lazy mode, cached servers get a DeferredToolset."""
+    mcp_tools = []
+    for server in servers:
+        declarations = cached_declarations(server) if LAZY_SERVERS else None
+        if declarations is None:
+            mcp_tools.append(server.toolset)
+        else:
+            print(f"[*] {server.name}: deferred until first use ({len(declarations)} cached tools)")
+            mcp_tools.append(DeferredToolset(server, declarations))
     return mcp_tools
 
-# --- 4. AGENT INITIALIZATION ---
+
+def servers_to_start(servers, tools):
+    """Servers that must start up front: all but the deferred ones."""
+    deferred = {t.server for t in tools if isinstance(t, DeferredToolset)}
+    return [server for server in servers if server not in deferred]
+
+# --- 5. AGENT INITIALIZATION ---
 # We use a lazy initialization pattern to avoid execution on import
-def create_agent():
+def create_agent(servers=None):
     return LlmAgent(
         model=MODEL,
         name=AGENT_NAME,
         instruction=AGENT_INSTRUCTION,
-        tools=initialize_tools(),
+        tools=initialize_tools(servers if servers is not None else initialize_servers()),
     )
 
 if __name__ == "__main__":
@@ -105,7 +341,8 @@ if __name__ == "__main__":
     
     # Initialize agent only when running directly
     print("[*] Setting up agent and connection to servers...")
-    root_agent = create_agent()
+    servers = initialize_servers()
+    root_agent = create_agent(servers)
     
     # Use InMemoryRunner for a simple CLI experience
     runner = InMemoryRunner(agent=root_agent)
@@ -122,7 +359,9 @@ if __name__ == "__main__":
                 user_id=user_id,
                 session_id=session_id
             )
-            
+
+            await start_servers(servers_to_start(servers, root_agent.tools))
+
             # Debug: List available tools
             all_tools = await root_agent.canonical_tools()
             print(f"[*] Total tools available: {len(all_tools)}")
@@ -222,8 +461,10 @@ if __name__ == "__main__":
                 except Exception as e:
                     print(f"\n[Error] {str(e)}\n")
         finally:
-            # Proper cleanup of MCP connections inside the same loop
+            # Proper cleanup of MCP connections inside the same loop; each
+            # server is stopped by the task that started it.
             print("[*] Closing server connections...")
+            await stop_servers(servers)
             await runner.close()
 
     # Run everything in a single async block
@@ -0,0 +1,160 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from google.genai import types
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+try:
+    from mcp_server_client.stdio import agent
+except ImportError as e:  # google-adk without StdioConnectionParams
+    pytest.skip(f"agent needs a newer google-adk: {e}", allow_module_level=True)
+
+
+class _Tool:
+    def __init__(self, name):
+        self.name = name
+
+    def _get_declaration(self):
+        return types.FunctionDeclaration(name=self.name, description=f"{self.name} tool")
+
+    async def run_async(self, *, args, tool_context):
+        return {"tool": self.name, "args": args}
+
+
+class _Toolset:
+    """Stands in for MCPToolset; records which task opened and closed it."""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.mode = "ok"
+        self.delay = 0
+        self.opened = []
+        self.closed = []
+        _Toolset.instances.append(self)
+
+    async def get_tools(self, readonly_context=None):
+        self.opened.append(asyncio.current_task())
+        await asyncio.sleep(self.delay)
+        if self.mode == "fail":
+            raise OSError("server exited")
+        if self.mode == "hang":
+            await asyncio.sleep(3600)
+        return [_Tool("speak")]
+
+    async def close(self):
+        self.closed.append(asyncio.current_task())
+
+
+@pytest.fixture
+def make_server(monkeypatch, tmp_path):
+    monkeypatch.setattr(agent, "MCPToolset", _Toolset)
+    monkeypatch.setattr(agent, "StdioConnectionParams", lambda **kwargs: None)
+    monkeypatch.setattr(agent, "DECLARATION_CACHE", str(tmp_path / "cache" / "declarations.json"))
+    script = tmp_path / "server.py"
+    script.write_text("# server\n")
+
+    def make(name="tts"):
+        return agent.ManagedServer({"name": name, "path": str(script), "command": sys.executable})
+
+    return make
+
+
+def test_failed_startup_is_closed_and_retried(make_server):
+    async def scenario():
+        server = make_server()
+        server.toolset.mode = "fail"
+        with pytest.raises(OSError):
+            await server.start()
+        assert server.toolset.closed == server.toolset.opened
+        assert not server.started
+
+        server.toolset.mode = "ok"
+        assert [t.name for t in await server.start()] == ["speak"]
+        await server.stop()
+        assert len(server.toolset.opened) == 2 and len(server.toolset.closed) == 2
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_startup_is_torn_down(make_server):
+    async def scenario():
+        server = make_server()
+        server.toolset.mode = "hang"
+        waiters = [asyncio.create_task(server.start(timeout=0.1)) for _ in range(2)]
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, TimeoutError) for r in results)
+        # Both waiters shared one startup, which was closed by its own task.
+        assert len(server.toolset.opened) == 1
+        assert server.toolset.closed == server.toolset.opened
+
+        server.toolset.mode = "ok"
+        assert (await server.tool("speak")).name == "speak"
+        await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_servers_start_concurrently_and_a_failure_does_not_block(make_server):
+    async def scenario():
+        servers = [make_server(f"s{i}") for i in range(3)]
+        for server in servers:
+            server.toolset.delay = 0.2
+        servers[0].toolset.mode = "fail"
+
+        started = time.perf_counter()
+        await agent.start_servers(servers)
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.4
+        assert [s.started for s in servers] == [False, True, True]
+        await agent.stop_servers(servers)
+        for server in servers[1:]:
+            assert server.toolset.closed == server.toolset.opened
+
+    asyncio.run(scenario())
+
+
+def test_lazy_server_starts_on_first_call_from_cached_declarations(make_server, monkeypatch):
+    async def scenario():
+        first = make_server()
+        await first.start()
+        await first.stop()
+
+        monkeypatch.setattr(agent, "LAZY_SERVERS", True)
+        server = make_server()
+        (toolset,) = agent.initialize_tools([server])
+        assert isinstance(toolset, agent.DeferredToolset)
+        assert agent.servers_to_start([server], [toolset]) == []
+
+        (deferred,) = await toolset.get_tools()
+        assert deferred._get_declaration().name == "speak"
+        assert server.toolset.opened == []
+
+        result = await deferred.run_async(args={"text": "hi"}, tool_context=None)
+        assert result == {"tool": "speak", "args": {"text": "hi"}}
+        assert len(server.toolset.opened) == 1
+        assert [t.name for t in await toolset.get_tools()] == ["speak"]
+        await toolset.close()
+        assert server.toolset.closed == server.toolset.opened
+
+    asyncio.run(scenario())
+
+
+def test_changed_server_script_invalidates_cached_declarations(make_server):
+    async def scenario():
+        server = make_server()
+        await server.start()
+        await server.stop()
+        assert [d.name for d in agent.cached_declarations(server)] == ["speak"]
+
+        Path(server.path).write_text("# server, edited\n")
+        assert agent.cached_declarations(server) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,142 @@
+"""Compare search_files with the trigram index against a plain walk-and-read search.
+
+Generates a synthetic source tree (default 100k files of ~1-2 KB of
+identifier soup, with a few planted rare tokens), builds the index cold, then
+reports refresh times with nothing changed and after touching 1% of the
+files, and per-query latency for literal, regex and glob searches with and
+without the index. Both modes must return the same matches.
+
+Usage:
+    python mcp_servers/common/benchmarks/search_index_benchmark.py --files 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+VOCABULARY = (
+    "def class return import from self None True False if else for while with as "
+    "try except raise yield lambda async await print len range dict list set tuple "
+    "value result index count items key name path data config request response "
+    "client server handler buffer cache stream token parser builder manager"
+).split()
+EXTENSIONS = (".py", ".ts", ".go", ".md", ".txt")
+RARE_TOKENS = ("zebra_quokka_marker", "NEEDLE_4242", "fooBarBazSentinel")
+
+QUERIES = [
+    ("rare literal", {"query": "zebra_quokka_marker"}),
+    ("rare literal, case-insensitive", {"query": "needle_4242", "case_sensitive": False}),
+    ("rare regex", {"query": r"fooBar\w+Sentinel", "regex": True}),
+    ("rare literal, glob *.py", {"query": "NEEDLE_4242", "glob": "*.py"}),
+    ("common literal, 100 results", {"query": "response handler"}),
+    ("regex without literals", {"query": r"\d{5}", "regex": True, "max_results": 10}),
+]
+
+
+def _write_tree(root: Path, files: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    per_directory = 100
+    for number in range(files):
+        directory = root / f"pkg{number // (per_directory * 50)}" / f"mod{number // per_directory}"
+        if number % per_directory == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for _ in range(rng.randint(20, 40)):
+            words = rng.choices(VOCABULARY, k=rng.randint(3, 8))
+            words.append(f"{rng.choice(VOCABULARY)}_{rng.randint(0, 999)}")
+            lines.append(" ".join(words))
+        if number % 9973 == 0:
+            lines.insert(rng.randrange(len(lines)), " ".join(RARE_TOKENS))
+        (directory / f"file{number}{rng.choice(EXTENSIONS)}").write_text("\n".join(lines) + "\n")
+
+
+def _timed(func, repeats):
+    latencies, result = [], None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - started)
+    return result, latencies
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:9.1f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5, help="indexed runs per query")
+    parser.add_argument("--walk-repeats", type=int, default=1, help="walk runs per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "tree"
+        started = time.perf_counter()
+        _write_tree(root, args.files)
+        print(f"wrote {args.files} files in {time.perf_counter() - started:.1f} s")
+
+        os.environ["MCP_FS_ROOT"] = str(root)
+        os.environ["MCP_FS_INDEX_PATH"] = str(Path(tmp) / "index.sqlite3")
+        sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+        import filesystem_tools
+        from trigram_index import TrigramIndex
+
+        index = TrigramIndex(
+            root,
+            os.environ["MCP_FS_INDEX_PATH"],
+            # Query timings below exclude refreshes, which run in the background.
+            refresh_interval=3600,
+            skip_dirs=filesystem_tools.SKIP_DIRS,
+            max_file_bytes=filesystem_tools.MAX_SEARCH_FILE_BYTES,
+        )
+        filesystem_tools._search_index = index
+        started = time.perf_counter()
+        index.refresh(force=True)
+        build = time.perf_counter() - started
+        stats = index.stats()
+        index_bytes = sum(os.path.getsize(path) for path in Path(tmp).glob("index.sqlite3*"))
+        print(
+            f"cold build: {build:.1f} s, {stats['trigrams']} trigrams, "
+            f"{stats['postings']} postings, {index_bytes / 1e6:.1f} MB on disk"
+        )
+
+        _, latencies = _timed(lambda: index.refresh(force=True), 3)
+        print(f"refresh, nothing changed:      {_ms(statistics.median(latencies))}")
+        touched = sorted(root.rglob("file*"))[::100]
+        for path in touched:
+            with open(path, "a") as f:
+                f.write("appended line\n")
+        _, latencies = _timed(lambda: index.refresh(force=True), 1)
+        print(f"refresh, {len(touched)} files changed: {_ms(latencies[0])}")
+        _, latencies = _timed(index.compact, 1)
+        print(f"compaction to one segment:     {_ms(latencies[0])}")
+
+        print(f"\n{'query':<34} {'walk':>12} {'indexed p50':>12} {'files read (walk/index)':>26}")
+        for label, params in QUERIES:
+            filesystem_tools.SEARCH_INDEX = False
+            walked, walk_latencies = _timed(lambda: filesystem_tools.search_files(**params), args.walk_repeats)
+            filesystem_tools.SEARCH_INDEX = True
+            indexed, index_latencies = _timed(lambda: filesystem_tools.search_files(**params), args.repeats)
+            if not params.get("max_results"):
+                key = lambda match: (match["path"], match["line"])
+                if walked["truncated"] or indexed["truncated"]:
+                    assert len(walked["matches"]) == len(indexed["matches"]), label
+                else:
+                    assert sorted(walked["matches"], key=key) == sorted(indexed["matches"], key=key), label
+            print(
+                f"{label:<34} {_ms(statistics.median(walk_latencies))} "
+                f"{_ms(statistics.median(index_latencies))} "
+                f"{walked['files_scanned']:>14}/{indexed['files_scanned']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Memory-bounded LRU cache of file contents and directory listings.
+
+Entries are stored with the (mtime_ns, size, inode) of the path they came
+from. A lookup passes the path's current values from a fresh ``os.stat``, and
+an entry that no longer matches is dropped, so edits, truncations and
+replace-by-rename are never served stale.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+def stat_signature(st: os.stat_result) -> tuple:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class StatCache:
+    """LRU mapping of key -> value under a byte budget, validated by stat signature.
+
+    Values larger than ``max_entry_bytes`` are not cached, so one big file
+    cannot flush everything else.
+    """
+
+    def __init__(self, max_bytes, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 8 if max_entry_bytes is None else max_entry_bytes
+        self._entries = OrderedDict()  # key -> (signature, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.bytes_served = 0
+
+    def get(self, key, signature):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != signature:
+                del self._entries[key]
+                self._bytes -= entry[2]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.bytes_served += entry[2]
+            return entry[1]
+
+    def put(self, key, signature, value, size):
+        if size > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (signature, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "bytes_served": self.bytes_served,
+            }
@@ -0,0 +1,809 @@
+"""Filesystem tools shared by the SSE and streamable-HTTP filesystem servers.
+
+Both servers put this directory on ``sys.path`` and call
+``register_filesystem_tools`` on their FastMCP instance, so the tool set and
+its limits stay identical across transports.
+"""
+
+import base64
+import binascii
+import fnmatch
+import functools
+import hashlib
+import json
+import mmap
+import os
+import re
+import stat as stat_module
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import anyio.to_thread
+import pydantic_core
+
+from file_cache import StatCache, stat_signature
+from result_store import ResultStore
+from tool_metrics import ToolMetrics, add_metrics_route, instrument_fastmcp
+from trigram_index import TrigramIndex, query_trigrams, regex_literals
+
+# Upper bound on the bytes of file content one read_file response carries;
+# larger reads stop there and hand back a cursor.
+MAX_RESPONSE_BYTES = int(os.environ.get("MCP_FS_MAX_RESPONSE_BYTES", str(1024 * 1024)))
+BINARY_SNIFF_BYTES = 8192
+
+READ_ENCODINGS = ("auto", "text", "base64")
+
+# Directory that directory_tree and search_files start from by default.
+ROOT = Path(os.environ.get("MCP_FS_ROOT") or os.getcwd()).resolve()
+READ_WORKERS = int(os.environ.get("MCP_FS_READ_WORKERS", "8"))
+MAX_TREE_ENTRIES = 10000
+# search_files skips larger files and these directory names.
+MAX_SEARCH_FILE_BYTES = int(os.environ.get("MCP_FS_MAX_SEARCH_FILE_BYTES", str(4 * 1024 * 1024)))
+SKIP_DIRS = frozenset({".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv"})
+MAX_MATCH_LINE_CHARS = 500
+VERIFY_BATCH = 32
+# search_files narrows candidates with a trigram index over MCP_FS_ROOT, kept
+# in MCP_FS_INDEX_PATH; MCP_FS_SEARCH_INDEX=0 searches by walking instead.
+SEARCH_INDEX = os.environ.get("MCP_FS_SEARCH_INDEX", "1") != "0"
+INDEX_PATH = os.environ.get("MCP_FS_INDEX_PATH") or os.path.join(
+    os.path.expanduser("~"),
+    ".cache",
+    "mcp_fs",
+    f"{hashlib.sha1(str(ROOT).encode('utf-8')).hexdigest()[:16]}.sqlite3",
+)
+INDEX_REFRESH_SECONDS = float(os.environ.get("MCP_FS_INDEX_REFRESH_SECONDS", "10"))
+
+# read_file content and list_directory results are cached up to this many
+# bytes (0 disables), each entry checked against a fresh stat before use.
+CACHE_BYTES = int(os.environ.get("MCP_FS_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Files larger than this are always read through mmap and never cached.
+CACHE_MAX_FILE_BYTES = int(os.environ.get("MCP_FS_CACHE_MAX_FILE_BYTES", str(CACHE_BYTES // 8)))
+
+# Tool results whose JSON exceeds MCP_FS_SPILL_BYTES (0 disables) are stored
+# in MCP_FS_SPILL_DIR and replaced by a small stub naming an fs-result://
+# resource, which read_result serves in ranges. read_file and
+# read_multiple_files are exempt: they page with their own cursors, capped at
+# MCP_FS_MAX_RESPONSE_BYTES.
+SPILL_BYTES = int(os.environ.get("MCP_FS_SPILL_BYTES", str(256 * 1024)))
+SPILL_DIR = os.environ.get("MCP_FS_SPILL_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "mcp_fs", "results")
+SPILL_TTL_SECONDS = float(os.environ.get("MCP_FS_SPILL_TTL_SECONDS", "3600"))
+RESULT_URI_PREFIX = "fs-result://"
+MAX_SUMMARY_CHARS = 200
+
+_cache = StatCache(CACHE_BYTES, CACHE_MAX_FILE_BYTES) if CACHE_BYTES > 0 else None
+_read_pool = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="fs-read")
+_search_index = None
+_search_index_lock = threading.Lock()
+_result_store = None
+_result_store_lock = threading.Lock()
+metrics = ToolMetrics()
+
+
+def _encode_cursor(state: dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, key: str = "offset") -> dict[str, Any]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error) as exc:
+        raise ValueError(f"Invalid cursor: {exc}") from None
+    if not isinstance(state, dict) or key not in state:
+        raise ValueError("Invalid cursor")
+    return state
+
+
+def _utf8_boundary(data: Union[bytes, mmap.mmap], start: int, end: int) -> int:
+    """Move ``end`` back so it does not split a UTF-8 sequence."""
+    cut = end
+    while cut > start and cut < len(data) and (data[cut] & 0xC0) == 0x80:
+        cut -= 1
+    return cut if cut > start else end
+
+
+def _looks_binary(view: Union[bytes, mmap.mmap], size: int) -> bool:
+    return b"\0" in view[: min(size, BINARY_SNIFF_BYTES)]
+
+
+def _line_offset(
+    view: Union[bytes, mmap.mmap], size: int, line: int, start: int = 0, start_line: int = 1
+) -> int:
+    """Byte offset where 1-based ``line`` begins, scanning from (start, start_line)."""
+    position = start
+    for _ in range(line - start_line):
+        newline = view.find(b"\n", position)
+        if newline == -1:
+            return size
+        position = newline + 1
+    return position
+
+
+def _read_range(
+    view: Union[bytes, mmap.mmap],
+    size: int,
+    *,
+    offset: int,
+    length: Optional[int],
+    line: Optional[int],
+    end_line: Optional[int],
+    max_bytes: int,
+) -> tuple[int, bool]:
+    """Pick the end of [offset, stop) for one response.
+
+    Returns (stop, whether the requested range ends there rather than at the
+    byte cap).
+    """
+    if line is not None and end_line is not None:
+        # Stop after end_line, at the newline that closes it.
+        range_end = _line_offset(view, size, end_line + 1, offset, line)
+    elif length is not None:
+        range_end = min(size, offset + length)
+    else:
+        range_end = size
+
+    stop = min(range_end, offset + max_bytes)
+    complete = stop >= range_end
+    if not complete and line is not None:
+        # Prefer to cut after a whole line when one fits.
+        newline = view.rfind(b"\n", offset, stop)
+        if newline != -1:
+            stop = newline + 1
+    return stop, complete
+
+
+@contextmanager
+def _file_view(path: Path):
+    """Yield (stat, content) for ``path``: cached bytes while the stat matches, else an mmap."""
+    key = ("file", os.path.abspath(path))
+    if _cache is not None:
+        st = os.stat(path)
+        data = _cache.get(key, stat_signature(st))
+        if data is not None:
+            yield st, data
+            return
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not st.st_size:
+            # mmap cannot map empty files.
+            if _cache is not None:
+                _cache.put(key, stat_signature(st), b"", 0)
+            yield st, b""
+            return
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if _cache is not None and st.st_size <= _cache.max_entry_bytes:
+                data = bytes(view)
+                # Signed with the descriptor's stat, so a concurrent rewrite is caught next time.
+                _cache.put(key, stat_signature(st), data, len(data))
+                yield st, data
+            else:
+                yield st, view
+        finally:
+            view.close()
+
+
+def _read_file(
+    filepath: str,
+    offset: int = 0,
+    length: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    encoding: str = "auto",
+    cursor: Optional[str] = None,
+    max_bytes: int = MAX_RESPONSE_BYTES,
+) -> dict:
+    if encoding not in READ_ENCODINGS:
+        raise ValueError(f"encoding must be one of {', '.join(READ_ENCODINGS)}")
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError("offset and length must be non-negative")
+    if (start_line is not None and start_line < 1) or (end_line is not None and end_line < 1):
+        raise ValueError("start_line and end_line are 1-based")
+
+    path = Path(filepath)
+    with _file_view(path) as (stat, view):
+        size = len(view)
+        line = start_line
+        if cursor is not None:
+            state = _decode_cursor(cursor)
+            if state.get("mtime_ns") != stat.st_mtime_ns:
+                raise ValueError("file_changed: the file was modified since the cursor was issued")
+            offset, line, end_line = state["offset"], state.get("line"), state.get("end_line")
+            if state.get("end") is not None:
+                length = max(0, state["end"] - offset)
+        elif end_line is not None and line is None:
+            line = 1
+
+        if line is not None and cursor is None:
+            offset = _line_offset(view, size, line)
+        offset = min(offset, size)
+        stop, complete = _read_range(
+            view,
+            size,
+            offset=offset,
+            length=length,
+            line=line,
+            end_line=end_line,
+            max_bytes=max_bytes,
+        )
+
+        binary = encoding == "base64" or (encoding == "auto" and _looks_binary(view, size))
+        if not binary and not complete:
+            stop = _utf8_boundary(view, offset, stop)
+        data = bytes(view[offset:stop])
+
+    if binary:
+        content, content_encoding = base64.b64encode(data).decode("ascii"), "base64"
+    else:
+        try:
+            content = data.decode("utf-8")
+        except UnicodeDecodeError:
+            if encoding == "text":
+                content = data.decode("utf-8", errors="replace")
+                content_encoding = "utf-8"
+            else:
+                content, content_encoding = base64.b64encode(data).decode("ascii"), "base64"
+        else:
+            content_encoding = "utf-8"
+
+    result: dict[str, Any] = {
+        "path": str(path),
+        "content": content,
+        "encoding": content_encoding,
+        "offset": offset,
+        "bytes_read": len(data),
+        "file_size": size,
+        "eof": stop >= size,
+        "truncated": not complete,
+        "next_cursor": None,
+    }
+    if line is not None:
+        result["start_line"] = line
+    if not complete:
+        state = {"offset": stop, "mtime_ns": stat.st_mtime_ns}
+        if line is not None:
+            state["line"] = line + data.count(b"\n")
+            state["end_line"] = end_line
+        elif length is not None:
+            state["end"] = offset + length
+        result["next_cursor"] = _encode_cursor(state)
+    return result
+
+
+def read_file(
+    filepath: str,
+    offset: int = 0,
+    length: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    encoding: str = "auto",
+    cursor: Optional[str] = None,
+) -> Union[str, dict]:
+    """Read part or all of a file.
+
+    With only filepath, returns the file's text as a string. A file that is
+    binary or larger than MCP_FS_MAX_RESPONSE_BYTES gets the dict described
+    below instead, as does any call with a range, encoding or cursor.
+
+    Byte ranges use offset/length; line ranges use 1-based, inclusive
+    start_line/end_line. The dict carries at most MCP_FS_MAX_RESPONSE_BYTES of
+    content; when a read stops early, pass the returned next_cursor back as
+    cursor (with the same filepath) to continue. encoding "auto" returns UTF-8
+    text, or base64 when the file looks binary; "text" and "base64" force one.
+    """
+    result = _read_file(filepath, offset, length, start_line, end_line, encoding, cursor)
+    whole_file = (offset, length, start_line, end_line, encoding, cursor) == (0, None, None, None, "auto", None)
+    if whole_file and not result["truncated"] and result["encoding"] == "utf-8":
+        return result["content"]
+    return result
+
+
+def list_directory(dirpath: str) -> list:
+    """List all files and directories in the given directory."""
+    if _cache is None:
+        return os.listdir(dirpath)
+    # A directory's mtime changes whenever an entry is added, removed or renamed.
+    key = ("dir", os.path.abspath(dirpath))
+    signature = stat_signature(os.stat(dirpath))
+    names = _cache.get(key, signature)
+    if names is None:
+        names = os.listdir(dirpath)
+        _cache.put(key, signature, names, sum(len(name) + 64 for name in names))
+    return list(names)
+
+
+def get_cwd() -> str:
+    """Return the current working directory."""
+    return str(Path.cwd())
+
+
+def read_multiple_files(filepaths: list[str], max_total_bytes: Optional[int] = None) -> list:
+    """Read several files concurrently within one byte budget.
+
+    The budget (at most MCP_FS_MAX_RESPONSE_BYTES) is handed out in request
+    order, so later files may come back truncated or empty with a
+    next_cursor for read_file. Each result has read_file's fields, or "path"
+    and "error" when the file could not be read.
+    """
+    budget = MAX_RESPONSE_BYTES if max_total_bytes is None else min(max_total_bytes, MAX_RESPONSE_BYTES)
+    if budget < 0:
+        raise ValueError("max_total_bytes must be non-negative")
+
+    def size_of(filepath):
+        try:
+            return os.stat(filepath).st_size
+        except OSError:
+            # Left to the read, which reports the error.
+            return 0
+
+    allowances = []
+    for size in _read_pool.map(size_of, filepaths):
+        allowances.append(min(size, budget))
+        budget -= allowances[-1]
+
+    def read_one(filepath, allowance):
+        try:
+            return _read_file(filepath, max_bytes=allowance)
+        except (OSError, ValueError) as e:
+            return {"path": filepath, "error": str(e)}
+
+    return list(_read_pool.map(read_one, filepaths, allowances))
+
+
+def _entry_type(entry: os.DirEntry) -> str:
+    if entry.is_symlink():
+        return "symlink"
+    if entry.is_dir(follow_symlinks=False):
+        return "directory"
+    return "file" if entry.is_file(follow_symlinks=False) else "other"
+
+
+def _sorted_entries(directory: Path) -> list[os.DirEntry]:
+    with os.scandir(directory) as it:
+        return sorted(it, key=lambda entry: entry.name)
+
+
+def _walk(root: Path, max_depth: Optional[int], after: Optional[str] = None, skip_dirs=frozenset()):
+    """Yield (relative path, depth, DirEntry) in sorted pre-order, without recursion.
+
+    ``after`` resumes just past that relative path: the stack is rebuilt from
+    its ancestors instead of re-walking everything before it. Directories that
+    cannot be listed are yielded as (relative path, depth, OSError).
+    """
+    stack = []  # (relative dir, depth of its children, entries, next index)
+
+    def push(relative, depth, start_after=None):
+        try:
+            entries = _sorted_entries(root / relative)
+        except OSError as e:
+            return e
+        index = 0
+        if start_after is not None:
+            index = next((i for i, entry in enumerate(entries) if entry.name > start_after), len(entries))
+        stack.append((relative, depth, entries, index))
+        return None
+
+    if after:
+        parts = Path(after).parts
+        relative = Path()
+        for position, name in enumerate(parts):
+            if push(relative, position + 1, name) is not None:
+                break
+            # Re-enter a directory the cursor is inside of (or just emitted).
+            relative = relative / name
+            inside = position < len(parts) - 1
+            if not inside:
+                target = root / relative
+                if (
+                    target.is_dir()
+                    and not target.is_symlink()
+                    and name not in skip_dirs
+                    and (max_depth is None or position + 1 < max_depth)
+                ):
+                    push(relative, position + 2)
+            elif not (root / relative).is_dir():
+                break
+        # Frames were pushed outermost first, which is already stack order.
+    else:
+        error = push(Path(), 1)
+        if error is not None:
+            raise error
+
+    while stack:
+        relative, depth, entries, index = stack[-1]
+        if index >= len(entries):
+            stack.pop()
+            continue
+        stack[-1] = (relative, depth, entries, index + 1)
+        entry = entries[index]
+        entry_path = relative / entry.name
+        yield entry_path, depth, entry
+        if (
+            entry.is_dir(follow_symlinks=False)
+            and entry.name not in skip_dirs
+            and (max_depth is None or depth < max_depth)
+        ):
+            error = push(entry_path, depth + 1)
+            if error is not None:
+                yield entry_path, depth, error
+
+
+def directory_tree(
+    path: Optional[str] = None,
+    max_depth: int = 3,
+    max_entries: int = 1000,
+    cursor: Optional[str] = None,
+) -> dict:
+    """List a directory tree as a flat, sorted pre-order list of entries.
+
+    Each entry has "path" (relative to the tree root), "type" and "depth",
+    plus "size" for files. Descends at most max_depth levels and returns at
+    most max_entries entries (capped at 10000); when "truncated" is true, pass
+    next_cursor back as cursor, with the same path and max_depth, for the next
+    page. path defaults to MCP_FS_ROOT.
+    """
+    if max_depth < 1 or max_entries < 1:
+        raise ValueError("max_depth and max_entries must be at least 1")
+    max_entries = min(max_entries, MAX_TREE_ENTRIES)
+    root = Path(path).resolve() if path else ROOT
+    after = _decode_cursor(cursor, "after")["after"] if cursor else None
+
+    entries = []
+    walker = _walk(root, max_depth, after)
+    last = None
+    for relative, depth, entry in walker:
+        if isinstance(entry, OSError):
+            entries[-1]["error"] = str(entry)
+            continue
+        if len(entries) >= max_entries:
+            return {
+                "root": str(root),
+                "entries": entries,
+                "truncated": True,
+                "next_cursor": _encode_cursor({"after": last}),
+            }
+        item = {"path": relative.as_posix(), "type": _entry_type(entry), "depth": depth}
+        if item["type"] == "file":
+            try:
+                item["size"] = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                pass
+        entries.append(item)
+        last = item["path"]
+    return {"root": str(root), "entries": entries, "truncated": False, "next_cursor": None}
+
+
+def _compile_query(query: str, regex: bool, case_sensitive: bool) -> re.Pattern:
+    flags = 0 if case_sensitive else re.IGNORECASE
+    try:
+        return re.compile(query if regex else re.escape(query), flags)
+    except re.error as e:
+        raise ValueError(f"Invalid regex: {e}") from None
+
+
+def _search_file(filepath: Path, pattern: re.Pattern, limit: int) -> list[tuple[int, str]]:
+    """Up to ``limit`` (line number, line) matches in a text file; binary files yield none."""
+    with open(filepath, "rb") as f:
+        data = f.read(MAX_SEARCH_FILE_BYTES + 1)
+    if len(data) > MAX_SEARCH_FILE_BYTES or b"\0" in data[:BINARY_SNIFF_BYTES]:
+        return []
+    text = data.decode("utf-8", errors="replace")
+    matches = []
+    for match in pattern.finditer(text):
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.end())
+        line_end = len(text) if line_end == -1 else line_end
+        line_number = text.count("\n", 0, line_start) + 1
+        if matches and matches[-1][0] == line_number:
+            continue
+        matches.append((line_number, text[line_start:line_end][:MAX_MATCH_LINE_CHARS]))
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def _get_search_index() -> Optional[TrigramIndex]:
+    """The trigram index, created on first use; a first build runs in the background."""
+    global _search_index
+    if not SEARCH_INDEX:
+        return None
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = TrigramIndex(
+                ROOT,
+                INDEX_PATH,
+                refresh_interval=INDEX_REFRESH_SECONDS,
+                skip_dirs=SKIP_DIRS,
+                max_file_bytes=MAX_SEARCH_FILE_BYTES,
+            )
+            if not _search_index.built:
+                threading.Thread(
+                    target=_search_index.refresh, name="fs-index-build", daemon=True
+                ).start()
+    return _search_index
+
+
+def _indexed_candidates(
+    root: Path, query: str, regex: bool, pattern: re.Pattern
+) -> Optional[list[str]]:
+    """Candidate paths relative to ``root`` from the index, or None to walk instead."""
+    if root != ROOT and ROOT not in root.parents:
+        return None
+    index = _get_search_index()
+    if index is None or not index.built:
+        return None
+    if index.refresh_due:
+        # Search the current index while the tree is re-checked.
+        threading.Thread(
+            target=index.refresh, kwargs={"wait": False}, name="fs-index-refresh", daemon=True
+        ).start()
+    literals = regex_literals(query) if regex else [query]
+    trigrams = query_trigrams(literals, case_sensitive=not pattern.flags & re.IGNORECASE)
+    paths = index.candidates(trigrams)
+    if root == ROOT:
+        return paths
+    prefix = root.relative_to(ROOT).as_posix() + "/"
+    return [relative[len(prefix) :] for relative in paths if relative.startswith(prefix)]
+
+
+def _walk_candidates(root: Path):
+    for relative, _, entry in _walk(root, None, skip_dirs=SKIP_DIRS):
+        if not isinstance(entry, OSError) and entry.is_file(follow_symlinks=False):
+            yield relative.as_posix()
+
+
+def search_files(
+    query: str,
+    path: Optional[str] = None,
+    regex: bool = False,
+    glob: Optional[str] = None,
+    case_sensitive: bool = True,
+    max_results: int = 100,
+) -> dict:
+    """Search file contents under a directory for a string or regex.
+
+    glob filters files by name or relative path (e.g. "*.py", "src/**/*.ts").
+    Returns matching lines as {"path", "line", "text"}, at most max_results of
+    them. Binary files, files over MCP_FS_MAX_SEARCH_FILE_BYTES and VCS,
+    virtualenv and node_modules directories are skipped. path defaults to
+    MCP_FS_ROOT. Under MCP_FS_ROOT a trigram index picks the files to read;
+    it is re-checked in the background at most every
+    MCP_FS_INDEX_REFRESH_SECONDS, so recent edits can take that long to show.
+    """
+    if not query:
+        raise ValueError("query cannot be empty")
+    pattern = _compile_query(query, regex, case_sensitive)
+    root = Path(path).resolve() if path else ROOT
+
+    candidates = _indexed_candidates(root, query, regex, pattern)
+    indexed = candidates is not None
+    if candidates is None:
+        candidates = _walk_candidates(root)
+    if glob:
+        candidates = (
+            relative
+            for relative in candidates
+            if fnmatch.fnmatch(relative.rsplit("/", 1)[-1], glob) or fnmatch.fnmatch(relative, glob)
+        )
+
+    def scan(relative):
+        try:
+            return _search_file(root / relative, pattern, max_results)
+        except OSError:
+            return []
+
+    matches = []
+    files_scanned = 0
+    candidates = iter(candidates)
+    while batch := list(islice(candidates, VERIFY_BATCH)):
+        files_scanned += len(batch)
+        for relative, found in zip(batch, _read_pool.map(scan, batch)):
+            matches.extend({"path": relative, "line": line, "text": text} for line, text in found)
+            if len(matches) >= max_results:
+                return {
+                    "root": str(root),
+                    "matches": matches[:max_results],
+                    "files_scanned": files_scanned,
+                    "indexed": indexed,
+                    "truncated": True,
+                }
+    return {
+        "root": str(root),
+        "matches": matches,
+        "files_scanned": files_scanned,
+        "indexed": indexed,
+        "truncated": False,
+    }
+
+
+def get_cache_stats() -> dict:
+    """Report the read_file / list_directory cache and search index counters."""
+    stats = {"cache": _cache.stats() if _cache is not None else {"enabled": False}}
+    if _search_index is not None:
+        stats["search_index"] = _search_index.stats()
+    return stats
+
+
+def _file_info(filepath: str) -> dict:
+    try:
+        st = os.lstat(filepath)
+    except OSError as e:
+        return {"path": filepath, "error": str(e)}
+    if stat_module.S_ISLNK(st.st_mode):
+        kind = "symlink"
+    elif stat_module.S_ISDIR(st.st_mode):
+        kind = "directory"
+    else:
+        kind = "file" if stat_module.S_ISREG(st.st_mode) else "other"
+
+    def timestamp(value):
+        return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+    return {
+        "path": filepath,
+        "type": kind,
+        "size": st.st_size,
+        "modified": timestamp(st.st_mtime),
+        "accessed": timestamp(st.st_atime),
+        "changed": timestamp(st.st_ctime),
+        "permissions": stat_module.filemode(st.st_mode),
+    }
+
+
+def get_file_info(paths: list[str]) -> list:
+    """Return type, size, timestamps and permissions for each path, in order.
+
+    Symlinks are described themselves, not their targets. Paths that cannot
+    be read get an "error" instead.
+    """
+    return list(_read_pool.map(_file_info, paths))
+
+
+def _get_result_store() -> ResultStore:
+    global _result_store
+    with _result_store_lock:
+        if _result_store is None:
+            _result_store = ResultStore(SPILL_DIR, ttl_seconds=SPILL_TTL_SECONDS)
+        return _result_store
+
+
+def _summary(result: Any) -> dict:
+    if isinstance(result, list):
+        return {"items": len(result)}
+    if not isinstance(result, dict):
+        return {}
+    summary = {}
+    for key, value in result.items():
+        if isinstance(value, (list, dict)):
+            summary[key] = {"items": len(value)}
+        elif not isinstance(value, str) or len(value) <= MAX_SUMMARY_CHARS:
+            summary[key] = value
+    return summary
+
+
+def _to_json(value: Any) -> str:
+    # Matches FastMCP's own conversion of non-string tool results.
+    return value if isinstance(value, str) else pydantic_core.to_json(value, fallback=str, indent=2).decode()
+
+
+def _served(tool, spill: bool = True):
+    """Wrap a tool to serialize its result itself, timing body and serialization.
+
+    FastMCP passes strings through, and turns a list into one text item per
+    element, so returning the pre-serialized text (or list of texts) yields
+    the same response. With ``spill``, results larger than SPILL_BYTES are
+    stored and replaced by a resource stub.
+
+    FastMCP calls a sync tool on its event loop, so the wrapper is async and
+    runs the tool and its serialization on a worker thread; a large read or
+    search does not hold up the worker's other requests.
+    """
+
+    def serve(*args, **kwargs):
+        started = time.perf_counter()
+        result = tool(*args, **kwargs)
+        body_done = time.perf_counter()
+        if isinstance(result, list):
+            content = [_to_json(item) for item in result]
+            size = sum(len(text) for text in content)
+        else:
+            content = _to_json(result)
+            size = len(content)
+        if spill and 0 < SPILL_BYTES < size:
+            # The resource is served as JSON, so strings and lists are encoded
+            # whole rather than as FastMCP's per-item text.
+            text = (
+                pydantic_core.to_json(result, fallback=str, indent=2).decode()
+                if isinstance(result, (str, list))
+                else content
+            )
+            handle = _get_result_store().put(text)
+            content = _to_json(
+                {
+                    "spilled": True,
+                    "resource": RESULT_URI_PREFIX + handle,
+                    "handle": handle,
+                    "size": len(text.encode("utf-8")),
+                    "summary": _summary(result),
+                }
+            )
+        metrics.observe_phase(tool.__name__, "body", body_done - started)
+        metrics.observe_phase(tool.__name__, "serialize", time.perf_counter() - body_done)
+        return content
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        return await anyio.to_thread.run_sync(functools.partial(serve, *args, **kwargs))
+
+    return wrapper
+
+
+def read_result(handle: str, offset: int = 0, length: Optional[int] = None, cursor: Optional[str] = None) -> dict:
+    """Read a byte range of a spilled tool result (its JSON text).
+
+    Works like read_file: each response carries at most MCP_FS_SPILL_BYTES;
+    pass next_cursor back as cursor to continue.
+    """
+    path = _get_result_store().open_path(handle)
+    max_bytes = SPILL_BYTES or MAX_RESPONSE_BYTES
+    result = _read_file(path, offset, length, encoding="text", cursor=cursor, max_bytes=max_bytes)
+    del result["path"]
+    return {"handle": handle, **result}
+
+
+def get_result(handle: str) -> str:
+    """The whole JSON text of a spilled tool result."""
+    with open(_get_result_store().open_path(handle), encoding="utf-8") as f:
+        return f.read()
+
+
+def register_filesystem_tools(mcp: Any) -> None:
+    """Register the filesystem tools on a FastMCP server, with metrics at /metrics."""
+    mcp.tool(
+        description=(
+            "Read a file, or a byte range (offset/length) or line range (start_line/end_line) of it. "
+            "Binary content is returned base64-encoded. Large reads are capped per response; "
+            "pass next_cursor back as cursor to continue."
+        )
+    )(_served(read_file, spill=False))
+    mcp.tool(description="List contents of a directory")(_served(list_directory))
+    mcp.tool(description="Get current working directory")(_served(get_cwd, spill=False))
+    mcp.tool(
+        description=(
+            "Read several files in one call, concurrently, within a shared byte budget. "
+            "Truncated files carry a next_cursor for read_file."
+        )
+    )(_served(read_multiple_files, spill=False))
+    mcp.tool(
+        description=(
+            "List a directory tree (flat, sorted, with depth) up to max_depth levels; "
+            "pages with next_cursor when over max_entries."
+        )
+    )(_served(directory_tree))
+    mcp.tool(
+        description="Search file contents under a directory for a string or regex, optionally filtered by a glob."
+    )(_served(search_files))
+    mcp.tool(description="Get type, size, timestamps and permissions for one or more paths")(_served(get_file_info))
+    mcp.tool(
+        description="Report hit rates and memory use of the file/directory cache and the search index"
+    )(_served(get_cache_stats, spill=False))
+    mcp.tool(
+        description=(
+            "Read a byte range of a large tool result that was returned as a spilled stub "
+            "(handle from its fs-result:// resource); pages with next_cursor."
+        )
+    )(_served(read_result, spill=False))
+    mcp.resource(
+        RESULT_URI_PREFIX + "{handle}",
+        name="spilled_result",
+        description="Full JSON text of a tool result too large to return inline",
+        mime_type="application/json",
+    )(get_result)
+    instrument_fastmcp(mcp, metrics)
+    add_metrics_route(mcp, metrics)
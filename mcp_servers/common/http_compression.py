@@ -0,0 +1,156 @@
+"""Response compression for the HTTP transports, negotiated via Accept-Encoding.
+
+Starlette's GZipMiddleware leaves ``text/event-stream`` alone, but that is
+how the SSE transport (and the stateful streamable-HTTP transport) deliver
+tool results. ``CompressionMiddleware`` also compresses streams, flushing the
+compressor after every chunk so each event reaches the client immediately
+while the compression window still spans the whole stream.
+
+zstd is preferred when the ``zstandard`` package is installed and the client
+accepts it (httpx does whenever zstandard is installed); gzip otherwise.
+"""
+
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional: gzip only.
+    zstandard = None
+
+# MCP_HTTP_COMPRESSION=0 serves everything uncompressed.
+COMPRESSION = os.environ.get("MCP_HTTP_COMPRESSION", "1") != "0"
+# Complete (non-streamed) bodies smaller than this are sent as they are.
+MIN_COMPRESS_BYTES = int(os.environ.get("MCP_HTTP_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def supported_encodings() -> tuple[str, ...]:
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Pick the best supported coding from an Accept-Encoding header, or None."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            weights[name.strip().lower()] = quality
+    wildcard = weights.get("*", 0.0)
+    for coding in supported_encodings():
+        if weights.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+class _Encoder:
+    def __init__(self, coding: str):
+        if coding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._sync = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._sync = zlib.Z_SYNC_FLUSH
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush, so the client can decode everything sent so far."""
+        return self._compressor.compress(data) + self._compressor.flush(self._sync)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing HTTP responses with gzip or zstd."""
+
+    def __init__(self, app, minimum_size: int = MIN_COMPRESS_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+        coding = negotiate(accept) if accept else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, coding, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send, coding: str, minimum_size: int):
+        self.send = send
+        self.coding = coding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            self.start = message
+            headers = {name.lower() for name, _ in message.get("headers", [])}
+            self.passthrough = b"content-encoding" in headers or message["status"] in (204, 304)
+            return
+        if kind != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if self.start is not None:
+            # The first body message decides: a complete small body goes out as is.
+            if not more and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.send(message)
+                return
+            self.encoder = _Encoder(self.coding)
+            if not more:
+                data = self.encoder.finish(body)
+                await self._flush_start(content_length=len(data))
+                await self.send({"type": "http.response.body", "body": data})
+                return
+            await self._flush_start()
+        if more:
+            data = self.encoder.chunk(body) if body else b""
+            if data:
+                await self.send({"type": "http.response.body", "body": data, "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.encoder.finish(body)})
+
+    async def _flush_start(self, content_length=None):
+        start, self.start = self.start, None
+        if start is None:
+            return
+        if self.encoder is not None:
+            original = start.get("headers", [])
+            headers = [(name, value) for name, value in original if name.lower() not in (b"content-length", b"vary")]
+            vary = [value for name, value in original if name.lower() == b"vary"]
+            headers.append((b"content-encoding", self.coding.encode("ascii")))
+            headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            if content_length is not None:
+                headers.append((b"content-length", str(content_length).encode("ascii")))
+            start = dict(start, headers=headers)
+        await self.send(start)
+
+
+def compressed(app, minimum_size: int = MIN_COMPRESS_BYTES):
+    """Return ``app`` wrapped in CompressionMiddleware, unless MCP_HTTP_COMPRESSION=0."""
+    return CompressionMiddleware(app, minimum_size) if COMPRESSION else app
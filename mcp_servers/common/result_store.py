@@ -0,0 +1,81 @@
+"""On-disk store for tool results too large to return inline.
+
+Results are content-addressed (the handle is a SHA-256 prefix of the text),
+so the workers of the multi-process server agree on handles and any of them
+can serve a range of a result another one stored. Entries older than
+``ttl_seconds`` are removed, oldest first, and so are the oldest entries
+while the store is over ``max_bytes``.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+HANDLE_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class ResultStore:
+    def __init__(self, directory, ttl_seconds: float = 3600.0, max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, text: str) -> str:
+        """Store ``text`` and return its handle."""
+        data = text.encode("utf-8")
+        handle = hashlib.sha256(data).hexdigest()[:32]
+        path = self.path(handle)
+        try:
+            if time.time() - os.stat(path).st_mtime > self.ttl_seconds / 2:
+                # Same content stored a while ago; keep it around longer.
+                os.utime(path)
+        except FileNotFoundError:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self._maybe_prune()
+        return handle
+
+    def path(self, handle: str) -> str:
+        """Path a result with this handle is stored at; raises ValueError for malformed handles."""
+        if not HANDLE_PATTERN.fullmatch(handle):
+            raise ValueError(f"invalid result handle: {handle!r}")
+        return os.path.join(self.directory, handle + ".json")
+
+    def open_path(self, handle: str) -> str:
+        """Path of a stored result; raises ValueError if it does not exist (or expired)."""
+        path = self.path(handle)
+        if not os.path.exists(path):
+            raise ValueError(f"unknown or expired result handle: {handle}")
+        return path
+
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < 60:
+                return
+            self._last_prune = now
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if now - mtime < self.ttl_seconds and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The shared modules are imported as top-level modules, as the servers put
+# this directory on sys.path.
+COMMON_ROOT = Path(__file__).resolve().parent.parent
+if str(COMMON_ROOT) not in sys.path:
+    sys.path.insert(0, str(COMMON_ROOT))
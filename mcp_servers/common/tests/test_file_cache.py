@@ -0,0 +1,61 @@
+import os
+
+import filesystem_tools
+from file_cache import StatCache
+
+
+def test_lru_eviction_and_oversized_values():
+    cache = StatCache(max_bytes=100, max_entry_bytes=60)
+    cache.put("a", 1, "A", 40)
+    cache.put("b", 1, "B", 40)
+    assert cache.get("a", 1) == "A"  # Now the most recently used.
+    cache.put("c", 1, "C", 40)
+    cache.put("huge", 1, "H", 61)
+
+    assert cache.get("b", 1) is None
+    assert (cache.get("a", 1), cache.get("c", 1), cache.get("huge", 1)) == ("A", "C", None)
+    assert cache.stats()["bytes"] == 80 and cache.stats()["evictions"] == 1
+
+
+def test_changed_signature_drops_the_entry():
+    cache = StatCache(max_bytes=100)
+    cache.put("a", (1, 2, 3), "old", 3)
+    assert cache.get("a", (1, 2, 4)) is None
+    assert cache.get("a", (1, 2, 3)) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def _fresh_cache(monkeypatch):
+    cache = StatCache(1024 * 1024)
+    monkeypatch.setattr(filesystem_tools, "_cache", cache)
+    return cache
+
+
+def test_reads_are_cached_but_never_stale(monkeypatch, tmp_path):
+    cache = _fresh_cache(monkeypatch)
+    path = tmp_path / "notes.txt"
+    path.write_text("first")
+    stat = path.stat()
+    assert filesystem_tools.read_file(str(path)) == "first"
+    assert filesystem_tools.read_file(str(path)) == "first"
+    assert cache.stats()["hits"] == 1
+
+    # Same size and mtime, but a new inode: replace-by-rename.
+    replacement = tmp_path / "replacement.txt"
+    replacement.write_text("again")
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(replacement, path)
+    assert filesystem_tools.read_file(str(path)) == "again"
+
+    # Same inode and size, new mtime: an in-place edit.
+    path.write_text("third")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert filesystem_tools.read_file(str(path)) == "third"
+
+
+def test_directory_listing_sees_new_entries(monkeypatch, tmp_path):
+    _fresh_cache(monkeypatch)
+    (tmp_path / "a").write_text("")
+    assert filesystem_tools.list_directory(str(tmp_path)) == ["a"]
+    (tmp_path / "b").write_text("")
+    assert sorted(filesystem_tools.list_directory(str(tmp_path))) == ["a", "b"]
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+import filesystem_tools
+
+
+def _server():
+    mcp = FastMCP("filesystem-test")
+    filesystem_tools.register_filesystem_tools(mcp)
+    return mcp
+
+
+def _call(mcp, name, arguments):
+    content = asyncio.run(mcp.call_tool(name, arguments))
+    assert len(content) == 1
+    return json.loads(content[0].text)
+
+
+def test_defaults_page_read_file_instead_of_spilling_it():
+    assert filesystem_tools.SPILL_BYTES < filesystem_tools.MAX_RESPONSE_BYTES
+
+
+def _text(mcp, name, arguments):
+    content = asyncio.run(mcp.call_tool(name, arguments))
+    assert len(content) == 1
+    return content[0].text
+
+
+def test_read_file_with_only_a_path_returns_the_text(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text('{"not": "parsed"}\nline two\n')
+
+    assert _text(_server(), "read_file", {"filepath": str(path)}) == path.read_text()
+
+
+def test_read_file_with_a_range_returns_the_paging_dict(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("line one\nline two\n")
+
+    result = _call(_server(), "read_file", {"filepath": str(path), "start_line": 2})
+    assert result["content"] == "line two\n"
+    assert result["next_cursor"] is None
+
+
+def test_read_file_of_binary_file_returns_base64(tmp_path):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(bytes(range(256)))
+
+    result = _call(_server(), "read_file", {"filepath": str(path)})
+    assert result["encoding"] == "base64"
+
+
+def test_read_file_between_spill_and_response_cap_is_inline(tmp_path):
+    path = tmp_path / "medium.txt"
+    text = "x" * (filesystem_tools.SPILL_BYTES + 4096)
+    path.write_text(text)
+
+    assert _text(_server(), "read_file", {"filepath": str(path)}) == text
+
+
+def test_read_file_cursor_reaches_end_of_large_file(tmp_path):
+    path = tmp_path / "large.txt"
+    line = "0123456789abcdef" * 4 + "\n"
+    text = line * (filesystem_tools.MAX_RESPONSE_BYTES * 3 // 2 // len(line))
+    path.write_text(text)
+    mcp = _server()
+
+    parts = []
+    arguments = {"filepath": str(path)}
+    while True:
+        result = _call(mcp, "read_file", arguments)
+        assert "spilled" not in result
+        parts.append(result["content"])
+        if not result.get("next_cursor"):
+            break
+        arguments = {"filepath": str(path), "cursor": result["next_cursor"]}
+
+    assert len(parts) == 2
+    assert "".join(parts) == text
+
+
+def test_spilled_list_result_is_valid_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(filesystem_tools, "SPILL_BYTES", 1000)
+    monkeypatch.setattr(filesystem_tools, "SPILL_DIR", str(tmp_path / "spill"))
+    monkeypatch.setattr(filesystem_tools, "_result_store", None)
+    listed = tmp_path / "listed"
+    listed.mkdir()
+    names = [f"file-{i:03}.txt" for i in range(200)]
+    for name in names:
+        (listed / name).touch()
+    mcp = _server()
+
+    stub = _call(mcp, "list_directory", {"dirpath": str(listed)})
+    assert stub["spilled"] is True
+    assert sorted(json.loads(filesystem_tools.get_result(stub["handle"]))) == names
+
+    contents = asyncio.run(mcp.read_resource(stub["resource"]))
+    assert sorted(json.loads(contents[0].content)) == names
+
+
+def test_slow_search_does_not_block_other_calls(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("needle\n")
+    search_file = filesystem_tools._search_file
+
+    def slow_search_file(*args):
+        time.sleep(0.5)
+        return search_file(*args)
+
+    monkeypatch.setattr(filesystem_tools, "_search_file", slow_search_file)
+    mcp = _server()
+    finished = []
+
+    async def call(name, arguments):
+        await mcp.call_tool(name, arguments)
+        finished.append(name)
+
+    async def scenario():
+        search = asyncio.create_task(call("search_files", {"query": "needle", "path": str(tmp_path)}))
+        await asyncio.sleep(0.05)
+        await call("get_cwd", {})
+        await search
+
+    asyncio.run(scenario())
+    assert finished == ["get_cwd", "search_files"]
+
+
+def test_read_multiple_files_hands_out_the_budget_in_order(tmp_path):
+    paths = []
+    for name in "abc":
+        (tmp_path / name).write_text(name * 100)
+        paths.append(str(tmp_path / name))
+    paths.append(str(tmp_path / "missing"))
+
+    results = filesystem_tools.read_multiple_files(paths, max_total_bytes=150)
+
+    assert [r.get("bytes_read") for r in results[:3]] == [100, 50, 0]
+    assert results[0]["next_cursor"] is None and results[1]["next_cursor"]
+    assert "error" in results[3]
+    rest = filesystem_tools.read_file(paths[1], cursor=results[1]["next_cursor"])
+    assert results[1]["content"] + rest["content"] == "b" * 100
+
+
+def test_directory_tree_pages_add_up_to_the_full_tree(tmp_path):
+    for directory in ("a/x", "a/y", "b", "c/z/deep"):
+        (tmp_path / directory).mkdir(parents=True)
+        (tmp_path / directory / "f.txt").write_text("data")
+
+    full = filesystem_tools.directory_tree(str(tmp_path), max_depth=10)["entries"]
+    paged, cursor = [], None
+    while True:
+        page = filesystem_tools.directory_tree(str(tmp_path), max_depth=10, max_entries=3, cursor=cursor)
+        paged.extend(page["entries"])
+        if not page["truncated"]:
+            break
+        cursor = page["next_cursor"]
+
+    assert paged == full
+    assert [entry["path"] for entry in full[:3]] == ["a", "a/x", "a/x/f.txt"]
+    shallow = filesystem_tools.directory_tree(str(tmp_path), max_depth=1)["entries"]
+    assert [entry["path"] for entry in shallow] == ["a", "b", "c"]
+
+
+def test_get_file_info_describes_each_path_in_order(tmp_path):
+    (tmp_path / "file.txt").write_text("12345")
+    (tmp_path / "link").symlink_to(tmp_path / "file.txt")
+    paths = [str(tmp_path / "file.txt"), str(tmp_path / "link"), str(tmp_path / "missing"), str(tmp_path)]
+
+    info = filesystem_tools.get_file_info(paths)
+
+    assert [item.get("type") for item in info] == ["file", "symlink", None, "directory"]
+    assert info[0]["size"] == 5
+    assert "error" in info[2]
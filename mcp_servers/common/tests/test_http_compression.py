@@ -0,0 +1,84 @@
+import asyncio
+import gzip
+import zlib
+
+import http_compression
+from http_compression import CompressionMiddleware, negotiate
+
+
+def _app(chunks, headers=()):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+
+    return app
+
+
+def _call(app, accept="gzip", method="GET", on_message=None):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+        if on_message:
+            on_message(message)
+
+    scope = {"type": "http", "method": method, "headers": [(b"accept-encoding", accept.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=64)(scope, None, send))
+    start, *bodies = messages
+    return dict(start["headers"]), bodies
+
+
+def test_negotiate_honours_quality_and_wildcards(monkeypatch):
+    monkeypatch.setattr(http_compression, "zstandard", None)
+    assert negotiate("gzip;q=0, br") is None
+    assert negotiate("br, *;q=0.5") == "gzip"
+    assert negotiate("*;q=0") is None
+    assert negotiate("GZIP ; q=0.8") == "gzip"
+
+
+def test_small_bodies_and_encoded_responses_pass_through():
+    headers, bodies = _call(_app([b"tiny"]))
+    assert b"content-encoding" not in headers and bodies[0]["body"] == b"tiny"
+
+    payload = b"x" * 1000
+    headers, bodies = _call(_app([payload], [(b"content-encoding", b"br")]))
+    assert headers[b"content-encoding"] == b"br" and bodies[0]["body"] == payload
+
+    headers, bodies = _call(_app([payload]), method="HEAD")
+    assert b"content-encoding" not in headers
+
+
+def test_complete_body_is_compressed_with_matching_headers():
+    payload = b'{"result": "' + b"abc" * 1000 + b'"}'
+    app = _app([payload], [(b"content-length", str(len(payload)).encode()), (b"vary", b"Origin")])
+    headers, (body,) = _call(app)
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Origin, Accept-Encoding"
+    assert int(headers[b"content-length"]) == len(body["body"]) < len(payload)
+    assert gzip.decompress(body["body"]) == payload
+
+
+def test_each_streamed_event_decodes_as_soon_as_it_is_sent():
+    events = [f"data: event {i} {'y' * 200}\n\n".encode() for i in range(5)]
+    decoder = zlib.decompressobj(31)
+    decoded = []
+
+    def on_message(message):
+        if message["type"] == "http.response.body":
+            decoded.append(decoder.decompress(message["body"]))
+
+    headers, bodies = _call(_app(events + [b""], [(b"content-type", b"text/event-stream")]), on_message=on_message)
+
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    assert decoded[: len(events)] == events
+    assert b"".join(decoded) == b"".join(events) and decoder.eof
+
+
+def test_zstd_is_preferred_when_accepted():
+    payload = b"z" * 5000
+    headers, (body,) = _call(_app([payload]), accept="gzip, zstd")
+
+    assert headers[b"content-encoding"] == b"zstd"
+    assert http_compression.zstandard.ZstdDecompressor().decompressobj().decompress(body["body"]) == payload
@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from tool_metrics import MetricsSpool, ToolMetrics
+
+
+def _exited_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _spool_file(directory, name, calls):
+    metrics = ToolMetrics()
+    for _ in range(calls):
+        metrics.observe_call("echo", 0.01)
+    (directory / name).write_text(json.dumps(metrics.state()))
+
+
+def _calls(spool):
+    combined, processes = spool.combined(flush_timeout=0)
+    return combined.state()["tools"].get("echo", {}).get("calls", 0), processes
+
+
+def test_files_of_finished_runs_are_pruned(tmp_path):
+    dead = _exited_pid()
+    _spool_file(tmp_path, f"{dead}-{dead}-1.json", calls=5)
+    spool = MetricsSpool(ToolMetrics(), str(tmp_path))
+
+    assert _calls(spool) == (0, 1)
+    assert not (tmp_path / f"{dead}-{dead}-1.json").exists()
+
+
+def test_exited_worker_of_a_running_group_still_counts(tmp_path):
+    dead = _exited_pid()
+    _spool_file(tmp_path, f"{os.getpid()}-{dead}-1.json", calls=3)
+    spool = MetricsSpool(ToolMetrics(), str(tmp_path))
+
+    assert _calls(spool) == (3, 2)
+
+
+def test_scrape_flushes_other_workers(tmp_path):
+    scraper = MetricsSpool(ToolMetrics(), str(tmp_path)).start()
+    worker_metrics = ToolMetrics()
+    MetricsSpool(worker_metrics, str(tmp_path), interval=60).start()
+    worker_metrics.observe_call("echo", 0.01)
+    worker_metrics.observe_call("echo", 0.01)
+
+    started = time.perf_counter()
+    combined, processes = scraper.combined()
+
+    assert time.perf_counter() - started < 0.9
+    assert processes == 2
+    assert combined.state()["tools"]["echo"]["calls"] == 2
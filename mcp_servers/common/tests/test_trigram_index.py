@@ -0,0 +1,78 @@
+import os
+import random
+
+import pytest
+
+from trigram_index import TrigramIndex, query_trigrams, regex_literals
+
+
+@pytest.mark.parametrize(
+    "pattern, literals",
+    [
+        ("foo.*bar", ["foo", "bar"]),
+        ("colou?r", ["colo", "r"]),
+        ("(ab|cd)xyz", ["xyz"]),
+        (r"def\s+main", ["def", "main"]),
+        ("a|b", []),
+    ],
+)
+def test_regex_literals_are_required_by_every_match(pattern, literals):
+    assert regex_literals(pattern) == literals
+
+
+def _index(tmp_path, files):
+    root = tmp_path / "root"
+    for relative, data in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data if isinstance(data, bytes) else data.encode())
+    index = TrigramIndex(root, tmp_path / "index.sqlite3")
+    index.refresh(force=True)
+    return root, index
+
+
+def _candidates(index, text, case_sensitive=True):
+    return index.candidates(query_trigrams([text], case_sensitive))
+
+
+def test_candidates_never_miss_a_matching_file(tmp_path):
+    rng = random.Random(7)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "theta", "kappa"]
+    files = {f"d{i % 5}/f{i}.txt": " ".join(rng.choices(words, k=20)) for i in range(200)}
+    root, index = _index(tmp_path, files)
+
+    for query in ["alpha beta", "zeta", "kappa gamma", "ta th"]:
+        expected = {path for path, text in files.items() if query in text}
+        assert expected <= set(_candidates(index, query))
+
+
+def test_edits_deletes_and_binary_files(tmp_path):
+    root, index = _index(
+        tmp_path, {"a.txt": "needle here", "b.txt": "hay", "c.bin": b"needle\0binary"}
+    )
+    assert _candidates(index, "needle") == ["a.txt"]
+    assert _candidates(index, "NEEDLE", case_sensitive=False) == ["a.txt"]
+
+    (root / "b.txt").write_text("a needle too")
+    os.utime(root / "b.txt", ns=(0, 10**18))
+    (root / "a.txt").unlink()
+    index.mark_stale()
+    assert index.refresh()
+
+    assert _candidates(index, "needle") == ["b.txt"]
+    assert index.stats()["dead_files"] == 2
+
+
+def test_compaction_and_a_second_handle_keep_the_same_answers(tmp_path):
+    root, index = _index(tmp_path, {f"f{i}.txt": f"file number {i} unique{i:04d}" for i in range(50)})
+    (root / "f1.txt").write_text("changed unique9999")
+    index.mark_stale()
+    index.refresh()
+    index.compact()
+
+    other = TrigramIndex(root, tmp_path / "index.sqlite3")
+    for handle in (index, other):
+        assert _candidates(handle, "unique0007") == ["f7.txt"]
+        assert _candidates(handle, "unique9999") == ["f1.txt"]
+        assert "f1.txt" not in _candidates(handle, "unique0001")
+    assert index.stats()["dead_files"] == 0
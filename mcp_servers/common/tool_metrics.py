@@ -0,0 +1,490 @@
+"""Per-tool latency, error and payload-size metrics for the MCP servers.
+
+Every tool call records its end-to-end latency, its argument and result
+sizes, and whether it failed. Servers that can tell the two apart also record
+how much of the call went to the tool body and how much to serializing the
+result. Each series keeps cumulative Prometheus buckets and a window of the
+most recent samples, from which ``snapshot`` reports exact p50/p95/p99.
+
+The stdio runtime and the FastMCP filesystem servers share this module. The
+HTTP servers serve ``render_prometheus()`` at ``/metrics`` (see
+``add_metrics_route``), and the stdio servers offer a ``__metrics__`` tool
+and a periodic stderr dump.
+
+Metrics live in each process. When several worker processes serve one port,
+``MetricsSpool`` has each of them write its counters to a shared directory
+(``MCP_METRICS_DIR``), and ``/metrics`` answers with the sum over all of them,
+whichever worker takes the scrape. A scrape first asks the other workers to
+write their counters, so the sum is current.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Iterable
+
+RECENT_SAMPLES = 1024
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = tuple(64 * 4**power for power in range(11))  # 64 B .. 64 MiB
+PHASES = ("total", "body", "serialize")
+# How often spooling workers look for a scrape's flush request, and how long a
+# scrape waits for them to answer it.
+FLUSH_POLL_SECONDS = 0.05
+FLUSH_TIMEOUT = 1.0
+FLUSH_FILENAME = "flush"
+
+
+def _percentile(sorted_values: list, fraction: float):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value: float) -> None:
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def summary(self, scale: float = 1.0, digits: int = 3) -> dict:
+        if not self.count:
+            return {"count": 0}
+        recent = sorted(self.recent)
+
+        def value(raw):
+            return round(raw * scale, digits) if digits else int(raw * scale)
+
+        return {
+            "count": self.count,
+            "mean": value(self.sum / self.count),
+            "p50": value(_percentile(recent, 0.5)),
+            "p95": value(_percentile(recent, 0.95)),
+            "p99": value(_percentile(recent, 0.99)),
+            "max": value(recent[-1]),
+        }
+
+    def state(self) -> dict:
+        return {"counts": list(self.counts), "count": self.count, "sum": self.sum}
+
+    def add_state(self, state: dict) -> None:
+        """Add the buckets of another process's histogram (recent samples are not shared)."""
+        if len(state["counts"]) != len(self.counts):
+            return
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, state["counts"])]
+        self.count += state["count"]
+        self.sum += state["sum"]
+
+    def prometheus_lines(self, name: str, labels: str) -> Iterable[str]:
+        cumulative = 0
+        separator = "," if labels else ""
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}{separator}le="{bound:g}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels}{separator}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum:.6f}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class _ToolSeries:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = {phase: Histogram(LATENCY_BUCKETS) for phase in PHASES}
+        self.argument_bytes = Histogram(SIZE_BUCKETS)
+        self.result_bytes = Histogram(SIZE_BUCKETS)
+
+
+def content_bytes(contents: Iterable[Any]) -> int:
+    """Size of a list of MCP content items: text length, or the JSON of anything else."""
+    size = 0
+    for content in contents:
+        text = getattr(content, "text", None)
+        size += len(text) if isinstance(text, str) else len(content.model_dump_json())
+    return size
+
+
+def argument_bytes(arguments: Any) -> int:
+    try:
+        return len(json.dumps(arguments, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ToolMetrics:
+    """Thread-safe registry of per-tool call metrics plus list_tools latency."""
+
+    def __init__(self):
+        self._tools: dict[str, _ToolSeries] = {}
+        self._list_tools = Histogram(LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _series(self, tool_name: str) -> _ToolSeries:
+        series = self._tools.get(tool_name)
+        if series is None:
+            series = self._tools[tool_name] = _ToolSeries()
+        return series
+
+    def observe_call(
+        self,
+        tool_name: str,
+        seconds: float,
+        *,
+        error: bool = False,
+        arguments_size: int | None = None,
+        result_size: int | None = None,
+    ) -> None:
+        with self._lock:
+            series = self._series(tool_name)
+            series.calls += 1
+            series.errors += error
+            series.latency["total"].observe(seconds)
+            if arguments_size is not None:
+                series.argument_bytes.observe(arguments_size)
+            if result_size is not None:
+                series.result_bytes.observe(result_size)
+
+    def observe_phase(self, tool_name: str, phase: str, seconds: float) -> None:
+        """Record the "body" or "serialize" share of a call."""
+        with self._lock:
+            self._series(tool_name).latency[phase].observe(seconds)
+
+    def observe_list_tools(self, seconds: float) -> None:
+        with self._lock:
+            self._list_tools.observe(seconds)
+
+    def state(self) -> dict:
+        """Counters and histogram buckets as plain data, for ``add_state`` in another process."""
+        with self._lock:
+            return {
+                "tools": {
+                    tool_name: {
+                        "calls": series.calls,
+                        "errors": series.errors,
+                        "latency": {phase: histogram.state() for phase, histogram in series.latency.items()},
+                        "argument_bytes": series.argument_bytes.state(),
+                        "result_bytes": series.result_bytes.state(),
+                    }
+                    for tool_name, series in self._tools.items()
+                },
+                "list_tools": self._list_tools.state(),
+            }
+
+    def add_state(self, state: dict) -> None:
+        with self._lock:
+            for tool_name, tool_state in state["tools"].items():
+                series = self._series(tool_name)
+                series.calls += tool_state["calls"]
+                series.errors += tool_state["errors"]
+                for phase, histogram_state in tool_state["latency"].items():
+                    if phase in series.latency:
+                        series.latency[phase].add_state(histogram_state)
+                series.argument_bytes.add_state(tool_state["argument_bytes"])
+                series.result_bytes.add_state(tool_state["result_bytes"])
+            self._list_tools.add_state(state["list_tools"])
+
+    def snapshot(self) -> dict:
+        """Counts, error rates and p50/p95/p99 latencies (ms) and sizes (bytes) per tool."""
+        with self._lock:
+            tools = {}
+            for tool_name, series in sorted(self._tools.items()):
+                tools[tool_name] = {
+                    "calls": series.calls,
+                    "errors": series.errors,
+                    "latency_ms": {
+                        phase: histogram.summary(scale=1000)
+                        for phase, histogram in series.latency.items()
+                        if histogram.count
+                    },
+                    "argument_bytes": series.argument_bytes.summary(digits=0),
+                    "result_bytes": series.result_bytes.summary(digits=0),
+                }
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "list_tools_latency_ms": self._list_tools.summary(scale=1000),
+                "tools": tools,
+            }
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            tools = sorted(self._tools.items())
+            lines += ["# HELP mcp_tool_calls_total Tool calls handled.", "# TYPE mcp_tool_calls_total counter"]
+            for tool_name, series in tools:
+                lines.append(f'mcp_tool_calls_total{{tool="{_escape(tool_name)}"}} {series.calls}')
+            lines += ["# HELP mcp_tool_errors_total Tool calls that failed.", "# TYPE mcp_tool_errors_total counter"]
+            for tool_name, series in tools:
+                lines.append(f'mcp_tool_errors_total{{tool="{_escape(tool_name)}"}} {series.errors}')
+
+            lines += [
+                "# HELP mcp_tool_duration_seconds Tool call latency: total, tool body, result serialization.",
+                "# TYPE mcp_tool_duration_seconds histogram",
+            ]
+            for tool_name, series in tools:
+                for phase, histogram in series.latency.items():
+                    if histogram.count:
+                        labels = f'tool="{_escape(tool_name)}",phase="{phase}"'
+                        lines += histogram.prometheus_lines("mcp_tool_duration_seconds", labels)
+
+            for metric, attribute, description in (
+                ("mcp_tool_argument_bytes", "argument_bytes", "Size of the JSON arguments of tool calls."),
+                ("mcp_tool_result_bytes", "result_bytes", "Size of tool call results."),
+            ):
+                lines += [f"# HELP {metric} {description}", f"# TYPE {metric} histogram"]
+                for tool_name, series in tools:
+                    histogram = getattr(series, attribute)
+                    if histogram.count:
+                        lines += histogram.prometheus_lines(metric, f'tool="{_escape(tool_name)}"')
+
+            lines += [
+                "# HELP mcp_list_tools_duration_seconds list_tools latency.",
+                "# TYPE mcp_list_tools_duration_seconds histogram",
+            ]
+            lines += self._list_tools.prometheus_lines("mcp_list_tools_duration_seconds", "")
+        return "\n".join(lines) + "\n"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists, but belongs to someone else.
+    return True
+
+
+def _spool_owner(filename: str) -> tuple[int, int] | None:
+    """(group, pid) from a ``<group>-<pid>-<start>.json`` spool file name."""
+    try:
+        group, pid, _ = filename[: -len(".json")].split("-")
+        return int(group), int(pid)
+    except ValueError:
+        return None
+
+
+class MetricsSpool:
+    """Shares one process's metrics with the other workers through ``directory``.
+
+    The process writes its ``state()`` to ``<directory>/<group>-<pid>-<start
+    time>.json`` every ``interval`` seconds, at exit, and whenever a scrape
+    asks for it. ``group`` is ``MCP_METRICS_GROUP`` (the prefork master's pid)
+    or, for a single process, its own pid.
+
+    ``combined()`` asks the other workers to write, by replacing the
+    ``flush`` file, and waits up to ``FLUSH_TIMEOUT`` for them. It then adds
+    the files of all workers to this process's live metrics. Files of exited
+    workers are included while their group's master runs, so counters never
+    go down; once both the worker and its group are gone, the file is deleted.
+    """
+
+    def __init__(self, metrics: ToolMetrics, directory: str, interval: float = 5.0):
+        self.metrics = metrics
+        self.directory = directory
+        self.interval = interval
+        group = int(os.environ.get("MCP_METRICS_GROUP") or os.getpid())
+        self.filename = f"{group}-{os.getpid()}-{time.time_ns()}.json"
+        self._flush_path = os.path.join(directory, FLUSH_FILENAME)
+        self._flush_seen = None
+        self._flush_token = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self) -> "MetricsSpool":
+        self.write()
+        threading.Thread(target=self._run, name="metrics-spool", daemon=True).start()
+        atexit.register(self.write)
+        return self
+
+    def _run(self) -> None:
+        written_at = time.monotonic()
+        while True:
+            time.sleep(FLUSH_POLL_SECONDS)
+            if self._flush_requested() or time.monotonic() - written_at >= self.interval:
+                self.write()
+                written_at = time.monotonic()
+
+    def _flush_requested(self) -> bool:
+        try:
+            st = os.stat(self._flush_path)
+            if (st.st_mtime_ns, st.st_size, st.st_ino) == self._flush_seen:
+                return False
+            self._flush_seen = (st.st_mtime_ns, st.st_size, st.st_ino)
+            with open(self._flush_path, encoding="utf-8") as f:
+                token = int(f.read())
+        except (OSError, ValueError):
+            return False
+        if token <= self._flush_token:
+            return False
+        self._flush_token = token
+        return True
+
+    def _request_flush(self) -> int:
+        token = time.time_ns()
+        tmp_path = f"{self._flush_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(token))
+            os.replace(tmp_path, self._flush_path)
+        except OSError:
+            pass
+        return token
+
+    def write(self) -> None:
+        path = os.path.join(self.directory, self.filename)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"flush_token": self._flush_token, **self.metrics.state()}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _other_states(self) -> dict[str, dict]:
+        states = {}
+        for name in os.listdir(self.directory):
+            if name == self.filename or not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            owner = _spool_owner(name)
+            if owner is not None and not any(_process_alive(pid) for pid in owner):
+                # A finished run's worker: nothing will count it again.
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    states[name] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        return states
+
+    def combined(self, flush_timeout: float = FLUSH_TIMEOUT) -> tuple[ToolMetrics, int]:
+        """All workers' metrics added together, and the number of processes included."""
+        token = self._request_flush() if flush_timeout > 0 else 0
+        deadline = time.monotonic() + flush_timeout
+        while True:
+            states = self._other_states()
+            waiting = [
+                name
+                for name, state in states.items()
+                if state.get("flush_token", 0) < token
+                and _process_alive((_spool_owner(name) or (0, 0))[1])
+            ]
+            if not waiting or time.monotonic() >= deadline:
+                break
+            time.sleep(FLUSH_POLL_SECONDS / 2)
+
+        total = ToolMetrics()
+        total.started = self.metrics.started
+        total.add_state(self.metrics.state())
+        processes = 1
+        for state in states.values():
+            try:
+                total.add_state(state)
+            except KeyError:
+                continue
+            processes += 1
+        return total, processes
+
+
+_spools: dict = {}
+_spools_lock = threading.Lock()
+
+
+def _shared_spool(metrics: ToolMetrics, directory: str) -> MetricsSpool:
+    # One spool per metrics object and directory, however many apps serve it;
+    # a second one would count the same calls twice.
+    with _spools_lock:
+        key = (id(metrics), os.path.abspath(directory))
+        if key not in _spools:
+            _spools[key] = MetricsSpool(metrics, directory).start()
+        return _spools[key]
+
+
+def instrument_fastmcp(mcp: Any, metrics: ToolMetrics) -> None:
+    """Time the list_tools and call_tool handlers of a FastMCP server.
+
+    Wraps the low-level request handlers, so the recorded latency covers
+    argument validation, the tool and the conversion of its result.
+    """
+    from mcp import types
+
+    handlers = mcp._mcp_server.request_handlers
+    call_tool = handlers[types.CallToolRequest]
+    list_tools = handlers[types.ListToolsRequest]
+
+    async def timed_call_tool(request):
+        started = time.perf_counter()
+        failed = True
+        result = None
+        try:
+            result = await call_tool(request)
+            failed = result.root.isError
+            return result
+        finally:
+            metrics.observe_call(
+                request.params.name,
+                time.perf_counter() - started,
+                error=failed,
+                arguments_size=argument_bytes(request.params.arguments or {}),
+                result_size=content_bytes(result.root.content) if result is not None else None,
+            )
+
+    async def timed_list_tools(request):
+        started = time.perf_counter()
+        try:
+            return await list_tools(request)
+        finally:
+            metrics.observe_list_tools(time.perf_counter() - started)
+
+    handlers[types.CallToolRequest] = timed_call_tool
+    handlers[types.ListToolsRequest] = timed_list_tools
+
+
+def add_metrics_route(
+    mcp: Any, metrics: ToolMetrics, path: str = "/metrics", shared_directory: str | None = None
+) -> None:
+    """Serve ``metrics`` in Prometheus text format on a FastMCP server's HTTP app.
+
+    With a ``shared_directory`` (default: ``MCP_METRICS_DIR``), the response
+    covers every worker process using that directory; see ``MetricsSpool``.
+    """
+    import anyio.to_thread
+    from starlette.responses import PlainTextResponse
+
+    shared_directory = shared_directory or os.environ.get("MCP_METRICS_DIR")
+    spool = _shared_spool(metrics, shared_directory) if shared_directory else None
+
+    @mcp.custom_route(path, methods=["GET"])
+    async def prometheus_metrics(request):
+        if spool is None:
+            text = metrics.render_prometheus()
+        else:
+            # Waits briefly for the other workers to write their counters.
+            combined, processes = await anyio.to_thread.run_sync(spool.combined)
+            text = combined.render_prometheus() + (
+                "# HELP mcp_metrics_processes Worker processes, current and exited in this run, summed into these metrics.\n"
+                "# TYPE mcp_metrics_processes gauge\n"
+                f"mcp_metrics_processes {processes}\n"
+            )
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
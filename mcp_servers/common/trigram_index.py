@@ -0,0 +1,613 @@
+"""Persistent trigram index over a directory tree, used to narrow search_files.
+
+The index maps every (ASCII-lowercased) three-byte sequence to the files that
+contain it. A search takes the trigrams its query must contain, intersects
+their posting lists and only reads the surviving candidates.
+
+Postings live in SQLite in segments: each refresh writes the files it
+(re)indexed as one new segment, with the file ids of a trigram stored as a
+zlib-compressed array of deltas. Changed and deleted files get new ids or
+none, so their old postings are simply ignored until ``compact`` merges the
+segments and drops them.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import defaultdict
+from itertools import accumulate
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process refresh lock.
+    fcntl = None
+
+BINARY_SNIFF_BYTES = 8192
+# A segment is flushed once it holds this many postings, bounding build memory.
+SEGMENT_POSTINGS = 4_000_000
+MAX_SEGMENTS = 16
+# Intersection stops once this few candidates are left; verification reads them.
+CANDIDATE_TARGET = 64
+COMMON_TRIGRAM_SHARE = 0.25
+QUERY_BATCH = 500
+
+
+def trigrams_of(data: bytes) -> set:
+    """Distinct trigrams of ``data`` as (byte, byte, byte) tuples, ASCII-lowercased."""
+    data = data.lower()
+    return set(zip(data, data[1:], data[2:]))
+
+
+def _encode_ids(ids: array) -> bytes:
+    deltas = array("I", [ids[0]])
+    deltas.extend(b - a for a, b in zip(ids, ids[1:]))
+    return zlib.compress(deltas.tobytes(), 1)
+
+
+def _decode_ids(blob: bytes):
+    deltas = array("I")
+    deltas.frombytes(zlib.decompress(blob))
+    return accumulate(deltas)
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Index just past the group or class starting at ``pattern[i]``."""
+    if pattern[i] == "[":
+        i += 1
+        if i < len(pattern) and pattern[i] == "^":
+            i += 1
+        if i < len(pattern) and pattern[i] == "]":
+            i += 1
+        while i < len(pattern) and pattern[i] != "]":
+            i += 2 if pattern[i] == "\\" else 1
+        return i + 1
+    depth = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            i = _skip_group(pattern, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+        elif c in "[(":
+            i = _skip_group(pattern, i)
+        elif c == "|":
+            return True
+        else:
+            i += 1
+    return False
+
+
+QUANTIFIER_RE = re.compile(r"[*?]|\{\d*(?:,\d*)?\}")
+GROUP_QUANTIFIER_RE = re.compile(r"[*?+]|\{\d*(?:,\d*)?\}")
+# Escapes that take arguments, e.g. \x41, \N{DASH} or a backreference like \12.
+ESCAPE_ARGUMENT_RE = re.compile(r"x[0-9a-fA-F]{0,2}|u[0-9a-fA-F]{0,4}|U[0-9a-fA-F]{0,8}|N\{[^}]*\}|\d+")
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+
+def regex_literals(pattern: str) -> list[str]:
+    """Literal strings every match of ``pattern`` must contain (conservative).
+
+    Groups, classes, anchors and escapes like ``\\w`` end a literal run; a
+    character made optional by ``*``, ``?`` or ``{}`` is dropped. A top-level
+    ``|`` or verbose mode yields no literals at all.
+    """
+    if _has_top_level_alternation(pattern) or re.search(r"\(\?[a-zA-Z]*x", pattern):
+        return []
+    literals = []
+    current = []
+
+    def flush():
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            following = pattern[i + 1 : i + 2]
+            if following in ESCAPES:
+                char = ESCAPES[following]
+                i += 2
+            elif following and not following.isalnum():
+                char = following
+                i += 2
+            else:
+                flush()
+                argument = ESCAPE_ARGUMENT_RE.match(pattern, i + 1)
+                i = argument.end() if argument else i + 2
+                continue
+        elif c in "[(":
+            flush()
+            i = _skip_group(pattern, i)
+            quantifier = GROUP_QUANTIFIER_RE.match(pattern, i)
+            if quantifier:
+                i = quantifier.end()
+            continue
+        elif c in ".^$)|+*?{":
+            flush()
+            i += 1
+            continue
+        else:
+            char = c
+            i += 1
+
+        quantifier = QUANTIFIER_RE.match(pattern, i)
+        if quantifier:
+            # The character may be absent.
+            flush()
+            i = quantifier.end()
+            if pattern[i : i + 1] in ("?", "+"):
+                i += 1
+        elif pattern[i : i + 1] == "+":
+            current.append(char)
+            flush()
+            i += 1
+            if pattern[i : i + 1] in ("?", "+"):
+                i += 1
+        else:
+            current.append(char)
+    flush()
+    return literals
+
+
+def query_trigrams(literals: list[str], case_sensitive: bool = True) -> set:
+    """Trigrams the literals require, as lowercase byte tuples.
+
+    Case-insensitive queries drop non-ASCII trigrams, since the index only
+    folds ASCII case.
+    """
+    required = set()
+    for literal in literals:
+        for trigram in trigrams_of(literal.encode("utf-8")):
+            if case_sensitive or max(trigram) < 0x80:
+                required.add(trigram)
+    return required
+
+
+POSTINGS_SCHEMA = (
+    " (trigram BLOB NOT NULL,"
+    " segment INTEGER NOT NULL,"
+    " count INTEGER NOT NULL,"
+    " ids BLOB NOT NULL,"
+    " PRIMARY KEY (trigram, segment)) WITHOUT ROWID"
+)
+
+
+class TrigramIndex:
+    """Trigram index over the regular files under ``root``, kept in an SQLite file.
+
+    ``refresh`` walks the tree, compares each file's (mtime_ns, size) with the
+    index and reads only new or changed files. It runs at most every
+    ``refresh_interval`` seconds unless forced. Walking, reading and encoding
+    happen outside the lock that searches take, which is only held while a
+    batch is committed, so searches keep using the current index meanwhile.
+
+    Several processes (e.g. HTTP workers) may share one index file: a file
+    lock lets one of them refresh at a time, and the others reload their view
+    when SQLite reports that another connection changed the data.
+    """
+
+    def __init__(
+        self,
+        root,
+        path,
+        refresh_interval=10.0,
+        skip_dirs=frozenset(),
+        max_file_bytes=4 * 1024 * 1024,
+    ):
+        self.root = Path(root).resolve()
+        self.path = str(path)
+        self.refresh_interval = refresh_interval
+        self.skip_dirs = skip_dirs
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+        # Only one refresh (or compaction) at a time; it alone changes the index.
+        self._refresh_lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.path + ".lock", "a+") if fcntl else None
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " path TEXT UNIQUE NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " indexed INTEGER NOT NULL)"
+        )
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS postings{POSTINGS_SCHEMA}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        # Paths of indexed (text) files by id; postings of ids missing here are dead.
+        self._paths = {}
+        self._files = {}  # path -> (id, mtime_ns, size)
+        self._data_version = None
+        self._reload()
+        # False until the first refresh completes, for an index that starts empty.
+        self.built = bool(self._files)
+        self._checked_at = 0.0
+        self._stale = True
+        self.files_indexed = 0
+        self.files_removed = 0
+        self.last_refresh_seconds = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reload(self):
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._files.clear()
+        self._paths.clear()
+        for file_id, relative, mtime_ns, size, indexed in self._conn.execute(
+            "SELECT id, path, mtime_ns, size, indexed FROM files"
+        ):
+            self._files[relative] = (file_id, mtime_ns, size)
+            if indexed:
+                self._paths[file_id] = relative
+
+    def _sync(self):
+        """Reload if another connection (process) committed since we last looked; needs the lock."""
+        if self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+            self._reload()
+            self.built = self.built or bool(self._files)
+
+    def _meta(self, key, default=0):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value, conn=None):
+        (conn or self._conn).execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _transaction(self, func):
+        """Run ``func()`` in one transaction on the shared connection, under the lock."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                result = func()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._reload()
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def mark_stale(self):
+        self._stale = True
+
+    @property
+    def refresh_due(self):
+        return self._stale or time.monotonic() - self._checked_at >= self.refresh_interval
+
+    def _scan(self):
+        """Yield (relative posix path, mtime_ns, size) for regular files, iteratively."""
+        index_path = os.path.abspath(self.path)
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in self.skip_dirs:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if entry.path.startswith(index_path):
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                        relative = os.path.relpath(entry.path, self.root).replace(os.sep, "/")
+                        yield relative, st.st_mtime_ns, st.st_size
+                except OSError:
+                    continue
+
+    def _read_trigrams(self, relative, size):
+        """The file's trigrams, or None when it is binary, too large or unreadable."""
+        if size > self.max_file_bytes:
+            return None
+        try:
+            with open(self.root / relative, "rb") as f:
+                data = f.read(self.max_file_bytes + 1)
+        except OSError:
+            return None
+        if len(data) > self.max_file_bytes or b"\0" in data[:BINARY_SNIFF_BYTES]:
+            return None
+        return trigrams_of(data)
+
+    def refresh(self, force=False, wait=True):
+        """Index new and changed files and forget deleted ones; returns True if it changed.
+
+        With ``wait=False`` it returns at once if another refresh is running.
+        """
+        now = time.monotonic()
+        if not (force or self.refresh_due):
+            return False
+        if not self._refresh_lock.acquire(blocking=wait):
+            return False
+        try:
+            if self._lock_file is not None:
+                try:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    return False
+            try:
+                with self._lock:
+                    self._sync()
+                return self._refresh(now)
+            finally:
+                if self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self, now):
+        started = time.perf_counter()
+        seen = set()
+        changed = []
+        for relative, mtime_ns, size in self._scan():
+            seen.add(relative)
+            known = self._files.get(relative)
+            if known is None or known[1] != mtime_ns or known[2] != size:
+                changed.append((relative, mtime_ns, size))
+        removed = [relative for relative in self._files if relative not in seen]
+        stale = removed + [relative for relative, _, _ in changed if relative in self._files]
+
+        def forget():
+            dead = self._meta("dead_files") + len(stale)
+            for relative in stale:
+                file_id = self._files.pop(relative)[0]
+                self._paths.pop(file_id, None)
+                self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            self._set_meta("dead_files", dead)
+            return dead
+
+        if stale:
+            dead = self._transaction(forget)
+        else:
+            with self._lock:
+                dead = self._meta("dead_files")
+
+        batch = []
+        postings = defaultdict(lambda: array("I"))
+        pending = 0
+        first_id = self._next_file_id()
+        for relative, mtime_ns, size in changed:
+            trigrams = self._read_trigrams(relative, size)
+            file_id = first_id + len(batch)
+            batch.append((relative, mtime_ns, size, trigrams is not None))
+            if trigrams:
+                for trigram in trigrams:
+                    postings[trigram].append(file_id)
+                pending += len(trigrams)
+            if pending >= SEGMENT_POSTINGS:
+                self._add_segment(first_id, batch, postings)
+                batch, pending = [], 0
+                postings = defaultdict(lambda: array("I"))
+                first_id = self._next_file_id()
+        if batch:
+            self._add_segment(first_id, batch, postings)
+
+        self.files_indexed += len(changed)
+        self.files_removed += len(removed)
+        if self._segment_count() > MAX_SEGMENTS or dead > max(1000, len(self._files) // 4):
+            self._compact()
+        self._checked_at = now
+        self._stale = False
+        self.built = True
+        self.last_refresh_seconds = round(time.perf_counter() - started, 3)
+        return bool(changed or removed)
+
+    def _next_file_id(self):
+        # Only the refresh thread inserts files, so ids can be assigned up front
+        # and postings built and encoded before taking the lock.
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'files'"
+            ).fetchone()
+        return (row[0] if row else 0) + 1
+
+    def _add_segment(self, first_id, batch, postings):
+        """Commit a batch of files, numbered from ``first_id``, and their postings as one segment."""
+        with self._lock:
+            segment = self._meta("next_segment") + 1
+        rows = [
+            (bytes(trigram), segment, len(ids), _encode_ids(ids)) for trigram, ids in postings.items()
+        ]
+
+        def commit():
+            self._conn.executemany(
+                "INSERT INTO files (id, path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (file_id, relative, mtime_ns, size, indexed)
+                    for file_id, (relative, mtime_ns, size, indexed) in enumerate(batch, first_id)
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (trigram, segment, count, ids) VALUES (?, ?, ?, ?)", rows
+            )
+            self._set_meta("next_segment", segment)
+            for file_id, (relative, mtime_ns, size, indexed) in enumerate(batch, first_id):
+                self._files[relative] = (file_id, mtime_ns, size)
+                if indexed:
+                    self._paths[file_id] = relative
+
+        self._transaction(commit)
+
+    def _segment_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT segment) FROM postings").fetchone()[0]
+
+    def compact(self):
+        with self._refresh_lock:
+            if self._lock_file is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                with self._lock:
+                    self._sync()
+                self._compact()
+            finally:
+                if self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _compact(self):
+        """Merge all segments into one, dropping postings of dead file ids.
+
+        The merged table is written on a second connection; searches only wait
+        for the final swap.
+        """
+        live = set(self._paths)
+        with self._lock:
+            segment = self._meta("next_segment") + 1
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            conn.execute("DROP TABLE IF EXISTS postings_merged")
+            conn.execute(f"CREATE TABLE postings_merged{POSTINGS_SCHEMA}")
+
+            def merged():
+                current, ids = None, array("I")
+                for trigram, blob in conn.execute(
+                    "SELECT trigram, ids FROM postings ORDER BY trigram, segment"
+                ):
+                    if trigram != current:
+                        if ids:
+                            yield current, segment, len(ids), _encode_ids(ids)
+                        current, ids = trigram, array("I")
+                    # Segments are in id order, so the merged list stays sorted.
+                    ids.extend(file_id for file_id in _decode_ids(blob) if file_id in live)
+                if ids:
+                    yield current, segment, len(ids), _encode_ids(ids)
+
+            conn.executemany(
+                "INSERT INTO postings_merged (trigram, segment, count, ids) VALUES (?, ?, ?, ?)",
+                merged(),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        def swap():
+            self._conn.execute("DROP TABLE postings")
+            self._conn.execute("ALTER TABLE postings_merged RENAME TO postings")
+            self._set_meta("next_segment", segment)
+            self._set_meta("dead_files", 0)
+
+        self._transaction(swap)
+        with self._lock:
+            # The merged table came from our own second connection; nothing to reload.
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def candidates(self, trigrams):
+        """Sorted relative paths of indexed files containing all ``trigrams``.
+
+        With no trigrams every indexed file is a candidate. The intersection
+        starts from the rarest trigram and may stop early, so candidates can
+        still fail verification.
+        """
+        with self._lock:
+            self._sync()
+            if not trigrams:
+                return sorted(self._paths.values())
+            keys = [bytes(trigram) for trigram in trigrams]
+            counts = {}
+            for start in range(0, len(keys), QUERY_BATCH):
+                batch = keys[start : start + QUERY_BATCH]
+                counts.update(
+                    self._conn.execute(
+                        "SELECT trigram, SUM(count) FROM postings"
+                        f" WHERE trigram IN ({','.join('?' * len(batch))}) GROUP BY trigram",
+                        batch,
+                    )
+                )
+            if len(counts) < len(keys):
+                return []
+            result = None
+            for key in sorted(keys, key=counts.__getitem__):
+                if result is not None and counts[key] > len(self._paths) * COMMON_TRIGRAM_SHARE:
+                    # Decoding a trigram most files contain costs more than it narrows.
+                    break
+                ids = set()
+                for (blob,) in self._conn.execute(
+                    "SELECT ids FROM postings WHERE trigram = ?", (key,)
+                ):
+                    ids.update(_decode_ids(blob))
+                result = ids if result is None else result & ids
+                if len(result) <= CANDIDATE_TARGET:
+                    break
+            return sorted(self._paths[file_id] for file_id in result if file_id in self._paths)
+
+    def stats(self):
+        with self._lock:
+            postings, trigrams = self._conn.execute(
+                "SELECT COALESCE(SUM(count), 0), COUNT(DISTINCT trigram) FROM postings"
+            ).fetchone()
+            segments = self._conn.execute(
+                "SELECT COUNT(DISTINCT segment) FROM postings"
+            ).fetchone()[0]
+            dead = self._meta("dead_files")
+            files = len(self._files)
+            text_files = len(self._paths)
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return {
+            "root": str(self.root),
+            "path": self.path,
+            "built": self.built,
+            "files": files,
+            "text_files": text_files,
+            "trigrams": trigrams,
+            "postings": postings,
+            "segments": segments,
+            "dead_files": dead,
+            "bytes": size,
+            "files_indexed": self.files_indexed,
+            "files_removed": self.files_removed,
+            "last_refresh_seconds": self.last_refresh_seconds,
+        }
+
+    def close(self):
+        with self._refresh_lock, self._lock:
+            self._conn.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
@@ -12,38 +12,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 from pathlib import Path
 import sys
 
 from mcp.server.fastmcp import FastMCP
+import uvicorn
 
-
-mcp = FastMCP("Filesystem Server", host="localhost", port=3000)
-
-
-@mcp.tool(description="Read contents of a file")
-def read_file(filepath: str) -> str:
-    """Read and return the contents of a file."""
-    with open(filepath, "r", encoding="utf-8") as f:
-        return f.read()
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "common"))
+from filesystem_tools import register_filesystem_tools  # noqa: E402
+from http_compression import compressed  # noqa: E402
 
 
-@mcp.tool(description="List contents of a directory")
-def list_directory(dirpath: str) -> list:
-    """List all files and directories in the given directory."""
-    return os.listdir(dirpath)
-
-
-@mcp.tool(description="Get current working directory")
-def get_cwd() -> str:
-    """Return the current working directory."""
-    return str(Path.cwd())
+mcp = FastMCP("Filesystem Server", host="localhost", port=3000)
+register_filesystem_tools(mcp)
 
 
 def main() -> None:
     try:
-        mcp.run(transport="sse")
+        # Same as mcp.run(transport="sse"), with responses compressed per Accept-Encoding.
+        uvicorn.run(
+            compressed(mcp.sse_app()),
+            host=mcp.settings.host,
+            port=mcp.settings.port,
+            log_level=mcp.settings.log_level.lower(),
+        )
     except KeyboardInterrupt:
         print("\nServer shutting down gracefully...")
     except Exception as e:
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable
+
+WAIT_SAMPLES = 1024
+
+
+class Overloaded(Exception):
+    """A call was turned away because its tool's queue was full or it waited too long."""
+
+    def __init__(self, tool_name: str, reason: str, queue_depth: int, retry_after: float) -> None:
+        super().__init__(f"{tool_name} overloaded: {reason}")
+        self.tool_name = tool_name
+        self.reason = reason
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "error": "overloaded",
+            "tool": self.tool_name,
+            "reason": self.reason,
+            "queue_depth": self.queue_depth,
+            "retry_after": round(self.retry_after, 3),
+        }
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+@dataclass
+class _ToolQueue:
+    waiters: deque[asyncio.Future] = field(default_factory=deque)
+    max_concurrency: int | None = None
+    running: int = 0
+    admitted: int = 0
+    queue_full: int = 0
+    wait_timeouts: int = 0
+    max_depth: int = 0
+    waits: deque[float] = field(default_factory=lambda: deque(maxlen=WAIT_SAMPLES))
+
+    def has_room(self) -> bool:
+        return not self.max_concurrency or self.running < self.max_concurrency
+
+    def recent_waits(self) -> list[float]:
+        return sorted(self.waits)
+
+
+class AdmissionController:
+    """Bounds concurrent tool calls, queueing the excess per tool.
+
+    A call starts at once when fewer than ``max_in_flight`` calls are running
+    (``None`` means no global limit) and its tool is under its own
+    ``max_concurrency``. Otherwise it joins that tool's FIFO queue. A full
+    queue (``max_queue`` waiting calls) rejects the call immediately, and a
+    call that waits longer than ``max_wait`` seconds gives up. Both raise
+    ``Overloaded``. Freed slots go to the tools with waiting calls in
+    round-robin order, so one busy tool cannot starve the others, and a new
+    call never starts ahead of a queued call that could use the same slot.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int | None = None,
+        max_queue: int = 64,
+        max_wait: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_in_flight = max_in_flight if max_in_flight and max_in_flight > 0 else None
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._clock = clock
+        self._queues: OrderedDict[str, _ToolQueue] = OrderedDict()
+        self.in_flight = 0
+
+    def _global_room(self) -> bool:
+        return self.max_in_flight is None or self.in_flight < self.max_in_flight
+
+    def _release(self, queue: _ToolQueue) -> None:
+        self.in_flight -= 1
+        queue.running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        granted = True
+        while granted and self._global_room():
+            granted = False
+            for tool_name, queue in list(self._queues.items()):
+                if not queue.waiters or not queue.has_room():
+                    continue
+                queue.waiters.popleft().set_result(self._clock())
+                # The slot is taken on the waiter's behalf; it records its wait.
+                self.in_flight += 1
+                queue.running += 1
+                self._queues.move_to_end(tool_name)
+                granted = True
+                break
+
+    def _retry_after(self, queue: _ToolQueue) -> float:
+        waits = queue.recent_waits()
+        return max(0.05, _percentile(waits, 0.5))
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        tool_name: str,
+        *,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        max_wait: float | None = None,
+    ) -> AsyncIterator[None]:
+        """Hold a slot for one call of ``tool_name`` while the block runs."""
+        queue = self._queues.get(tool_name)
+        if queue is None:
+            queue = self._queues[tool_name] = _ToolQueue()
+        queue.max_concurrency = max_concurrency
+        queued_at = self._clock()
+        # Calls already queued for a slot they can use now, e.g. after a raised
+        # max_concurrency, get it first; any room left afterwards is free.
+        self._dispatch()
+
+        if not queue.waiters and queue.has_room() and self._global_room():
+            self.in_flight += 1
+            queue.running += 1
+            queue.admitted += 1
+            queue.waits.append(0.0)
+        else:
+            limit = self.max_queue if max_queue is None else max_queue
+            depth = len(queue.waiters)
+            if depth >= limit:
+                queue.queue_full += 1
+                raise Overloaded(tool_name, "queue_full", depth, self._retry_after(queue))
+
+            future = asyncio.get_running_loop().create_future()
+            queue.waiters.append(future)
+            queue.max_depth = max(queue.max_depth, len(queue.waiters))
+            timeout = self.max_wait if max_wait is None else max_wait
+            try:
+                await asyncio.wait({future}, timeout=timeout)
+            except asyncio.CancelledError:
+                if future.done():
+                    self._release(queue)
+                else:
+                    queue.waiters.remove(future)
+                raise
+            if not future.done():
+                queue.waiters.remove(future)
+                queue.wait_timeouts += 1
+                raise Overloaded(tool_name, "wait_timeout", len(queue.waiters), self._retry_after(queue))
+            queue.admitted += 1
+            queue.waits.append(future.result() - queued_at)
+
+        try:
+            yield
+        finally:
+            self._release(queue)
+
+    def stats(self) -> dict[str, Any]:
+        tools = {}
+        for tool_name, queue in sorted(self._queues.items()):
+            waits = queue.recent_waits()
+            tools[tool_name] = {
+                "running": queue.running,
+                "queued": len(queue.waiters),
+                "max_queued": queue.max_depth,
+                "admitted": queue.admitted,
+                "rejected_queue_full": queue.queue_full,
+                "rejected_wait_timeout": queue.wait_timeouts,
+                "wait_ms": {
+                    "p50": round(_percentile(waits, 0.5) * 1000, 2),
+                    "p95": round(_percentile(waits, 0.95) * 1000, 2),
+                    "p99": round(_percentile(waits, 0.99) * 1000, 2),
+                    "max": round(waits[-1] * 1000, 2) if waits else 0.0,
+                },
+            }
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "max_queue": self.max_queue,
+            "max_wait": self.max_wait,
+            "admitted": sum(queue.admitted for queue in self._queues.values()),
+            "rejected": {
+                "queue_full": sum(queue.queue_full for queue in self._queues.values()),
+                "wait_timeout": sum(queue.wait_timeouts for queue in self._queues.values()),
+            },
+            "tools": tools,
+        }
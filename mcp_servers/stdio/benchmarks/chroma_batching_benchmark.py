@@ -0,0 +1,80 @@
+"""Measure embedding round-trips for single, concurrent and batched retrieval.
+
+Runs ``retrieve_documents`` sequentially and from concurrent threads (where
+the micro-batcher should merge embedding requests), then answers the same
+queries with one ``retrieve_documents_batch`` call. Uses a fake Ollama
+endpoint with a fixed per-request delay, so no model is needed.
+
+Usage:
+    python mcp_servers/stdio/benchmarks/chroma_batching_benchmark.py --queries 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from chroma_fixture import (
+    FakeOllama,
+    load_chroma_module,
+    seed_collection,
+    synthetic_corpus,
+    synthetic_queries,
+)
+
+
+def _report(label: str, fake: FakeOllama, elapsed: float, queries: int) -> None:
+    print(
+        f"{label:<28} {elapsed * 1000:9.1f} ms total  "
+        f"{elapsed * 1000 / queries:7.2f} ms/query  "
+        f"{fake.requests:4d} embed requests"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--embed-delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    queries = synthetic_queries(args.queries)
+    with tempfile.TemporaryDirectory() as tmp, FakeOllama(
+        request_delay=args.embed_delay_ms / 1000
+    ) as fake:
+        # The query-embedding cache would hide the round-trips being measured.
+        chroma = load_chroma_module(Path(tmp) / "db", fake, CHROMA_EMBEDDING_CACHE="")
+        seed_collection(chroma, synthetic_corpus(args.documents))
+
+        fake.reset_counters()
+        started = time.perf_counter()
+        sequential = [chroma.retrieve_documents(query, args.k) for query in queries]
+        _report("sequential single", fake, time.perf_counter() - started, len(queries))
+
+        fake.reset_counters()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            concurrent = list(
+                pool.map(lambda query: chroma.retrieve_documents(query, args.k), queries)
+            )
+        _report("concurrent single", fake, time.perf_counter() - started, len(queries))
+
+        fake.reset_counters()
+        started = time.perf_counter()
+        batched = json.loads(chroma.retrieve_documents_batch(queries, args.k))
+        _report("retrieve_documents_batch", fake, time.perf_counter() - started, len(queries))
+
+    same = all(
+        json.loads(single) == entry["documents"] == json.loads(parallel)
+        for single, parallel, entry in zip(sequential, concurrent, batched)
+    )
+    print(f"results identical across modes: {same}")
+
+
+if __name__ == "__main__":
+    main()
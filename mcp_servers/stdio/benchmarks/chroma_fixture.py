@@ -0,0 +1,74 @@
+"""Shared setup for benchmarks of the chromadb tool module.
+
+Loads ``chromadb/tool_modules/chroma.py`` against a temporary Chroma
+directory and a ``FakeOllama`` endpoint, and seeds it with a synthetic corpus.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import random
+import sys
+from pathlib import Path
+from types import ModuleType
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+CHROMA_TOOL_MODULES = BENCHMARKS_DIR.parent / "chromadb" / "tool_modules"
+
+if str(BENCHMARKS_DIR) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS_DIR))
+
+from fake_ollama import FakeOllama  # noqa: E402
+
+VOCABULARY = (
+    "pip wheel setuptools virtualenv poetry conda package install upgrade version "
+    "dependency resolver lockfile index mirror cache build sdist editable requirement "
+    "python import module namespace path site venv interpreter runtime linker "
+    "chroma vector embedding query collection retrieval ranking score document chunk"
+).split()
+
+
+def synthetic_corpus(size: int, words_per_doc: int = 40, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        f"doc-{index} " + " ".join(rng.choices(VOCABULARY, k=words_per_doc))
+        for index in range(size)
+    ]
+
+
+def synthetic_queries(count: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(VOCABULARY, 3)) for _ in range(count)]
+
+
+def load_chroma_module(
+    persist_directory: Path, fake: FakeOllama, **env: str
+) -> ModuleType:
+    """Import a fresh copy of the chroma tool module wired to ``fake``."""
+    os.environ["OLLAMA_HOST"] = fake.url
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(persist_directory)
+    os.environ.update(env)
+    if str(CHROMA_TOOL_MODULES) not in sys.path:
+        sys.path.insert(0, str(CHROMA_TOOL_MODULES))
+    # Shared helpers hold the store and read the environment at import time.
+    for helper in ("_chroma_store", "_embedding_cache", "_vector_mirror"):
+        sys.modules.pop(helper, None)
+
+    spec = importlib.util.spec_from_file_location(
+        "chroma_benchmark_module", CHROMA_TOOL_MODULES / "chroma.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed_collection(module: ModuleType, corpus: list[str], batch_size: int = 256) -> None:
+    store = module._get_vector_store()
+    for start in range(0, len(corpus), batch_size):
+        batch = corpus[start : start + batch_size]
+        store.add_texts(
+            batch,
+            metadatas=[{"source": f"synthetic/{start + i}"} for i in range(len(batch))],
+            ids=[f"synthetic-{start + i}" for i in range(len(batch))],
+        )
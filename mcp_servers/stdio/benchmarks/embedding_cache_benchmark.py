@@ -0,0 +1,71 @@
+"""Compare retrieve_documents latency with a cold and a warm query-embedding cache.
+
+The warm pass runs in a freshly imported copy of the chroma tool module, so it
+only benefits from what the SQLite cache persisted to disk. The fake Ollama
+endpoint adds a fixed delay per request to stand in for model time.
+
+Usage:
+    python mcp_servers/stdio/benchmarks/embedding_cache_benchmark.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from chroma_fixture import (
+    FakeOllama,
+    load_chroma_module,
+    seed_collection,
+    synthetic_corpus,
+    synthetic_queries,
+)
+
+
+def _timed_pass(chroma, queries: list[str], k: int) -> list[float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        chroma.retrieve_documents(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies: list[float], fake: FakeOllama) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<6} p50 {statistics.median(ordered):7.2f} ms  p95 {p95:7.2f} ms  "
+        f"{fake.requests:4d} embed requests"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--embed-delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    queries = synthetic_queries(args.queries)
+    with tempfile.TemporaryDirectory() as tmp, FakeOllama(
+        request_delay=args.embed_delay_ms / 1000
+    ) as fake:
+        env = {"CHROMA_EMBEDDING_CACHE": str(Path(tmp) / "query_embeddings.sqlite3")}
+        chroma = load_chroma_module(Path(tmp) / "db", fake, **env)
+        seed_collection(chroma, synthetic_corpus(args.documents))
+
+        fake.reset_counters()
+        _report("cold", _timed_pass(chroma, queries, args.k), fake)
+
+        chroma = load_chroma_module(Path(tmp) / "db", fake, **env)
+        fake.reset_counters()
+        _report("warm", _timed_pass(chroma, queries, args.k), fake)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Minimal stand-in for Ollama's ``/api/embed`` endpoint.
+
+Embeddings are deterministic hashed bag-of-words vectors, so texts that share
+words land close together and retrieval results are meaningful. Every request
+is counted, and an optional per-request and per-text delay imitates model time.
+
+Point the chroma tool at it with ``OLLAMA_HOST=http://127.0.0.1:<port>``, or
+run it standalone:
+    python mcp_servers/stdio/benchmarks/fake_ollama.py --port 11434
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORD_RE = re.compile(r"\w+")
+
+
+def fake_embedding(text: str, dimensions: int) -> list[float]:
+    vector = [0.0] * dimensions
+    for word in WORD_RE.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dimensions
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+class FakeOllama:
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        dimensions: int = 256,
+        request_delay: float = 0.0,
+        per_text_delay: float = 0.0,
+    ) -> None:
+        self.dimensions = dimensions
+        self.request_delay = request_delay
+        self.per_text_delay = per_text_delay
+        self.requests = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                if self.path != "/api/embed":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                texts = payload.get("input", [])
+                if isinstance(texts, str):
+                    texts = [texts]
+
+                with fake._lock:
+                    fake.requests += 1
+                    fake.texts += len(texts)
+                time.sleep(fake.request_delay + fake.per_text_delay * len(texts))
+
+                body = json.dumps(
+                    {
+                        "model": payload.get("model", ""),
+                        "embeddings": [
+                            fake_embedding(text, fake.dimensions) for text in texts
+                        ],
+                    }
+                ).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.texts = 0
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--request-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeOllama(
+        port=args.port, dimensions=args.dimensions, request_delay=args.request_delay
+    )
+    print(f"Fake Ollama listening on {fake.url}")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
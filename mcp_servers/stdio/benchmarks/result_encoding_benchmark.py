@@ -0,0 +1,93 @@
+"""Measure bytes and encode time of call_tool results.
+
+Compares the previous behaviour (``json.dumps(response, indent=2)`` on every
+result, including strings that already hold JSON) against the compact,
+single-encoding result encoder, with and without orjson.
+
+Usage:
+    python mcp_servers/stdio/benchmarks/result_encoding_benchmark.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+STDIO_ROOT = Path(__file__).resolve().parent.parent
+if str(STDIO_ROOT) not in sys.path:
+    sys.path.insert(0, str(STDIO_ROOT))
+
+import result_encoding
+from result_encoding import dumps_compact, make_result_encoder
+
+
+def _documents(count: int, content_size: int) -> list[dict]:
+    return [
+        {
+            "page_content": ('lorem "ipsum" dolor sit amet ' * content_size)[
+                :content_size
+            ],
+            "metadata": {"source": f"docs/file_{i}.md", "chunk": i},
+            "id": f"7c9e6679-7425-40de-944b-e07fc1f9{i:04d}",
+        }
+        for i in range(count)
+    ]
+
+
+def _payloads() -> dict[str, object]:
+    return {
+        "status dict": {"status": "success", "file_path": "out/mindmap.html"},
+        "retrieval k=4 (list)": _documents(4, 1000),
+        "retrieval k=4 (pre-encoded str)": json.dumps(_documents(4, 1000), indent=2),
+        "retrieval k=50 (list)": _documents(50, 2000),
+        "retrieval k=50 (pre-encoded str)": json.dumps(_documents(50, 2000), indent=2),
+    }
+
+
+def _legacy(tool_name: str, response: object) -> str:
+    return json.dumps(response, indent=2)
+
+
+def _wire_size(text: str) -> int:
+    # What actually crosses the stdio pipe: the text embedded in a JSON-RPC message.
+    return len(json.dumps(text).encode("utf-8"))
+
+
+def _measure(encode, response, number: int) -> tuple[float, int]:
+    result = encode("retrieve_documents", response)
+    text = result if isinstance(result, str) else result[0].text
+    seconds = min(
+        timeit.repeat(
+            lambda: encode("retrieve_documents", response), number=number, repeat=5
+        )
+    )
+    return seconds / number * 1e6, _wire_size(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    def stdlib_compact(value: object) -> str:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+    encoders = {
+        "legacy indent=2": _legacy,
+        "compact stdlib": make_result_encoder(stdlib_compact),
+    }
+    if result_encoding.orjson is not None:
+        encoders["compact orjson"] = make_result_encoder(dumps_compact)
+
+    print(f"{'payload':<34}{'encoder':<18}{'us/encode':>12}{'wire bytes':>14}")
+    for label, response in _payloads().items():
+        for name, encode in encoders.items():
+            micros, size = _measure(encode, response, args.number)
+            print(f"{label:<34}{name:<18}{micros:>12.1f}{size:>14,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Measure list_tools and call_tool throughput of the stdio runtime in-process.
+
+Builds a server with ``create_stdio_server`` over a generated tool module and
+drives it through a ``ClientSession`` connected by in-memory anyio streams,
+so the numbers cover the MCP session, dispatch, admission, executor and
+result encoding but no subprocess or pipe. The synthetic tools are:
+
+    trivial        returns its argument
+    cpu_bound      a pure-Python loop (holds the GIL)
+    io_sleep       time.sleep on the tool thread pool
+    large_payload  returns ~``--payload-kb`` KB of JSON
+
+Each scenario runs at every ``--concurrency`` level: that many client tasks
+issue requests back to back until ``--requests`` have completed. Results
+(requests per second, latency percentiles, errors) are printed and written to
+``--output`` as JSON; ``--baseline`` compares against an earlier output file.
+
+Usage:
+    python mcp_servers/stdio/benchmarks/runtime_benchmark.py --output runtime.json
+    python mcp_servers/stdio/benchmarks/runtime_benchmark.py --baseline runtime.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+STDIO_ROOT = Path(__file__).resolve().parent.parent
+if str(STDIO_ROOT) not in sys.path:
+    sys.path.insert(0, str(STDIO_ROOT))
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from dynamic_stdio_server import create_stdio_server
+from tool_executor import ToolExecutor
+
+SYNTHETIC_TOOLS = '''import time
+
+
+def trivial(value: int) -> int:
+    """Return the value."""
+    return value
+
+
+def cpu_bound(iterations: int) -> int:
+    """Sum squares in a Python loop."""
+    total = 0
+    for number in range(iterations):
+        total += number * number
+    return total
+
+
+def io_sleep(seconds: float) -> str:
+    """Block the calling thread for a while."""
+    time.sleep(seconds)
+    return "done"
+
+
+def large_payload(kilobytes: int) -> dict:
+    """Return about this many kilobytes of JSON."""
+    row = {"id": 0, "name": "item", "text": "lorem ipsum dolor sit amet " * 3}
+    rows = max(1, kilobytes * 1024 // 120)
+    return {"rows": [dict(row, id=number) for number in range(rows)]}
+'''
+
+
+def _scenarios(args) -> dict[str, tuple[str | None, dict]]:
+    # name -> (tool, arguments); a None tool means list_tools.
+    return {
+        "list_tools": (None, {}),
+        "trivial": ("trivial", {"value": 1}),
+        "cpu_bound": ("cpu_bound", {"iterations": args.cpu_iterations}),
+        "io_sleep": ("io_sleep", {"seconds": args.sleep_ms / 1000}),
+        "large_payload": ("large_payload", {"kilobytes": args.payload_kb}),
+    }
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def _run_level(session, tool, arguments, concurrency: int, requests: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    issued = 0
+
+    async def one() -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        if tool is None:
+            await session.list_tools()
+        else:
+            result = await session.call_tool(tool, arguments)
+            text = result.content[0].text if result.content else ""
+            if result.isError or text.startswith('{"error"'):
+                errors += 1
+        latencies.append(time.perf_counter() - started)
+
+    async def client() -> None:
+        nonlocal issued
+        while issued < requests:
+            issued += 1
+            await one()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+async def _benchmark(server_dir: Path, args) -> list[dict]:
+    executor = ToolExecutor(max_workers=args.tool_workers)
+    app, _ = create_stdio_server(server_dir, executor=executor, warmup=False)
+    rows = []
+    try:
+        async with create_connected_server_and_client_session(app) as session:
+            for name, (tool, arguments) in _scenarios(args).items():
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                await _run_level(session, tool, arguments, 1, args.warmup)
+                for concurrency in args.concurrency:
+                    requests = args.requests if name != "io_sleep" else args.sleep_requests
+                    row = await _run_level(session, tool, arguments, concurrency, requests)
+                    rows.append({"scenario": name, **row})
+                    print(
+                        f"{name:<14} {concurrency:>5} {row['requests_per_second']:>10.1f} "
+                        f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f} "
+                        f"{row['errors']:>6}"
+                    )
+    finally:
+        executor.shutdown()
+    return rows
+
+
+def _git_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=STDIO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def _compare(rows: list[dict], baseline_path: Path) -> None:
+    baseline = {
+        (row["scenario"], row["concurrency"]): row
+        for row in json.loads(baseline_path.read_text())["results"]
+    }
+    print(f"\nvs {baseline_path} (ratio = this run / baseline)")
+    print(f"{'scenario':<14} {'conc':>5} {'req/s':>8} {'p50':>8} {'p99':>8}")
+    for row in rows:
+        previous = baseline.get((row["scenario"], row["concurrency"]))
+        if previous is None:
+            continue
+        print(
+            f"{row['scenario']:<14} {row['concurrency']:>5} "
+            f"{row['requests_per_second'] / previous['requests_per_second']:>7.2f}x "
+            f"{row['p50_ms'] / previous['p50_ms']:>7.2f}x "
+            f"{row['p99_ms'] / previous['p99_ms']:>7.2f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario and level")
+    parser.add_argument("--sleep-requests", type=int, default=200, help="requests per level for io_sleep")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--scenarios", nargs="+", help="run only these scenarios")
+    parser.add_argument("--cpu-iterations", type=int, default=20000)
+    parser.add_argument("--sleep-ms", type=float, default=10.0)
+    parser.add_argument("--payload-kb", type=int, default=256)
+    parser.add_argument("--tool-workers", type=int, help="tool thread pool size (default: Python's)")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare with an earlier --output file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        server_dir = Path(tmp) / "synthetic"
+        (server_dir / "tool_modules").mkdir(parents=True)
+        (server_dir / "tool_modules" / "synthetic_tools.py").write_text(SYNTHETIC_TOOLS)
+        print(f"{'scenario':<14} {'conc':>5} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>6}")
+        rows = asyncio.run(_benchmark(server_dir, args))
+
+    if args.output:
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "settings": {
+                key: value for key, value in vars(args).items() if key not in ("output", "baseline")
+            },
+            "results": rows,
+        }
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+    if args.baseline:
+        _compare(rows, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
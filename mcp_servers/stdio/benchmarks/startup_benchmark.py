@@ -0,0 +1,126 @@
+"""Compare eager and manifest-backed lazy startup of a stdio tool server.
+
+Each trial runs in a fresh interpreter so module import caches do not leak
+between runs. Without ``--server-dir`` a synthetic server is generated whose
+tool modules sleep at import time to mimic heavy dependencies.
+
+Usage:
+    python mcp_servers/stdio/benchmarks/startup_benchmark.py
+    python mcp_servers/stdio/benchmarks/startup_benchmark.py --server-dir mcp_servers/stdio/chromadb
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+STDIO_ROOT = Path(__file__).resolve().parent.parent
+
+SYNTHETIC_MODULE = '''import time
+
+time.sleep({import_delay})
+
+
+def tool_{index}_a(query: str, k: int = 4) -> str:
+    """Synthetic tool {index}a."""
+    return query * k
+
+
+def tool_{index}_b(values: list[int]) -> int:
+    """Synthetic tool {index}b."""
+    return sum(values)
+'''
+
+
+def _write_synthetic_server(root: Path, modules: int, import_delay: float) -> Path:
+    tool_modules_dir = root / "synthetic" / "tool_modules"
+    tool_modules_dir.mkdir(parents=True)
+    (tool_modules_dir / "__init__.py").write_text("")
+    for index in range(modules):
+        (tool_modules_dir / f"module_{index}.py").write_text(
+            SYNTHETIC_MODULE.format(index=index, import_delay=import_delay)
+        )
+    return tool_modules_dir.parent
+
+
+def _child(server_dir: Path, lazy: bool) -> None:
+    import logging
+
+    started = time.perf_counter()
+    sys.path.insert(0, str(STDIO_ROOT))
+    from dynamic_stdio_server import create_stdio_server
+    from mcp import types as mcp_types
+
+    logging.disable(logging.INFO)
+    imported = time.perf_counter()
+    app, _ = create_stdio_server(server_dir, lazy_tools=lazy)
+    created = time.perf_counter()
+    result = asyncio.run(app.request_handlers[mcp_types.ListToolsRequest](None))
+    listed = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "runtime_import_ms": (imported - started) * 1000,
+                "create_server_ms": (created - imported) * 1000,
+                "first_list_tools_ms": (listed - created) * 1000,
+                "tools": len(result.root.tools),
+            }
+        )
+    )
+
+
+def _run_trial(server_dir: Path, lazy: bool) -> dict:
+    command = [sys.executable, __file__, "--child", str(server_dir)]
+    if lazy:
+        command.append("--lazy")
+    output = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def _summarize(label: str, trials: list[dict]) -> None:
+    ready = [t["create_server_ms"] + t["first_list_tools_ms"] for t in trials]
+    print(
+        f"{label:>5}: ready-to-list median {statistics.median(ready):8.1f} ms "
+        f"(min {min(ready):.1f}, max {max(ready):.1f}), "
+        f"runtime import {statistics.median(t['runtime_import_ms'] for t in trials):.1f} ms, "
+        f"{trials[0]['tools']} tools"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server-dir", type=Path)
+    parser.add_argument("--modules", type=int, default=5)
+    parser.add_argument("--import-delay", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--lazy", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.lazy)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_dir = args.server_dir
+        if server_dir is None:
+            server_dir = _write_synthetic_server(Path(tmp), args.modules, args.import_delay)
+        server_dir = server_dir.resolve()
+
+        eager = [_run_trial(server_dir, lazy=False) for _ in range(args.repeat)]
+        _run_trial(server_dir, lazy=True)  # writes the manifest
+        lazy = [_run_trial(server_dir, lazy=True) for _ in range(args.repeat)]
+
+    _summarize("eager", eager)
+    _summarize("lazy", lazy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare recall and latency of the numpy vector mirror against Chroma's index.
+
+Seeds a temporary collection from a fake Ollama endpoint, computes exact
+top-k neighbours by brute force, and reports recall@k and per-query latency
+for Chroma's HNSW query and for ``VectorMirror`` (float32 and float16). Also
+times ``retrieve_documents`` end to end with each engine, the mirror's cold
+build, and an incremental refresh after adding 1% more documents.
+
+Usage:
+    python mcp_servers/stdio/benchmarks/vector_mirror_benchmark.py --documents 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from chroma_fixture import (
+    FakeOllama,
+    load_chroma_module,
+    seed_collection,
+    synthetic_corpus,
+    synthetic_queries,
+)
+
+
+def _timed(func, items):
+    latencies, results = [], []
+    for item in items:
+        started = time.perf_counter()
+        results.append(func(item))
+        latencies.append(time.perf_counter() - started)
+    return results, latencies
+
+
+def _recall(found: list[list[str]], exact: list[dict[str, float]], k: int) -> float:
+    # Any id scoring at least the exact k-th score counts, so ties are not misses.
+    hits = 0
+    for found_ids, scores in zip(found, exact):
+        threshold = sorted(scores.values(), reverse=True)[k - 1] - 1e-6
+        hits += sum(1 for doc_id in found_ids if scores.get(doc_id, -2.0) >= threshold)
+    return hits / (k * len(exact))
+
+
+def _report(label: str, latencies: list[float], recall: float | None = None) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    recall_text = f"  recall@k {recall:.3f}" if recall is not None else ""
+    print(
+        f"{label:<34} p50 {statistics.median(latencies) * 1000:7.3f} ms  "
+        f"p95 {p95 * 1000:7.3f} ms{recall_text}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dimensions", type=int, default=768)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.documents + args.documents // 100)
+    queries = synthetic_queries(args.queries)
+    with tempfile.TemporaryDirectory() as tmp, FakeOllama(dimensions=args.dimensions) as fake:
+        chroma = load_chroma_module(
+            Path(tmp) / "db", fake, CHROMA_EMBED_BATCH_WINDOW_MS="0", CHROMA_SEARCH_ENGINE="numpy"
+        )
+        store_module = chroma._chroma_store
+        from _vector_mirror import VectorMirror
+
+        started = time.perf_counter()
+        seed_collection(chroma, corpus[: args.documents])
+        print(f"seeded {args.documents} documents in {time.perf_counter() - started:.1f} s")
+
+        collection = chroma._get_vector_store()._collection
+        query_vectors = store_module.get_query_embeddings().embed_documents(queries)
+
+        exported = collection.get(include=["embeddings"])
+        matrix = np.asarray(exported["embeddings"], dtype=np.float64)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        queries_matrix = np.asarray(query_vectors, dtype=np.float64)
+        scores = matrix @ queries_matrix.T
+        exact = [dict(zip(exported["ids"], column.tolist())) for column in scores.T]
+
+        found, latencies = _timed(
+            lambda vector: collection.query(
+                query_embeddings=[vector], n_results=args.k, include=[]
+            )["ids"][0],
+            query_vectors,
+        )
+        _report("chroma query", latencies, _recall(found, exact, args.k))
+
+        for dtype in ("float32", "float16"):
+            started = time.perf_counter()
+            mirror = VectorMirror(Path(tmp) / f"mirror_{dtype}", dtype)
+            mirror.refresh(collection, force=True)
+            build = time.perf_counter() - started
+            found, latencies = _timed(
+                lambda vector: [doc_id for doc_id, _ in mirror.search_many([vector], args.k)[0]],
+                query_vectors,
+            )
+            _report(f"numpy mirror {dtype} (build {build:.2f} s)", latencies, _recall(found, exact, args.k))
+
+        # Query embeddings come from the warm disk cache, so only search time differs.
+        for engine in ("chroma", "numpy"):
+            store_module.SEARCH_ENGINE = engine
+            chroma.retrieve_documents(queries[0], args.k)
+            _, latencies = _timed(lambda query: chroma.retrieve_documents(query, args.k), queries)
+            _report(f"retrieve_documents engine={engine}", latencies)
+
+        mirror = store_module.get_vector_mirror()
+        seed_collection(chroma, corpus)
+        mirror.mark_stale()
+        started = time.perf_counter()
+        mirror.refresh(collection)
+        print(
+            f"incremental refresh of {args.documents // 100} new rows: "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms ({mirror.stats()})"
+        )
+
+
+if __name__ == "__main__":
+    main()
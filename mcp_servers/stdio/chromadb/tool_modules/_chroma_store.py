@@ -0,0 +1,235 @@
+"""Chroma collection, embeddings and query-embedding plumbing shared by the chroma tools.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+"""
+
+import os
+import threading
+import time
+from langchain_chroma import Chroma
+from langchain_ollama import OllamaEmbeddings
+
+from _embedding_cache import CachedEmbeddings, EmbeddingCache
+
+EMBEDDING_MODEL = "nomic-embed-text:latest"
+COLLECTION_NAME = os.environ.get("CHROMA_COLLECTION", "example_collection")
+PERSIST_DIRECTORY = os.environ.get("CHROMA_PERSIST_DIRECTORY", "./chroma_langchain_db")
+
+# Single-query calls arriving within this window share one embedding request.
+EMBED_BATCH_WINDOW = float(os.environ.get("CHROMA_EMBED_BATCH_WINDOW_MS", "5")) / 1000
+EMBED_BATCH_MAX_SIZE = 64
+
+# Query embeddings are cached on disk; set CHROMA_EMBEDDING_CACHE="" to disable.
+EMBEDDING_CACHE_PATH = os.environ.get(
+    "CHROMA_EMBEDDING_CACHE", PERSIST_DIRECTORY.rstrip("/\\") + "_query_embeddings.sqlite3"
+)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("CHROMA_EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+# "numpy" answers similarity searches from an exact in-memory mirror of the
+# collection instead of Chroma's index (see _vector_mirror.py).
+SEARCH_ENGINE = os.environ.get("CHROMA_SEARCH_ENGINE", "chroma").lower()
+MIRROR_DIRECTORY = os.environ.get(
+    "CHROMA_MIRROR_DIRECTORY", PERSIST_DIRECTORY.rstrip("/\\") + "_mirror"
+)
+MIRROR_DTYPE = os.environ.get("CHROMA_MIRROR_DTYPE", "float32")
+MIRROR_REFRESH_SECONDS = float(os.environ.get("CHROMA_MIRROR_REFRESH_SECONDS", "30"))
+
+# BM25 index used by the lexical, hybrid and auto retrieval modes.
+LEXICAL_INDEX_PATH = os.environ.get(
+    "CHROMA_LEXICAL_INDEX", PERSIST_DIRECTORY.rstrip("/\\") + "_bm25.sqlite3"
+)
+
+_embeddings = None
+_query_embeddings = None
+_vector_store = None
+_query_batcher = None
+_vector_mirror = None
+_lexical_index = None
+_store_lock = threading.Lock()
+
+
+class _PendingEmbedding:
+    __slots__ = ("text", "done", "vector", "error")
+
+    def __init__(self, text):
+        self.text = text
+        self.done = threading.Event()
+        self.vector = None
+        self.error = None
+
+
+class EmbeddingMicroBatcher:
+    """Coalesces concurrent single-text embeddings into batched requests.
+
+    The first caller of a quiet period becomes the leader: it waits ``window``
+    seconds for other threads to enqueue their texts, embeds the whole queue
+    with one ``embed_documents`` call, and keeps draining until the queue is
+    empty. Everyone else just waits for their own result.
+    """
+
+    def __init__(self, embed_documents, window=EMBED_BATCH_WINDOW, max_batch_size=EMBED_BATCH_MAX_SIZE):
+        self._embed_documents = embed_documents
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._queue = []
+        self._leader_active = False
+        self.requests = 0
+        self.texts = 0
+
+    def embed(self, text):
+        pending = _PendingEmbedding(text)
+        with self._lock:
+            self._queue.append(pending)
+            is_leader = not self._leader_active
+            self._leader_active = True
+
+        if is_leader:
+            if self._window > 0:
+                time.sleep(self._window)
+            self._drain()
+
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.vector
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                batch = self._queue[: self._max_batch_size]
+                del self._queue[: self._max_batch_size]
+                if not batch:
+                    self._leader_active = False
+                    return
+
+            unique_texts = list(dict.fromkeys(item.text for item in batch))
+            try:
+                vectors = dict(zip(unique_texts, self._embed_documents(unique_texts)))
+                self.requests += 1
+                self.texts += len(unique_texts)
+                for item in batch:
+                    item.vector = vectors[item.text]
+            except Exception as e:
+                for item in batch:
+                    item.error = e
+            finally:
+                for item in batch:
+                    item.done.set()
+
+
+def get_vector_store():
+    global _embeddings, _query_embeddings, _vector_store, _query_batcher
+    if _vector_store is None:
+        with _store_lock:
+            if _vector_store is None:
+                # OllamaEmbeddings honours OLLAMA_HOST, so a local fake endpoint
+                # can stand in for the real model in tests and benchmarks.
+                _embeddings = OllamaEmbeddings(
+                    model=EMBEDDING_MODEL,
+                )
+                _query_embeddings = _embeddings
+                embed_batch = _embeddings.embed_documents
+                if EMBEDDING_CACHE_PATH:
+                    _query_embeddings = CachedEmbeddings(
+                        _embeddings,
+                        EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES),
+                        EMBEDDING_MODEL,
+                    )
+                    # embed_query has already looked these texts up.
+                    embed_batch = _query_embeddings.embed_missing
+                _query_batcher = EmbeddingMicroBatcher(embed_batch)
+                _vector_store = Chroma(
+                    collection_name=COLLECTION_NAME,
+                    embedding_function=_embeddings,
+                    persist_directory=PERSIST_DIRECTORY,
+                )
+    return _vector_store
+
+
+def embed_query(query):
+    get_vector_store()
+    # Cache hits skip the micro-batcher's collection window entirely.
+    if isinstance(_query_embeddings, CachedEmbeddings):
+        cached = _query_embeddings.cache.get_many(EMBEDDING_MODEL, [query])[0]
+        if cached is not None:
+            return cached
+    return _query_batcher.embed(query)
+
+
+def get_embeddings():
+    """Return the raw document embedding function (no query cache)."""
+    get_vector_store()
+    return _embeddings
+
+
+def get_query_embeddings():
+    """Return the query embedding function, wrapped by the disk cache when enabled."""
+    get_vector_store()
+    return _query_embeddings
+
+
+def get_vector_mirror():
+    """Return the refreshed numpy mirror, or None when CHROMA_SEARCH_ENGINE is not "numpy"."""
+    global _vector_mirror
+    if SEARCH_ENGINE != "numpy":
+        return None
+    store = get_vector_store()
+    if _vector_mirror is None:
+        with _store_lock:
+            if _vector_mirror is None:
+                from _vector_mirror import VectorMirror
+
+                _vector_mirror = VectorMirror(
+                    MIRROR_DIRECTORY,
+                    MIRROR_DTYPE,
+                    MIRROR_REFRESH_SECONDS,
+                    stamp=collection_stamp,
+                )
+    _vector_mirror.refresh(store._collection)
+    return _vector_mirror
+
+
+def get_lexical_index():
+    """Return the refreshed BM25 index of the collection's documents."""
+    global _lexical_index
+    store = get_vector_store()
+    if _lexical_index is None:
+        with _store_lock:
+            if _lexical_index is None:
+                from _lexical_index import LexicalIndex
+
+                _lexical_index = LexicalIndex(
+                    LEXICAL_INDEX_PATH, MIRROR_REFRESH_SECONDS, stamp=collection_stamp
+                )
+    _lexical_index.refresh(store._collection)
+    return _lexical_index
+
+
+def collection_stamp():
+    """Size and mtime of Chroma's SQLite files, which change on every write.
+
+    Lets the mirror and the BM25 index notice upserts that replace documents
+    without changing the collection's ids or count. None when the store is
+    not persisted there.
+    """
+    parts = []
+    for name in ("chroma.sqlite3", "chroma.sqlite3-wal"):
+        try:
+            st = os.stat(os.path.join(PERSIST_DIRECTORY, name))
+        except OSError:
+            continue
+        parts.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+    return ";".join(parts) or None
+
+
+def notify_collection_changed(appended=False):
+    """Called after writes to the collection so derived indexes refresh on next use.
+
+    Pass ``appended=True`` when the writes only added new ids, so the mirror
+    and the BM25 index can skip checking existing documents.
+    """
+    if _vector_mirror is not None:
+        _vector_mirror.mark_stale(appended=appended)
+    if _lexical_index is not None:
+        _lexical_index.mark_stale(appended=appended)
@@ -0,0 +1,275 @@
+"""BM25 inverted index over a Chroma collection's documents.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import sqlite3
+import threading
+import time
+
+# Identifiers such as "langchain-chroma", "numpy.linalg" or "c++" stay one
+# token; their parts are indexed as well.
+TOKEN_RE = re.compile(r"\w+(?:[.\-+]+\w+)*\+*")
+SYNC_PAGE_SIZE = 1000
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _digest(text):
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def tokenize(text):
+    tokens = []
+    for match in TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[^\w]+", token) if part)
+    return tokens
+
+
+class LexicalIndex:
+    """SQLite-backed BM25 index kept in step with a collection by id.
+
+    ``refresh`` adds postings for ids the index has not seen and removes those
+    of ids that left the collection, so only changed documents are tokenized.
+    Each document's text digest is stored with it. When the collection
+    ``stamp`` changed (see ``VectorMirror``) and the writes were not reported
+    as appends with ``mark_stale(appended=True)``, every document's digest is
+    compared, and documents upserted in place under the same id are
+    re-indexed. Like ``VectorMirror`` it re-checks the collection at most every
+    ``refresh_interval`` seconds unless marked stale.
+    """
+
+    def __init__(self, path, refresh_interval=30.0, stamp=None):
+        self.path = str(path)
+        self.refresh_interval = refresh_interval
+        self._stamp_function = stamp
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs"
+            " (id TEXT PRIMARY KEY, length INTEGER NOT NULL, digest TEXT)"
+        )
+        if "digest" not in {row[1] for row in self._conn.execute("PRAGMA table_info(docs)")}:
+            # Indexes built before digests were stored; NULL never matches, so
+            # the first full check re-indexes their documents.
+            self._conn.execute("ALTER TABLE docs ADD COLUMN digest TEXT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL,"
+            " doc_id TEXT NOT NULL,"
+            " tf INTEGER NOT NULL,"
+            " PRIMARY KEY (term, doc_id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id)")
+        self._doc_count, total_length = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+        self._total_length = total_length
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+        self._stamp = row[0] if row else None
+        self._checked_at = 0.0
+        self._checked_count = None
+        self._stale = True
+        self._append_only = False
+        self.documents_added = 0
+        self.documents_removed = 0
+        self.documents_updated = 0
+
+    def mark_stale(self, appended=False):
+        """Re-check on next use; ``appended`` says the writes only added new ids."""
+        self._append_only = appended and (self._append_only or not self._stale)
+        self._stale = True
+
+    def refresh(self, collection, force=False):
+        """Index added and updated documents and drop removed ones; returns True if it changed."""
+        now = time.monotonic()
+        if not (force or self._stale or now - self._checked_at >= self.refresh_interval):
+            return False
+
+        with self._lock:
+            stamp = self._stamp_function() if self._stamp_function is not None else None
+            written = stamp is not None and stamp != self._stamp
+            count = collection.count()
+            if (
+                not force
+                and not self._stale
+                and not written
+                and count == self._checked_count == self._doc_count
+            ):
+                self._checked_at = now
+                return False
+
+            known = dict(self._conn.execute("SELECT id, digest FROM docs"))
+            self._conn.execute("BEGIN")
+            try:
+                if written and known and not self._append_only:
+                    # Writes that may have replaced documents in place.
+                    changed = self._sync_all(collection, known)
+                else:
+                    changed = self._sync_ids(collection, known)
+                if stamp is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('stamp', ?)", (stamp,)
+                    )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._doc_count, self._total_length = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+                ).fetchone()
+                raise
+            self._conn.execute("COMMIT")
+
+            self._stamp = stamp
+            self._checked_at = now
+            self._checked_count = count
+            self._stale = False
+            self._append_only = False
+            return changed
+
+    def _sync_ids(self, collection, known):
+        current = set(collection.get(include=[])["ids"])
+        removed = [doc_id for doc_id in known if doc_id not in current]
+        added = [doc_id for doc_id in current if doc_id not in known]
+        self._remove(removed)
+        for start in range(0, len(added), SYNC_PAGE_SIZE):
+            page = collection.get(ids=added[start : start + SYNC_PAGE_SIZE], include=["documents"])
+            self._add(zip(page["ids"], page["documents"]))
+        return bool(removed or added)
+
+    def _sync_all(self, collection, known):
+        # Reads every document, but only tokenizes those whose digest changed.
+        seen = set()
+        changed = False
+        offset = 0
+        while True:
+            page = collection.get(include=["documents"], limit=SYNC_PAGE_SIZE, offset=offset)
+            if not page["ids"]:
+                break
+            offset += len(page["ids"])
+            seen.update(page["ids"])
+            stale = [
+                (doc_id, text)
+                for doc_id, text in zip(page["ids"], page["documents"])
+                if known.get(doc_id) != _digest(text)
+            ]
+            replaced = [(doc_id, text) for doc_id, text in stale if doc_id in known]
+            self._remove([doc_id for doc_id, _ in replaced], count=False)
+            self._add(replaced, count=False)
+            self._add((doc_id, text) for doc_id, text in stale if doc_id not in known)
+            self.documents_updated += len(replaced)
+            changed = changed or bool(stale)
+        removed = [doc_id for doc_id in known if doc_id not in seen]
+        self._remove(removed)
+        return changed or bool(removed)
+
+    def _add(self, documents, count=True):
+        for doc_id, text in documents:
+            tokens = tokenize(text or "")
+            frequencies = {}
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + 1
+            self._conn.execute(
+                "INSERT INTO docs (id, length, digest) VALUES (?, ?, ?)",
+                (doc_id, len(tokens), _digest(text)),
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                [(term, doc_id, tf) for term, tf in frequencies.items()],
+            )
+            self._conn.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, 1)"
+                " ON CONFLICT (term) DO UPDATE SET df = df + 1",
+                [(term,) for term in frequencies],
+            )
+            self._doc_count += 1
+            self._total_length += len(tokens)
+            if count:
+                self.documents_added += 1
+
+    def _remove(self, doc_ids, count=True):
+        for doc_id in doc_ids:
+            terms = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT term FROM postings WHERE doc_id = ?", (doc_id,)
+                )
+            ]
+            self._conn.executemany(
+                "UPDATE terms SET df = df - 1 WHERE term = ?", [(term,) for term in terms]
+            )
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            length = self._conn.execute(
+                "SELECT length FROM docs WHERE id = ?", (doc_id,)
+            ).fetchone()[0]
+            self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+            self._doc_count -= 1
+            self._total_length -= length
+            if count:
+                self.documents_removed += 1
+        if doc_ids:
+            self._conn.execute("DELETE FROM terms WHERE df <= 0")
+
+    def search(self, query, k):
+        """Return up to ``k`` (doc id, BM25 score) pairs, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_count or k < 1:
+            return []
+
+        average_length = self._total_length / self._doc_count
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            document_frequencies = dict(
+                self._conn.execute(
+                    f"SELECT term, df FROM terms WHERE term IN ({placeholders})", terms
+                )
+            )
+            if not document_frequencies:
+                return []
+            rows = self._conn.execute(
+                "SELECT p.term, p.doc_id, p.tf, d.length FROM postings p"
+                " JOIN docs d ON d.id = p.doc_id"
+                f" WHERE p.term IN ({placeholders})",
+                terms,
+            ).fetchall()
+
+        idf = {
+            term: math.log(1 + (self._doc_count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequencies.items()
+        }
+        scores = {}
+        for term, doc_id, tf, length in rows:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf[term] * tf * (BM25_K1 + 1) / (
+                tf + norm
+            )
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def stats(self):
+        return {
+            "documents": self._doc_count,
+            "average_length": round(self._total_length / self._doc_count, 1)
+            if self._doc_count
+            else 0.0,
+            "documents_added": self.documents_added,
+            "documents_removed": self.documents_removed,
+            "documents_updated": self.documents_updated,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
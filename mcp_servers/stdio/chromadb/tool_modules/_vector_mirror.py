@@ -0,0 +1,236 @@
+"""Exact top-k search over a memory-mapped copy of a Chroma collection's embeddings.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+EXPORT_PAGE_SIZE = 2048
+# float16 rows are upcast in blocks of this many rows: numpy has no fast
+# half-precision matrix product.
+FLOAT16_BLOCK_ROWS = 16384
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorMirror:
+    """Row-normalized float32/float16 matrix of a collection, searched by cosine similarity.
+
+    The matrix lives in ``<directory>/vectors.bin`` next to ``ids.txt`` (one id per
+    row) and ``meta.json``. ``refresh`` compares the collection's ids with the
+    mirrored ones and only appends new rows; removed ids trigger a compaction.
+    A ``stamp`` that changes on every write to the collection (see
+    ``_chroma_store.collection_stamp``) catches in-place upserts, which leave
+    the ids unchanged: the mirror is then rebuilt, unless the writes were
+    reported as appends with ``mark_stale(appended=True)``. Refreshes happen at
+    most every ``refresh_interval`` seconds unless the mirror was marked stale.
+
+    Searches read the ids and the matrix as one ``(ids, matrix)`` tuple that a
+    refresh replaces in a single assignment, so they never see one without
+    the other.
+    """
+
+    def __init__(self, directory, dtype="float32", refresh_interval=30.0, stamp=None):
+        self.directory = Path(directory)
+        self.dtype = np.dtype(dtype)
+        self.refresh_interval = refresh_interval
+        self._stamp_function = stamp
+        self._lock = threading.Lock()
+        self._snapshot = ([], None)
+        self._dimensions = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._checked_count = None
+        self._stale = True
+        self._append_only = False
+        self.rows_appended = 0
+        self.compactions = 0
+        self._load()
+
+    @property
+    def _vectors_path(self):
+        return self.directory / "vectors.bin"
+
+    @property
+    def _ids_path(self):
+        return self.directory / "ids.txt"
+
+    @property
+    def _meta_path(self):
+        return self.directory / "meta.json"
+
+    def _load(self):
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            ids = self._ids_path.read_text(encoding="utf-8").splitlines()
+        except (OSError, ValueError):
+            return
+        count, dimensions = meta["count"], meta["dimensions"]
+        expected_size = count * dimensions * self.dtype.itemsize
+        # A write interrupted before meta.json was replaced leaves the files out
+        # of step; the next refresh then rebuilds the mirror from scratch.
+        if (
+            meta.get("dtype") != self.dtype.name
+            or len(ids) != count
+            or self._vectors_path.stat().st_size != expected_size
+        ):
+            return
+        self._dimensions = dimensions
+        self._stamp = meta.get("stamp")
+        self._snapshot = (ids, self._map(count))
+
+    def _map(self, count):
+        if count == 0:
+            return np.empty((0, self._dimensions or 0), dtype=self.dtype)
+        return np.memmap(
+            self._vectors_path, dtype=self.dtype, mode="r", shape=(count, self._dimensions)
+        )
+
+    def _write_meta(self, count, stamp):
+        tmp_path = self._meta_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "count": count,
+                    "dimensions": self._dimensions,
+                    "dtype": self.dtype.name,
+                    "stamp": stamp,
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self._meta_path)
+
+    def _export(self, collection, ids):
+        for start in range(0, len(ids), EXPORT_PAGE_SIZE):
+            page = ids[start : start + EXPORT_PAGE_SIZE]
+            result = collection.get(ids=page, include=["embeddings"])
+            vectors = np.asarray(result["embeddings"], dtype=np.float32)
+            if len(vectors):
+                yield result["ids"], _normalize_rows(vectors).astype(self.dtype)
+
+    def _rewrite(self, collection, ids, stamp):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_vectors = self._vectors_path.with_suffix(".tmp")
+        written_ids = []
+        with open(tmp_vectors, "wb") as f:
+            for page_ids, rows in self._export(collection, ids):
+                self._dimensions = rows.shape[1]
+                f.write(rows.tobytes())
+                written_ids.extend(page_ids)
+        # Open mappings keep reading the replaced file until they are dropped.
+        os.replace(tmp_vectors, self._vectors_path)
+        self._ids_path.write_text("".join(f"{i}\n" for i in written_ids), encoding="utf-8")
+        self._write_meta(len(written_ids), stamp)
+        self._snapshot = (written_ids, self._map(len(written_ids)))
+        self.compactions += 1
+
+    def _append(self, collection, ids, stamp):
+        mirrored_ids = self._snapshot[0]
+        if not mirrored_ids:
+            self._rewrite(collection, ids, stamp)
+            return
+        # A new list: searches may still hold the previous one.
+        new_ids = list(mirrored_ids)
+        with open(self._vectors_path, "ab") as vectors_file, open(
+            self._ids_path, "a", encoding="utf-8"
+        ) as ids_file:
+            for page_ids, rows in self._export(collection, ids):
+                if self._dimensions is None:
+                    self._dimensions = rows.shape[1]
+                vectors_file.write(rows.tobytes())
+                ids_file.write("".join(f"{i}\n" for i in page_ids))
+                new_ids.extend(page_ids)
+                self.rows_appended += len(page_ids)
+        self._write_meta(len(new_ids), stamp)
+        self._snapshot = (new_ids, self._map(len(new_ids)))
+
+    def mark_stale(self, appended=False):
+        """Re-check on next use; ``appended`` says the writes only added new ids."""
+        self._append_only = appended and (self._append_only or not self._stale)
+        self._stale = True
+
+    def refresh(self, collection, force=False):
+        """Bring the mirror in line with ``collection``; returns True if it changed."""
+        now = time.monotonic()
+        if not (force or self._stale or now - self._checked_at >= self.refresh_interval):
+            return False
+
+        with self._lock:
+            stamp = self._stamp_function() if self._stamp_function is not None else None
+            written = stamp is not None and stamp != self._stamp
+            mirrored_ids = self._snapshot[0]
+            count = collection.count()
+            if (
+                not force
+                and not self._stale
+                and not written
+                and count == self._checked_count == len(mirrored_ids)
+            ):
+                self._checked_at = now
+                return False
+
+            current_ids = collection.get(include=[])["ids"]
+            current = set(current_ids)
+            known = set(mirrored_ids)
+            changed = False
+            if known - current or (written and known and not self._append_only):
+                # Removed ids, or writes that may have replaced existing vectors.
+                self._rewrite(collection, current_ids, stamp)
+                changed = True
+            else:
+                added = [i for i in current_ids if i not in known]
+                if added:
+                    self._append(collection, added, stamp)
+                    changed = True
+                elif written:
+                    self._write_meta(len(mirrored_ids), stamp)
+
+            self._stamp = stamp
+            self._checked_at = now
+            self._checked_count = count
+            self._stale = False
+            self._append_only = False
+            return changed
+
+    def search_many(self, query_vectors, k):
+        """Return, per query, a list of (id, cosine similarity) for the top ``k`` rows."""
+        ids, matrix = self._snapshot
+        if matrix is None or len(ids) == 0 or k < 1:
+            return [[] for _ in query_vectors]
+
+        queries = _normalize_rows(np.asarray(query_vectors, dtype=np.float32)).T
+        if matrix.dtype == np.float32:
+            scores = matrix @ queries
+        else:
+            scores = np.empty((matrix.shape[0], queries.shape[1]), dtype=np.float32)
+            for start in range(0, matrix.shape[0], FLOAT16_BLOCK_ROWS):
+                block = matrix[start : start + FLOAT16_BLOCK_ROWS].astype(np.float32)
+                np.matmul(block, queries, out=scores[start : start + len(block)])
+        k = min(k, scores.shape[0])
+
+        results = []
+        for column in scores.T:
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            results.append([(ids[row], float(column[row])) for row in top])
+        return results
+
+    def stats(self):
+        return {
+            "rows": len(self._snapshot[0]),
+            "dimensions": self._dimensions,
+            "dtype": self.dtype.name,
+            "rows_appended": self.rows_appended,
+            "compactions": self.compactions,
+        }
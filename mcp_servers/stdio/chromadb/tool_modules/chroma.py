@@ -1,56 +1,220 @@
 import json
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
+import logging
+import re
 
-_embeddings = None
-_vector_store = None
+import _chroma_store
+
+# Read by dynamic_stdio_server: caps concurrent calls to the local Ollama model
+# and memoizes repeated queries for a few minutes.
+TOOL_OPTIONS = {
+    "retrieve_documents": {"max_concurrency": 8, "cache": {"ttl": 300}},
+    "retrieve_documents_batch": {"max_concurrency": 4, "cache": {"ttl": 300}},
+}
+
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid", "auto")
+# Reciprocal rank fusion constant from Cormack et al.; damps the top ranks.
+RRF_K = 60
+HYBRID_CANDIDATES = 20
+
+# Up to three identifier-like words ("pip", "langchain-chroma", "numpy.linalg").
+KEYWORD_WORD_RE = re.compile(r"[\w.\-+/:@]+")
 
 
 def _get_vector_store():
-    global _embeddings, _vector_store
-    if _vector_store is None:
-        _embeddings = OllamaEmbeddings(
-            model="nomic-embed-text:latest",
+    return _chroma_store.get_vector_store()
+
+
+def _warmup():
+    # Run by dynamic_stdio_server after the handshake: opens the persisted
+    # collection, brings the BM25 index up to date and makes Ollama load the
+    # embedding model.
+    store = _get_vector_store()
+    store._collection.count()
+    _chroma_store.get_lexical_index()
+    _chroma_store.get_embeddings().embed_query("warm-up")
+
+
+def _document_to_json(page_content, metadata, doc_id):
+    return {
+        "page_content": page_content,
+        "metadata": metadata or {},
+        "id": str(doc_id) if doc_id else None,
+    }
+
+
+def _search_by_vectors(store, query_embeddings, k):
+    """Return one list of JSON-ready documents per query vector."""
+    collection = store._collection
+    mirror = _chroma_store.get_vector_mirror()
+    if mirror is None:
+        # Chroma answers many query vectors in one call; the LangChain wrapper
+        # only exposes the single-vector form.
+        results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            include=["documents", "metadatas"],
         )
-        _vector_store = Chroma(
-            collection_name="example_collection",
-            embedding_function=_embeddings,  
-            persist_directory="./chroma_langchain_db",
+        return [
+            [
+                _document_to_json(content, metadata, doc_id)
+                for content, metadata, doc_id in zip(documents, metadatas, ids)
+                if content is not None
+            ]
+            for documents, metadatas, ids in zip(
+                results["documents"], results["metadatas"], results["ids"]
+            )
+        ]
+
+    hits = mirror.search_many(query_embeddings, k)
+    wanted_ids = list(dict.fromkeys(doc_id for row in hits for doc_id, _ in row))
+    found = collection.get(ids=wanted_ids, include=["documents", "metadatas"])
+    documents_by_id = {
+        doc_id: _document_to_json(content, metadata, doc_id)
+        for doc_id, content, metadata in zip(
+            found["ids"], found["documents"], found["metadatas"]
         )
-    return _vector_store
+        if content is not None
+    }
+    return [
+        [documents_by_id[doc_id] for doc_id, _ in row if doc_id in documents_by_id]
+        for row in hits
+    ]
+
+
+def _is_keyword_query(query):
+    words = query.split()
+    return (
+        0 < len(words) <= 3
+        and not query.rstrip().endswith("?")
+        and all(KEYWORD_WORD_RE.fullmatch(word) for word in words)
+    )
+
+
+def _documents_by_ids(store, doc_ids):
+    """Fetch documents by id, in the given order."""
+    if not doc_ids:
+        return []
+    found = store._collection.get(ids=list(doc_ids), include=["documents", "metadatas"])
+    documents = {
+        doc_id: _document_to_json(content, metadata, doc_id)
+        for doc_id, content, metadata in zip(
+            found["ids"], found["documents"], found["metadatas"]
+        )
+        if content is not None
+    }
+    return [documents[doc_id] for doc_id in doc_ids if doc_id in documents]
+
+
+def _lexical_search(store, query, k):
+    hits = _chroma_store.get_lexical_index().search(query, k)
+    return _documents_by_ids(store, [doc_id for doc_id, _ in hits])
+
+
+def _vector_search(store, query, k):
+    return _search_by_vectors(store, [_chroma_store.embed_query(query)], k)[0]
+
+
+def _hybrid_search(store, query, k):
+    depth = max(k, HYBRID_CANDIDATES)
+    lexical_ids = [doc_id for doc_id, _ in _chroma_store.get_lexical_index().search(query, depth)]
+    vector_documents = _vector_search(store, query, depth)
+
+    fused = {}
+    for ranking in (lexical_ids, [doc["id"] for doc in vector_documents]):
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank)
+    top_ids = sorted(fused, key=fused.get, reverse=True)[:k]
 
+    known = {doc["id"]: doc for doc in vector_documents}
+    missing = [doc_id for doc_id in top_ids if doc_id not in known]
+    known.update((doc["id"], doc) for doc in _documents_by_ids(store, missing))
+    return [known[doc_id] for doc_id in top_ids if doc_id in known]
 
-def retrieve_documents(query: str, k: int = 4) -> str:
+
+def retrieve_documents(query: str, k: int = 4, mode: str = "vector") -> str:
     """
     Retrieves documents from the global Chroma vector store based on a query.
 
+    With CHROMA_SEARCH_ENGINE=numpy the search runs as an exact cosine top-k over
+    an in-memory mirror of the collection instead of Chroma's index.
+
     Args:
         query (str): The query string to search for.
         k (int): The number of similar documents to retrieve.
+        mode (str): "vector" (default) for embedding similarity, "lexical" for BM25
+            keyword matching (no embedding call), "hybrid" to merge both rankings
+            with reciprocal rank fusion, or "auto" to use lexical for short
+            identifier-like queries such as package names and vector otherwise.
 
     Returns:
         str: A JSON string representing a list of retrieved documents.
              Each document is a dictionary with 'page_content', 'metadata', and 'id'.
+
+    Raises:
+        RuntimeError: If the embedding model or the vector store is unavailable.
     """
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"mode must be one of {', '.join(RETRIEVAL_MODES)}")
+
     store = _get_vector_store()
 
     try:
-        retriever = store.as_retriever(search_kwargs={"k": k})
-        retrieved_documents = retriever.invoke(query)
-
-        json_compatible_docs = []
-        for doc in retrieved_documents:
-            json_compatible_docs.append({
-                "page_content": doc.page_content,
-                "metadata": doc.metadata,
-                "id": str(doc.id) if doc.id else None,
-            })
-
-        return json.dumps(json_compatible_docs, indent=2)
+        if mode == "hybrid":
+            json_compatible_docs = _hybrid_search(store, query, k)
+        elif mode == "lexical" or (mode == "auto" and _is_keyword_query(query)):
+            json_compatible_docs = _lexical_search(store, query, k)
+            if not json_compatible_docs and mode == "auto":
+                json_compatible_docs = _vector_search(store, query, k)
+        else:
+            json_compatible_docs = _vector_search(store, query, k)
+        return json.dumps(json_compatible_docs, separators=(",", ":"))
     except Exception as e:
-        print(f"ERROR: Failed to retrieve documents for query '{query}'. Error: {e}")
+        # stdout carries the MCP stream; logging goes to stderr. Raising keeps
+        # an outage from being cached as "no results".
+        logging.exception("Failed to retrieve documents for query %r", query)
+        raise RuntimeError(f"Failed to retrieve documents for query '{query}': {e}") from e
+
+
+def retrieve_documents_batch(queries: list[str], k: int = 4) -> str:
+    """
+    Retrieves documents for several queries with one embedding request and one Chroma query.
+
+    Args:
+        queries (list[str]): The query strings to search for.
+        k (int): The number of similar documents to retrieve per query.
+
+    Returns:
+        str: A JSON string with one entry per query, in input order.
+             Each entry is {"query": ..., "documents": [...]}, where documents have
+             'page_content', 'metadata', and 'id'.
+
+    Raises:
+        RuntimeError: If the embedding model or the vector store is unavailable.
+    """
+    if not queries:
         return json.dumps([])
 
+    store = _get_vector_store()
+
+    try:
+        unique_queries = list(dict.fromkeys(queries))
+        query_embeddings = _chroma_store.get_query_embeddings().embed_documents(
+            unique_queries
+        )
+        documents_by_query = dict(
+            zip(unique_queries, _search_by_vectors(store, query_embeddings, k))
+        )
+
+        return json.dumps(
+            [{"query": query, "documents": documents_by_query[query]} for query in queries],
+            separators=(",", ":"),
+        )
+    except Exception as e:
+        logging.exception("Failed to retrieve documents for %d queries", len(queries))
+        raise RuntimeError(f"Failed to retrieve documents for {len(queries)} queries: {e}") from e
+
 
 if __name__ == "__main__":
-    print(retrieve_documents("pip"))
+    print(retrieve_documents("pip", mode="auto"))
+    print(retrieve_documents("how do I pin package versions?", mode="hybrid"))
+    print(retrieve_documents_batch(["pip", "virtualenv"], k=2))
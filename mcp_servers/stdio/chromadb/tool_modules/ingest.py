@@ -0,0 +1,232 @@
+import codecs
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import _chroma_store
+from _embedding_cache import normalize_text
+
+# Read by dynamic_stdio_server: one ingestion at a time, and cached retrieval
+# results are dropped once new chunks may have landed.
+TOOL_OPTIONS = {
+    "ingest_documents": {
+        "max_concurrency": 1,
+        "invalidates": ["retrieve_documents", "retrieve_documents_batch"],
+    },
+}
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+def _content_id(text):
+    return "sha256:" + hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _find_break(buffer, start, chunk_size):
+    # Prefer paragraph, then line, then word boundaries in the second half of the chunk.
+    end = start + chunk_size
+    for separator in ("\n\n", "\n", " "):
+        position = buffer.rfind(separator, start + chunk_size // 2, end)
+        if position != -1:
+            return position + len(separator)
+    return end
+
+
+def _chunk_stream(blocks, chunk_size, chunk_overlap):
+    """Split an iterable of text blocks into overlapping chunks without joining them all."""
+    buffer = ""
+    start = 0
+    for block in blocks:
+        # Consumed text is dropped once per block; chunks only move the offset.
+        buffer = buffer[start:] + block
+        start = 0
+        while len(buffer) - start > chunk_size:
+            cut = _find_break(buffer, start, chunk_size)
+            yield buffer[start:cut]
+            start = cut - chunk_overlap
+    if buffer[start:].strip():
+        yield buffer[start:]
+
+
+def _read_text_blocks(path, stats):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        first = True
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            if first and b"\0" in block:
+                stats["skipped_binary_files"] += 1
+                return
+            first = False
+            stats["bytes"] += len(block)
+            yield decoder.decode(block)
+        yield decoder.decode(b"", final=True)
+
+
+def _flat_metadata(metadata):
+    # Chroma only stores scalar metadata values.
+    return {
+        key: value if isinstance(value, (str, int, float, bool)) else json.dumps(value)
+        for key, value in (metadata or {}).items()
+        if value is not None
+    }
+
+
+def _iter_records(path, chunk_size, chunk_overlap, stats):
+    """Yield (text, metadata) chunks from a plain-text or JSONL file."""
+    source = str(path)
+    if path.suffix == ".jsonl":
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line_number, line in enumerate(f, start=1):
+                stats["bytes"] += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    stats["skipped_invalid_lines"] += 1
+                    continue
+                text = record.get("text") or record.get("page_content") or ""
+                base_metadata = {
+                    "source": source,
+                    "line": line_number,
+                    **_flat_metadata(record.get("metadata")),
+                }
+                for index, chunk in enumerate(_chunk_stream([text], chunk_size, chunk_overlap)):
+                    yield chunk, {**base_metadata, "chunk": index}
+        return
+
+    blocks = _read_text_blocks(path, stats)
+    for index, chunk in enumerate(_chunk_stream(blocks, chunk_size, chunk_overlap)):
+        yield chunk, {"source": source, "chunk": index}
+
+
+def _iter_files(root, pattern):
+    if root.is_file():
+        yield root
+        return
+    for path in sorted(root.rglob(pattern)):
+        relative_parts = path.relative_to(root).parts
+        if path.is_file() and not any(part.startswith(".") for part in relative_parts):
+            yield path
+
+
+def ingest_documents(
+    path: str,
+    pattern: str = "*",
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    batch_size: int = 64,
+) -> dict:
+    """
+    Streams text or JSONL files into the Chroma collection, skipping chunks that are already stored.
+
+    Files are read incrementally and split into overlapping chunks. Each chunk is
+    identified by the SHA-256 of its normalized text, so chunks already present in
+    the collection are skipped before embedding and re-ingesting an unchanged corpus
+    costs only hashing and id lookups. JSONL lines may carry 'text' (or
+    'page_content') and an optional 'metadata' object.
+
+    Args:
+        path (str): A file, or a directory to scan recursively.
+        pattern (str): Glob pattern for files inside a directory (e.g. "*.md", "*.jsonl").
+        chunk_size (int): Maximum characters per chunk.
+        chunk_overlap (int): Characters shared between consecutive chunks; must be
+            less than half of chunk_size.
+        batch_size (int): Chunks embedded per embedding request.
+
+    Returns:
+        dict: Counts of files, chunks embedded and skipped, bytes read, and throughput.
+              Example: {"status": "success", "chunks_embedded": 120, "chunks_per_second": 850.2, ...}
+              On failure: {"status": "error", "error_message": "..."}
+    """
+    root = Path(path).expanduser()
+    if not root.exists():
+        return {"status": "error", "error_message": f"Path not found: {path}"}
+    if chunk_size < 1 or not 0 <= chunk_overlap < chunk_size // 2 or batch_size < 1:
+        return {
+            "status": "error",
+            "error_message": "Require chunk_size >= 1, 0 <= chunk_overlap < chunk_size / 2 and batch_size >= 1.",
+        }
+
+    stats = {
+        "files": 0,
+        "bytes": 0,
+        "chunks_seen": 0,
+        "chunks_embedded": 0,
+        "chunks_skipped_existing": 0,
+        "chunks_skipped_duplicate": 0,
+        "skipped_binary_files": 0,
+        "skipped_invalid_lines": 0,
+        "embed_seconds": 0.0,
+    }
+    started = time.perf_counter()
+
+    try:
+        collection = _chroma_store.get_vector_store()._collection
+        embeddings = _chroma_store.get_embeddings()
+        # Chunks of earlier batches are in the collection by now, so only the
+        # pending batch needs checking for repeats.
+        batch_ids = set()
+        batch = []
+
+        def flush():
+            ids = [chunk_id for chunk_id, _, _ in batch]
+            existing = set(collection.get(ids=ids, include=[])["ids"])
+            new_items = [item for item in batch if item[0] not in existing]
+            stats["chunks_skipped_existing"] += len(batch) - len(new_items)
+            batch.clear()
+            batch_ids.clear()
+            if not new_items:
+                return
+
+            embed_started = time.perf_counter()
+            vectors = embeddings.embed_documents([text for _, text, _ in new_items])
+            stats["embed_seconds"] += time.perf_counter() - embed_started
+            collection.add(
+                ids=[chunk_id for chunk_id, _, _ in new_items],
+                embeddings=vectors,
+                documents=[text for _, text, _ in new_items],
+                metadatas=[metadata for _, _, metadata in new_items],
+            )
+            stats["chunks_embedded"] += len(new_items)
+            # Only ids not yet in the collection were added.
+            _chroma_store.notify_collection_changed(appended=True)
+
+        for file_path in _iter_files(root, pattern):
+            binary_files = stats["skipped_binary_files"]
+            for text, metadata in _iter_records(file_path, chunk_size, chunk_overlap, stats):
+                stats["chunks_seen"] += 1
+                chunk_id = _content_id(text)
+                if chunk_id in batch_ids:
+                    stats["chunks_skipped_duplicate"] += 1
+                    continue
+                batch_ids.add(chunk_id)
+                batch.append((chunk_id, text, {**metadata, "content_hash": chunk_id}))
+                if len(batch) >= batch_size:
+                    flush()
+            if stats["skipped_binary_files"] == binary_files:
+                stats["files"] += 1
+        if batch:
+            flush()
+    except Exception as e:
+        return {"status": "error", "error_message": f"Ingestion failed: {e}", **stats}
+
+    elapsed = time.perf_counter() - started
+    return {
+        "status": "success",
+        **stats,
+        "embed_seconds": round(stats["embed_seconds"], 3),
+        "seconds": round(elapsed, 3),
+        "chunks_per_second": round(stats["chunks_seen"] / elapsed, 1) if elapsed else None,
+        "mb_per_second": round(stats["bytes"] / elapsed / 1e6, 2) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    print(json.dumps(ingest_documents(sys.argv[1] if len(sys.argv) > 1 else "."), indent=2))
@@ -7,7 +7,11 @@ import json
 import logging
 import os
 import sys
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable
 
 from google.adk.tools.function_tool import FunctionTool
 from google.adk.tools.mcp_tool.conversion_utils import adk_to_mcp_tool_type
@@ -16,6 +20,31 @@ from mcp.server.lowlevel import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 
+from admission import AdmissionController, Overloaded
+from result_encoding import (
+    ResultEncoder,
+    ToolContent,
+    get_result_encoder,
+    make_result_encoder,
+)
+from result_cache import ToolResultCache
+from tool_executor import ToolExecutor
+from tool_manifest import MANIFEST_FILENAME, ToolManifest, helper_paths
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "common"))
+from tool_metrics import ToolMetrics, argument_bytes, content_bytes  # noqa: E402
+
+
+METRICS_TOOL_NAME = "__metrics__"
+METRICS_TOOL = mcp_types.Tool(
+    name=METRICS_TOOL_NAME,
+    description=(
+        "Report this server's per-tool call counts, errors, latency percentiles "
+        "(total, tool body, serialization), payload sizes, queue and cache statistics."
+    ),
+    inputSchema={"type": "object", "properties": {}},
+)
+
 
 logging.basicConfig(
     stream=sys.stderr,
@@ -25,105 +54,653 @@ logging.basicConfig(
 )
 
 
-def _load_tools_from_directory(tool_modules_dir: Path) -> dict[str, FunctionTool]:
-    adk_tools: dict[str, FunctionTool] = {}
+@dataclass
+class _ModuleEntry:
+    path: Path
+    signature: tuple[Any, ...]
+    tools: dict[str, FunctionTool] = field(default_factory=dict)
+    schemas: list[mcp_types.Tool] = field(default_factory=list)
+    options: dict[str, dict[str, Any]] = field(default_factory=dict)
+    warmup: Callable[[], Any] | None = None
+    has_warmup: bool = False
+    loaded: bool = True
+
+
+TOOL_OPTIONS_ATTR = "__mcp_tool_options__"
+
+
+def tool_options(**options: Any) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Attach runtime options to a tool function.
+
+    Tool modules can set the same options without importing this runtime via
+    a module-level ``TOOL_OPTIONS = {"tool_name": {...}}`` mapping; options set
+    with the decorator take precedence.
+
+    Supported options:
+        max_concurrency (int): Maximum simultaneous calls of the tool.
+        max_queue (int): Calls allowed to wait for a slot before new ones are
+            rejected as overloaded; defaults to the server-wide limit.
+        max_wait (float): Seconds a call may wait for a slot before it is
+            rejected as overloaded; defaults to the server-wide limit.
+        cache (bool | dict): Memoize results by arguments; a dict may set
+            ``ttl`` in seconds, otherwise the cache's default TTL applies.
+        invalidates (list[str]): Tools whose cached results are dropped after
+            this tool completes, e.g. retrieval tools after an ingestion.
+    """
 
-    if not tool_modules_dir.is_dir():
-        logging.warning("Tool modules directory not found: %s", tool_modules_dir)
-        return adk_tools
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        merged = dict(getattr(func, TOOL_OPTIONS_ATTR, {}))
+        merged.update(options)
+        setattr(func, TOOL_OPTIONS_ATTR, merged)
+        return func
 
-    for module_path in sorted(tool_modules_dir.glob("*.py")):
-        if module_path.name == "__init__.py":
+    return decorator
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _helpers_signature(tool_modules_dir: Path) -> tuple[tuple[str, int, int], ...]:
+    signature = []
+    for path in helper_paths(tool_modules_dir):
+        try:
+            signature.append((path.name, *_file_signature(path)))
+        except OSError:
             continue
+    return tuple(signature)
+
 
-        module_name = module_path.stem
-        import_name = f"{tool_modules_dir.parent.name}.{module_name}"
-        spec = importlib.util.spec_from_file_location(import_name, module_path)
+def _evict_helpers(tool_modules_dir: Path) -> None:
+    """Drop the directory's ``_*.py`` helpers from sys.modules so re-imports read them afresh.
 
-        if spec is None or spec.loader is None:
-            logging.error("Could not create module spec for %s", module_path)
+    All of them go, not just the edited ones: an unchanged helper may hold a
+    reference to an edited one it imported.
+    """
+    directory = tool_modules_dir.resolve()
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if module_file is None:
+            continue
+        path = Path(module_file)
+        if path.name.startswith("_") and path.name != "__init__.py" and path.resolve().parent == directory:
+            del sys.modules[name]
+
+
+def _load_module_into(entry: _ModuleEntry) -> None:
+    """Import a tool module and fill in its tools, options and warm-up hook."""
+    module_path = entry.path
+    adk_tools: dict[str, FunctionTool] = {}
+    options: dict[str, dict[str, Any]] = {}
+    entry.tools = adk_tools
+    entry.options = options
+    entry.loaded = True
+    module_name = module_path.stem
+    import_name = f"{module_path.parent.parent.name}.{module_name}"
+    # Tool modules import their private helpers (``_*.py``) as top-level modules.
+    if str(module_path.parent) not in sys.path:
+        sys.path.insert(0, str(module_path.parent))
+    spec = importlib.util.spec_from_file_location(import_name, module_path)
+
+    if spec is None or spec.loader is None:
+        logging.error("Could not create module spec for %s", module_path)
+        return
+
+    try:
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        logging.info("Loaded module: %s", import_name)
+    except Exception as exc:
+        logging.error("Error loading module %s: %s", module_name, exc)
+        return
+
+    module_options = getattr(module, "TOOL_OPTIONS", {})
+    warmup = getattr(module, "_warmup", None)
+    if callable(warmup):
+        entry.warmup = warmup
+        entry.has_warmup = True
+
+    for func_name, func_obj in inspect.getmembers(module, inspect.isfunction):
+        if func_name.startswith("_"):
+            continue
+        if inspect.getsourcefile(func_obj) != str(module_path):
             continue
 
         try:
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            logging.info("Loaded module: %s", import_name)
+            adk_tool = FunctionTool(func_obj)
+            adk_tools[adk_tool.name] = adk_tool
+            logging.info("Registered tool: %s", adk_tool.name)
         except Exception as exc:
-            logging.error("Error loading module %s: %s", module_name, exc)
+            logging.error("Failed to register %s: %s", func_name, exc)
             continue
 
-        for func_name, func_obj in inspect.getmembers(module, inspect.isfunction):
-            if func_name.startswith("_"):
-                continue
-            if inspect.getsourcefile(func_obj) != str(module_path):
-                continue
+        tool_opts = {
+            **module_options.get(func_name, {}),
+            **getattr(func_obj, TOOL_OPTIONS_ATTR, {}),
+        }
+        if tool_opts:
+            options[adk_tool.name] = tool_opts
+
+
+class ToolSchemaRegistry:
+    """Tool modules of one server, with their MCP schemas converted once.
+
+    Each module is tracked by its (mtime_ns, size) signature together with
+    those of the private ``_*.py`` helpers next to it. ``refresh`` re-imports
+    only modules whose signature changed; when a helper changed, every module
+    is re-imported, after evicting the helpers from ``sys.modules`` so the
+    edit is picked up. ``list_tools`` serves the flattened schema list from
+    cache until something is invalidated.
+
+    With a ``manifest`` and ``lazy=True``, schemas of unchanged modules are
+    read from the manifest and the module itself is imported only when one of
+    its tools is first requested through ``get_tool``.
+    """
+
+    def __init__(
+        self,
+        tool_modules_dir: Path,
+        *,
+        manifest: ToolManifest | None = None,
+        lazy: bool = False,
+    ) -> None:
+        self.tool_modules_dir = tool_modules_dir
+        self.manifest = manifest
+        self.lazy = lazy and manifest is not None
+        self.tools: dict[str, FunctionTool] = {}
+        self._modules: dict[str, _ModuleEntry] = {}
+        self._tool_modules: dict[str, str] = {}
+        self._schemas: list[mcp_types.Tool] | None = None
+        self._helpers_signature: tuple[tuple[str, int, int], ...] | None = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.module_rebuilds = 0
+        self.lazy_imports = 0
 
+        if not tool_modules_dir.is_dir():
+            logging.warning("Tool modules directory not found: %s", tool_modules_dir)
+
+    def _module_paths(self) -> dict[str, Path]:
+        if not self.tool_modules_dir.is_dir():
+            return {}
+        return {
+            path.stem: path
+            for path in sorted(self.tool_modules_dir.glob("*.py"))
+            if not path.name.startswith("_")
+        }
+
+    def _drop(self, module_name: str) -> None:
+        entry = self._modules.pop(module_name)
+        for schema in entry.schemas:
+            if self._tool_modules.get(schema.name) == module_name:
+                del self._tool_modules[schema.name]
+        for tool_name in entry.tools:
+            if self.tools.get(tool_name) is entry.tools[tool_name]:
+                del self.tools[tool_name]
+
+    def _build(self, module_path: Path, signature: tuple[Any, ...]) -> _ModuleEntry:
+        entry = _ModuleEntry(path=module_path, signature=signature)
+        _load_module_into(entry)
+        for tool_name, adk_tool in entry.tools.items():
             try:
-                adk_tool = FunctionTool(func_obj)
-                adk_tools[adk_tool.name] = adk_tool
-                logging.info("Registered tool: %s", adk_tool.name)
+                entry.schemas.append(adk_to_mcp_tool_type(adk_tool))
             except Exception as exc:
-                logging.error("Failed to register %s: %s", func_name, exc)
+                logging.error("Schema error for %s: %s", tool_name, exc)
+        self.module_rebuilds += 1
+
+        if self.manifest is not None:
+            self.manifest.record(
+                module_path,
+                [schema.model_dump(mode="json", exclude_none=True) for schema in entry.schemas],
+                warmup=entry.has_warmup,
+            )
+        return entry
+
+    def _from_manifest(
+        self, module_path: Path, signature: tuple[Any, ...]
+    ) -> _ModuleEntry | None:
+        recorded = self.manifest.lookup(module_path)
+        if recorded is None:
+            return None
+        try:
+            schemas = [mcp_types.Tool.model_validate(tool) for tool in recorded["tools"]]
+        except ValueError as exc:
+            logging.warning("Discarding manifest entry for %s: %s", module_path.name, exc)
+            return None
+        logging.info("Deferred module: %s (%d tools)", module_path.stem, len(schemas))
+        return _ModuleEntry(
+            path=module_path,
+            signature=signature,
+            schemas=schemas,
+            has_warmup=recorded.get("warmup", False),
+            loaded=False,
+        )
+
+    def _register(self, module_name: str, entry: _ModuleEntry) -> None:
+        for schema in entry.schemas:
+            if schema.name in self._tool_modules:
+                logging.warning("Tool %s redefined by %s", schema.name, module_name)
+            self._tool_modules[schema.name] = module_name
+        self.tools.update(entry.tools)
+        self._modules[module_name] = entry
+
+    def refresh(self) -> bool:
+        """Reload modules that were added, removed or modified on disk.
+
+        Returns:
+            True if any module entry was rebuilt or dropped.
+        """
+        with self._lock:
+            module_paths = self._module_paths()
+            changed = False
+
+            helpers_signature = _helpers_signature(self.tool_modules_dir)
+            if self._helpers_signature not in (None, helpers_signature):
+                logging.info("Tool module helpers changed, reloading them")
+                _evict_helpers(self.tool_modules_dir)
+            self._helpers_signature = helpers_signature
+
+            for module_name in list(self._modules):
+                if module_name not in module_paths:
+                    self._drop(module_name)
+                    if self.manifest is not None:
+                        self.manifest.forget(f"{module_name}.py")
+                    changed = True
+
+            for module_name, module_path in module_paths.items():
+                try:
+                    signature = (_file_signature(module_path), helpers_signature)
+                except OSError as exc:
+                    logging.error("Could not stat %s: %s", module_path, exc)
+                    continue
+
+                entry = self._modules.get(module_name)
+                if entry is not None and entry.signature == signature:
+                    continue
+                if entry is not None:
+                    logging.info("Module changed, rebuilding: %s", module_name)
+                    self._drop(module_name)
+
+                entry = None
+                if self.lazy:
+                    entry = self._from_manifest(module_path, signature)
+                if entry is None:
+                    entry = self._build(module_path, signature)
+                self._register(module_name, entry)
+                changed = True
+
+            if self.manifest is not None:
+                self.manifest.save()
+            if changed:
+                self.invalidate()
+            return changed
+
+    def invalidate(self, module_name: str | None = None) -> None:
+        """Drop the cached tool list, and optionally force a module rebuild."""
+        if module_name is not None and module_name in self._modules:
+            self._modules[module_name].signature = ()
+        self._schemas = None
+
+    def list_tools(self) -> list[mcp_types.Tool]:
+        if self._schemas is None:
+            self.misses += 1
+            self._schemas = [
+                schema
+                for module_name in sorted(self._modules)
+                for schema in self._modules[module_name].schemas
+            ]
+        else:
+            self.hits += 1
+        return list(self._schemas)
 
-    return adk_tools
+    def has_tool(self, tool_name: str) -> bool:
+        return tool_name in self._tool_modules
 
+    def module_of(self, tool_name: str) -> str | None:
+        return self._tool_modules.get(tool_name)
 
-def create_stdio_server(server_dir: Path) -> tuple[Server, dict[str, FunctionTool]]:
-    adk_tools = _load_tools_from_directory(server_dir / "tool_modules")
+    def load_module(self, module_name: str) -> _ModuleEntry | None:
+        """Import a deferred module (thread-safe); a no-op for loaded ones."""
+        with self._lock:
+            entry = self._modules.get(module_name)
+            if entry is None or entry.loaded:
+                return entry
+
+            _load_module_into(entry)
+            self.lazy_imports += 1
+            self.tools.update(entry.tools)
+
+            recorded = {schema.name for schema in entry.schemas}
+            if recorded != set(entry.tools):
+                # The module registers different tools than its manifest entry
+                # claims; rebuild it on the next refresh.
+                logging.warning("Manifest out of date for module %s", module_name)
+                self.invalidate(module_name)
+            return entry
+
+    def get_tool(self, tool_name: str) -> FunctionTool | None:
+        """Return a tool, importing its deferred module on first use."""
+        adk_tool = self.tools.get(tool_name)
+        if adk_tool is not None:
+            return adk_tool
+
+        module_name = self._tool_modules.get(tool_name)
+        if module_name is not None:
+            self.load_module(module_name)
+        return self.tools.get(tool_name)
+
+    def warmup_modules(self) -> dict[str, _ModuleEntry]:
+        return {
+            module_name: entry
+            for module_name, entry in self._modules.items()
+            if entry.has_warmup
+        }
+
+    def tool_options(self, tool_name: str) -> dict[str, Any]:
+        module_name = self._tool_modules.get(tool_name)
+        entry = self._modules.get(module_name) if module_name else None
+        return entry.options.get(tool_name, {}) if entry is not None else {}
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "module_rebuilds": self.module_rebuilds,
+            "lazy_imports": self.lazy_imports,
+            "modules": len(self._modules),
+            "tools": len(self._tool_modules),
+        }
+
+
+class ModuleWarmup:
+    """Runs tool modules' optional ``_warmup()`` hooks once, in the background.
+
+    Deferred (lazy) modules are imported as part of their warm-up. A call to a
+    tool whose module is still warming up waits for that warm-up instead of
+    racing it; a failed warm-up is logged and does not block calls.
+    """
+
+    def __init__(self, registry: ToolSchemaRegistry, executor: ToolExecutor) -> None:
+        self.registry = registry
+        self.executor = executor
+        self._tasks: dict[str, tuple[_ModuleEntry, asyncio.Task]] = {}
+        self.durations: dict[str, float] = {}
+
+    def start(self) -> None:
+        for module_name, entry in self.registry.warmup_modules().items():
+            current = self._tasks.get(module_name)
+            if current is None or current[0] is not entry:
+                task = asyncio.create_task(self._run(module_name, entry))
+                self._tasks[module_name] = (entry, task)
+
+    async def _run(self, module_name: str, entry: _ModuleEntry) -> None:
+        started = time.perf_counter()
+        try:
+            if not entry.loaded:
+                await self.executor.run_blocking(self.registry.load_module, module_name)
+            hook = entry.warmup
+            if hook is None:
+                return
+            if inspect.iscoroutinefunction(hook):
+                await hook()
+            else:
+                await self.executor.run_blocking(hook)
+        except Exception as exc:
+            logging.error("Warm-up of %s failed: %s", module_name, exc)
+            return
+        duration = time.perf_counter() - started
+        self.durations[module_name] = duration
+        logging.info("Warm-up of %s finished in %.2fs", module_name, duration)
+
+    async def wait_for_tool(self, tool_name: str) -> None:
+        module_name = self.registry.module_of(tool_name)
+        current = self._tasks.get(module_name) if module_name else None
+        if current is not None and not current[1].done():
+            await asyncio.shield(current[1])
+
+
+class _ErrorResult(Exception):
+    """An error payload, raised through the result cache so it is never stored."""
+
+    def __init__(self, contents: list[ToolContent]) -> None:
+        super().__init__("tool returned an error payload")
+        self.contents = contents
+
+
+def _is_error_response(response: Any) -> bool:
+    # ADK answers missing or invalid arguments with {"error": ...}; the tool
+    # modules report their own failures as {"status": "error", ...}.
+    return isinstance(response, dict) and (
+        "error" in response or response.get("status") == "error"
+    )
+
+
+def _load_tools_from_directory(tool_modules_dir: Path) -> dict[str, FunctionTool]:
+    registry = ToolSchemaRegistry(tool_modules_dir)
+    registry.refresh()
+    return registry.tools
+
+
+def create_stdio_server(
+    server_dir: Path,
+    *,
+    registry: ToolSchemaRegistry | None = None,
+    reload_changed_modules: bool = True,
+    lazy_tools: bool = False,
+    executor: ToolExecutor | None = None,
+    result_encoder: ResultEncoder | None = None,
+    result_cache: ToolResultCache | None = None,
+    warmup: bool = True,
+    admission: AdmissionController | None = None,
+    metrics: ToolMetrics | None = None,
+    metrics_tool: bool = False,
+) -> tuple[Server, dict[str, FunctionTool]]:
+    if registry is None:
+        manifest = ToolManifest(server_dir / MANIFEST_FILENAME) if lazy_tools else None
+        registry = ToolSchemaRegistry(
+            server_dir / "tool_modules", manifest=manifest, lazy=lazy_tools
+        )
+        registry.refresh()
+    if executor is None:
+        executor = ToolExecutor()
+    if result_encoder is None:
+        result_encoder = make_result_encoder()
+    if result_cache is None:
+        result_cache = ToolResultCache()
+    if admission is None:
+        admission = AdmissionController(max_in_flight=executor.max_workers)
+    if metrics is None:
+        metrics = ToolMetrics()
+    adk_tools = registry.tools
+    module_warmup = ModuleWarmup(registry, executor)
     app = Server(f"{server_dir.name}-mcp-server")
 
+    async def on_initialized(_: mcp_types.InitializedNotification) -> None:
+        module_warmup.start()
+
+    if warmup:
+        app.notification_handlers[mcp_types.InitializedNotification] = on_initialized
+
+    def runtime_stats() -> dict[str, Any]:
+        return {
+            **metrics.snapshot(),
+            "admission": admission.stats(),
+            "executor": executor.stats(),
+            "result_cache": result_cache.stats(),
+            "registry": registry.stats(),
+        }
+
     @app.list_tools()
     async def list_mcp_tools() -> list[mcp_types.Tool]:
-        mcp_tools: list[mcp_types.Tool] = []
-        for tool_name, adk_tool in adk_tools.items():
-            try:
-                mcp_tools.append(adk_to_mcp_tool_type(adk_tool))
-            except Exception as exc:
-                logging.error("Schema error for %s: %s", tool_name, exc)
+        started = time.perf_counter()
+        if reload_changed_modules and registry.refresh():
+            result_cache.invalidate()
+            if warmup:
+                module_warmup.start()
+        mcp_tools = registry.list_tools()
+        if metrics_tool:
+            mcp_tools.append(METRICS_TOOL)
+        logging.debug("list_tools cache stats: %s", registry.stats())
+        metrics.observe_list_tools(time.perf_counter() - started)
         return mcp_tools
 
     @app.call_tool()
     async def call_mcp_tool(
         tool_name: str, arguments: dict
-    ) -> list[mcp_types.TextContent]:
+    ) -> list[ToolContent]:
+        if metrics_tool and tool_name == METRICS_TOOL_NAME:
+            return [mcp_types.TextContent(type="text", text=json.dumps(runtime_stats()))]
+
+        started = time.perf_counter()
+        contents: list[ToolContent] | None = None
+        failed = True
+        try:
+            contents, failed = await dispatch(tool_name, arguments)
+            return contents
+        finally:
+            metrics.observe_call(
+                tool_name,
+                time.perf_counter() - started,
+                error=failed,
+                arguments_size=argument_bytes(arguments),
+                result_size=content_bytes(contents) if contents is not None else None,
+            )
+
+    async def dispatch(
+        tool_name: str, arguments: dict
+    ) -> tuple[list[ToolContent], bool]:
+        """Run one call; returns its content and whether it failed."""
+        await module_warmup.wait_for_tool(tool_name)
         adk_tool = adk_tools.get(tool_name)
+        if adk_tool is None and registry.has_tool(tool_name):
+            adk_tool = await asyncio.to_thread(registry.get_tool, tool_name)
         if adk_tool is None:
             return [
                 mcp_types.TextContent(type="text", text=f"Tool {tool_name} not found")
-            ]
+            ], True
 
+        options = registry.tool_options(tool_name)
+
+        async def execute() -> list[ToolContent]:
+            async with admission.admit(
+                tool_name,
+                max_concurrency=options.get("max_concurrency"),
+                max_queue=options.get("max_queue"),
+                max_wait=options.get("max_wait"),
+            ):
+                body_started = time.perf_counter()
+                response = await executor.run(adk_tool, arguments)
+                body_done = time.perf_counter()
+                for invalidated_tool in options.get("invalidates", ()):
+                    result_cache.invalidate(invalidated_tool)
+                encoded = result_encoder(tool_name, response)
+                metrics.observe_phase(tool_name, "body", body_done - body_started)
+                metrics.observe_phase(tool_name, "serialize", time.perf_counter() - body_done)
+                if _is_error_response(response):
+                    raise _ErrorResult(encoded)
+                return encoded
+
+        cache_options = options.get("cache")
         try:
-            response = await adk_tool.run_async(args=arguments, tool_context=None)
-            return [
-                mcp_types.TextContent(type="text", text=json.dumps(response, indent=2))
-            ]
+            if not cache_options:
+                return await execute(), False
+            ttl = cache_options.get("ttl") if isinstance(cache_options, dict) else None
+            return await result_cache.get_or_compute(
+                tool_name, arguments, execute, ttl=ttl
+            ), False
+        except _ErrorResult as exc:
+            return exc.contents, True
+        except Overloaded as exc:
+            logging.warning("Rejected %s: %s", tool_name, exc.reason)
+            return [mcp_types.TextContent(type="text", text=json.dumps(exc.to_dict()))], True
         except Exception as exc:
             return [
                 mcp_types.TextContent(
                     type="text", text=json.dumps({"error": str(exc)})
                 )
-            ]
+            ], True
 
     return app, adk_tools
 
 
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int | None) -> int | None:
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name, "").strip()
+    return float(value) if value else default
+
+
+async def _log_metrics(
+    metrics: ToolMetrics, admission: AdmissionController, interval: float
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        logging.info(
+            "Metrics: %s", json.dumps({**metrics.snapshot(), "admission": admission.stats()})
+        )
+
+
 async def run_stdio_server(server_dir: str | Path) -> None:
     resolved_server_dir = Path(server_dir).resolve()
-    app, _ = create_stdio_server(resolved_server_dir)
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name=app.name,
-                server_version="0.1.0",
-                capabilities=app.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    executor = ToolExecutor(max_workers=_env_int("MCP_STDIO_TOOL_WORKERS", None))
+    admission = AdmissionController(
+        max_in_flight=_env_int("MCP_STDIO_MAX_IN_FLIGHT", executor.max_workers),
+        max_queue=_env_int("MCP_STDIO_MAX_QUEUE", 64),
+        max_wait=_env_float("MCP_STDIO_MAX_WAIT", 30.0),
+    )
+    metrics = ToolMetrics()
+    app, _ = create_stdio_server(
+        resolved_server_dir,
+        lazy_tools=_env_flag("MCP_STDIO_LAZY_TOOLS"),
+        executor=executor,
+        result_encoder=get_result_encoder(
+            os.environ.get("MCP_STDIO_RESULT_FORMAT", "compact")
+        ),
+        result_cache=ToolResultCache(
+            max_entries=_env_int("MCP_STDIO_CACHE_MAX_ENTRIES", 1024),
+            max_bytes=_env_int("MCP_STDIO_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+        ),
+        admission=admission,
+        metrics=metrics,
+        metrics_tool=_env_flag("MCP_STDIO_METRICS_TOOL"),
+    )
+    metrics_interval = _env_float("MCP_STDIO_METRICS_INTERVAL", 0.0)
+    metrics_logger = (
+        asyncio.create_task(_log_metrics(metrics, admission, metrics_interval))
+        if metrics_interval > 0
+        else None
+    )
+
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name=app.name,
+                    server_version="0.1.0",
+                    capabilities=app.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
+            )
+    finally:
+        if metrics_logger is not None:
+            metrics_logger.cancel()
+        logging.info(
+            "Metrics: %s", json.dumps({**metrics.snapshot(), "admission": admission.stats()})
         )
+        executor.shutdown()
 
 
 def main(server_dir: str | Path | None = None) -> None:
@@ -0,0 +1,219 @@
+"""Speech synthesis backends for the text-to-speech tools.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+
+Every backend reads the text on stdin and can write an audio file
+(``synthesize``) or speak directly (``speak``). ``play`` plays a file that an
+earlier ``synthesize`` produced, which is how cached audio is spoken.
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+import wave
+
+SYNTHESIS_TIMEOUT = 30
+
+
+class TTSError(Exception):
+    def __init__(self, message, return_code=None):
+        super().__init__(message)
+        self.return_code = return_code
+
+
+def _expand(template, **values):
+    """Fill ``{name}`` placeholders; tuple items are dropped when one of their values is None."""
+    given = {name: value for name, value in values.items() if value is not None}
+    command = []
+    for part in template:
+        group = part if isinstance(part, tuple) else (part,)
+        try:
+            # Format the whole group before adding any of it.
+            command.extend([item.format(**given) for item in group])
+        except KeyError:
+            continue
+    return command
+
+
+class CommandBackend:
+    """Runs a command per request, passing the text on stdin.
+
+    Templates are argument lists with ``{voice}`` and ``{output}`` placeholders;
+    a tuple groups arguments that are left out together, e.g. ``("-v", "{voice}")``
+    when no voice is given.
+    """
+
+    def __init__(
+        self,
+        name,
+        synthesize_command,
+        speak_command=None,
+        play_command=None,
+        extension="wav",
+        wav_command=None,
+        wav_format="wav",
+    ):
+        self.name = name
+        self.synthesize_command = synthesize_command
+        self.wav_command = wav_command or synthesize_command
+        self.speak_command = speak_command
+        self.play_command = play_command
+        self.extension = extension
+        # Sample format written by wav_command; clips are only joined with
+        # others of the same format.
+        self.wav_format = wav_format
+
+    def _run(self, command, text, timeout):
+        try:
+            process = subprocess.run(
+                command,
+                input=text.encode("utf-8"),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=timeout,
+            )
+        except FileNotFoundError:
+            raise TTSError(f"'{command[0]}' command not found for the {self.name} backend.")
+        except subprocess.TimeoutExpired:
+            raise TTSError(f"'{command[0]}' command timed out.")
+        if process.returncode != 0:
+            message = process.stderr.decode(errors="replace").strip()
+            raise TTSError(
+                message or f"Unknown error during '{command[0]}' command execution.",
+                process.returncode,
+            )
+
+    def synthesize(self, text, voice, output_path, timeout=SYNTHESIS_TIMEOUT):
+        self._run(_expand(self.synthesize_command, voice=voice, output=str(output_path)), text, timeout)
+
+    def synthesize_wav(self, text, voice, output_path, timeout=SYNTHESIS_TIMEOUT):
+        """Like ``synthesize`` but always 16-bit PCM WAV, so clips can be joined with ``wave``."""
+        self._run(_expand(self.wav_command, voice=voice, output=str(output_path)), text, timeout)
+
+    def speak(self, text, voice, timeout=SYNTHESIS_TIMEOUT):
+        if self.speak_command is None:
+            raise TTSError(f"The {self.name} backend cannot speak directly.")
+        self._run(_expand(self.speak_command, voice=voice), text, timeout)
+
+    @property
+    def can_play(self):
+        return self.play_command is not None and shutil.which(self.play_command[0]) is not None
+
+    def play(self, path, timeout=None):
+        self._run(_expand(self.play_command, output=str(path)), "", timeout)
+
+
+class FakeBackend:
+    """Writes silent WAV files sized to the text; for tests and benchmarks.
+
+    ``TTS_FAKE_DELAY_MS`` adds a fixed delay plus the same again per 100
+    characters, imitating synthesis time.
+    """
+
+    name = "fake"
+    extension = "wav"
+    can_play = True
+    sample_rate = 8000
+    wav_format = "LEI16@8000"
+
+    def __init__(self, delay=None):
+        if delay is None:
+            delay = float(os.environ.get("TTS_FAKE_DELAY_MS", "0")) / 1000
+        self.delay = delay
+
+    def _sleep(self, text):
+        if self.delay:
+            time.sleep(self.delay * (1 + len(text) / 100))
+
+    def synthesize(self, text, voice, output_path, timeout=SYNTHESIS_TIMEOUT):
+        self._sleep(text)
+        with wave.open(str(output_path), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            # About 60 ms of silence per character.
+            f.writeframes(b"\0\0" * (self.sample_rate * 6 // 100) * len(text))
+
+    synthesize_wav = synthesize
+
+    def speak(self, text, voice, timeout=SYNTHESIS_TIMEOUT):
+        self._sleep(text)
+
+    def play(self, path, timeout=None):
+        pass
+
+
+def _say_backend():
+    return CommandBackend(
+        "say",
+        ["say", ("-v", "{voice}"), "-o", "{output}"],
+        speak_command=["say", ("-v", "{voice}")],
+        play_command=["afplay", "{output}"],
+        extension="aiff",
+        wav_command=[
+            "say",
+            ("-v", "{voice}"),
+            "--file-format=WAVE",
+            "--data-format=LEI16@22050",
+            "-o",
+            "{output}",
+        ],
+        wav_format="LEI16@22050",
+    )
+
+
+def _espeak_backend():
+    binary = "espeak-ng" if shutil.which("espeak-ng") else "espeak"
+    return CommandBackend(
+        "espeak",
+        [binary, ("-v", "{voice}"), "-w", "{output}", "--stdin"],
+        speak_command=[binary, ("-v", "{voice}"), "--stdin"],
+        play_command=["aplay", "-q", "{output}"],
+        wav_format="LEI16@22050",
+    )
+
+
+def _command_backend():
+    # TTS_COMMAND is a shell-style template such as "piper --model en.onnx --output_file {output}".
+    synthesize = os.environ.get("TTS_COMMAND")
+    if not synthesize:
+        raise TTSError("TTS_BACKEND=command needs TTS_COMMAND.")
+    speak = os.environ.get("TTS_SPEAK_COMMAND")
+    play = os.environ.get("TTS_PLAY_COMMAND")
+    wav = os.environ.get("TTS_WAV_COMMAND")
+    return CommandBackend(
+        "command",
+        shlex.split(synthesize),
+        speak_command=shlex.split(speak) if speak else None,
+        play_command=shlex.split(play) if play else None,
+        extension=os.environ.get("TTS_COMMAND_EXTENSION", "wav"),
+        wav_command=shlex.split(wav) if wav else None,
+        wav_format=os.environ.get("TTS_WAV_FORMAT", "wav"),
+    )
+
+
+BACKENDS = {
+    "say": _say_backend,
+    "espeak": _espeak_backend,
+    "command": _command_backend,
+    "fake": FakeBackend,
+}
+
+
+def default_backend_name():
+    configured = os.environ.get("TTS_BACKEND")
+    if configured:
+        return configured
+    return "say" if sys.platform == "darwin" else "espeak"
+
+
+def get_backend(name=None):
+    name = name or default_backend_name()
+    try:
+        factory = BACKENDS[name]
+    except KeyError:
+        raise TTSError(f"Unknown TTS backend '{name}'. Choose one of: {', '.join(BACKENDS)}.")
+    return factory()
@@ -0,0 +1,266 @@
+"""Sentence-chunked, parallel speech synthesis jobs for the text-to-speech tools.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+Chunks are synthesized on a thread pool; each ``synthesize_chunk`` call runs
+the backend's synthesizer, which is a subprocess for every real backend.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import wave
+from collections import OrderedDict
+from pathlib import Path
+
+from _tts_backends import get_backend
+from _tts_synthesis import audio_key
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+|(?<=[.!?…][\"')\]])\s+|\n\s*\n")
+SOFT_BREAK_RE = re.compile(r"(?<=[,;:])\s+|\s+")
+# The first chunk is kept short so the first audio is ready quickly whatever
+# the length of the text; later chunks are packed up to the larger size.
+FIRST_CHUNK_CHARS = 160
+FRAMES_PER_COPY = 64 * 1024
+MAX_FINISHED_JOBS = 64
+
+
+def _split_long(sentence, limit):
+    while len(sentence) > limit:
+        cut = -1
+        for match in SOFT_BREAK_RE.finditer(sentence, 0, limit):
+            cut = match.end()
+        if cut <= 0:
+            cut = limit
+        yield sentence[:cut].strip()
+        sentence = sentence[cut:]
+    if sentence.strip():
+        yield sentence.strip()
+
+
+def split_sentences(text, chunk_chars=400, first_chunk_chars=FIRST_CHUNK_CHARS):
+    """Split ``text`` at sentence boundaries, packing sentences into chunks of at most ``chunk_chars``."""
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_END_RE.split(text):
+        for piece in _split_long(sentence, chunk_chars if chunks else first_chunk_chars):
+            limit = chunk_chars if chunks else first_chunk_chars
+            if current and len(current) + 1 + len(piece) > limit:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_key(backend_name, wav_format, voice, text):
+    """Cache key for a chunk clip.
+
+    Distinct from ``audio_key(..., "wav", ...)`` of single-shot clips, which
+    are written by another command in another sample format.
+    """
+    return audio_key(backend_name, voice, f"chunk-{wav_format}", text)
+
+
+def _detach(path, target):
+    """Hard-link (or copy) a cached clip to ``target`` so eviction cannot remove it."""
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copyfile(path, target)
+    return target
+
+
+def synthesize_chunk(backend_name, text, voice, output_path):
+    """Pool task: write one chunk as WAV."""
+    get_backend(backend_name).synthesize_wav(text, voice, output_path)
+    return output_path
+
+
+def concatenate_wav(paths, output_path):
+    """Join WAV files with identical formats into ``output_path``, streaming the frames."""
+    tmp_path = Path(output_path).with_name(f".{Path(output_path).name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with wave.open(str(tmp_path), "wb") as out:
+            params = None
+            for path in paths:
+                with wave.open(str(path), "rb") as clip:
+                    clip_params = clip.getparams()[:3]
+                    if params is None:
+                        params = clip_params
+                        out.setnchannels(params[0])
+                        out.setsampwidth(params[1])
+                        out.setframerate(params[2])
+                    elif clip_params != params:
+                        raise ValueError(
+                            f"Chunk {path} has format {clip_params}, expected {params}."
+                        )
+                    while frames := clip.readframes(FRAMES_PER_COPY):
+                        out.writeframes(frames)
+        shutil.move(str(tmp_path), output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class SpeechJob:
+    """One chunked synthesis: chunk paths fill in, in order, as workers finish."""
+
+    def __init__(self, backend_name, voice, chunks, output_path):
+        self.id = uuid.uuid4().hex[:12]
+        self.backend_name = backend_name
+        self.voice = voice
+        self.chunks = chunks
+        self.output_path = output_path
+        self.chunk_paths = [None] * len(chunks)
+        self.cached_chunks = 0
+        self.state = "running"
+        self.error = None
+        self.played = 0
+        self.started = time.time()
+        self.finished = None
+        self.first_chunk_seconds = None
+        self.work_dir = None
+        self._condition = threading.Condition()
+
+    def chunk_ready(self, index, path):
+        with self._condition:
+            self.chunk_paths[index] = path
+            if index == 0:
+                self.first_chunk_seconds = round(time.time() - self.started, 3)
+            self._condition.notify_all()
+
+    def finish(self, error=None):
+        with self._condition:
+            self.state = "failed" if error else "done"
+            self.error = str(error) if error else None
+            self.finished = time.time()
+            self._condition.notify_all()
+
+    def wait_for_chunk(self, index, timeout=None):
+        """Return the chunk's path once ready, or None if the job failed first."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.chunk_paths[index] is not None or self.state != "running",
+                timeout,
+            )
+            return self.chunk_paths[index]
+
+    def status(self):
+        ready = sum(path is not None for path in self.chunk_paths)
+        status = {
+            "job_id": self.id,
+            "state": self.state,
+            "backend": self.backend_name,
+            "chunks": len(self.chunks),
+            "chunks_ready": ready,
+            "cached_chunks": self.cached_chunks,
+            "chunks_played": self.played,
+            "first_chunk_path": str(self.chunk_paths[0]) if self.chunk_paths[0] else None,
+            "first_chunk_seconds": self.first_chunk_seconds,
+            "elapsed_seconds": round((self.finished or time.time()) - self.started, 3),
+        }
+        if self.output_path:
+            status["file_path"] = self.output_path
+        if self.error:
+            status["error_message"] = self.error
+        return status
+
+
+class SpeechJobRunner:
+    """Starts SpeechJobs on a worker pool and keeps recent ones for status queries."""
+
+    def __init__(self, pool_factory, cache=None):
+        self._pool_factory = pool_factory
+        self._pool = None
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._pool_factory()
+            return self._pool
+
+    def start(self, backend_name, voice, text, output_path, chunk_chars):
+        job = SpeechJob(backend_name, voice, split_sentences(text, chunk_chars), output_path)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        threading.Thread(target=self._run, args=(job,), name=f"tts-job-{job.id}", daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state != "running"]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            job = self._jobs.pop(job_id)
+            if job.work_dir:
+                shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def _run(self, job):
+        pending = {}
+        pool = None
+        try:
+            wav_format = get_backend(job.backend_name).wav_format
+            job.work_dir = tempfile.mkdtemp(prefix="tts-job-")
+            for index, text in enumerate(job.chunks):
+                key = chunk_key(job.backend_name, wav_format, job.voice, text)
+                # The job keeps its own link to every chunk, so cache eviction
+                # cannot remove one it is still playing, joining or reporting.
+                own_path = Path(job.work_dir) / f"{index}.wav"
+                cached = self._cache.get(key, "wav") if self._cache else None
+                if cached is not None:
+                    try:
+                        pending[index] = (key, _detach(cached, own_path), None)
+                        job.cached_chunks += 1
+                        continue
+                    except FileNotFoundError:
+                        pass  # Evicted since the lookup: synthesize it.
+                target = self._cache.tmp_path("wav") if self._cache is not None else own_path
+                pool = pool or self._get_pool()
+                future = pool.submit(synthesize_chunk, job.backend_name, text, job.voice, str(target))
+                pending[index] = (key, target, future)
+
+            for index in range(len(job.chunks)):
+                key, path, future = pending[index]
+                if future is not None:
+                    try:
+                        future.result()
+                        if self._cache is not None:
+                            own_path = Path(job.work_dir) / f"{index}.wav"
+                            # Link before adopting, while the file is only ours.
+                            _detach(path, own_path)
+                            self._cache.adopt(key, "wav", path)
+                            path = own_path
+                    except Exception:
+                        for _, _, other in pending.values():
+                            if other is not None:
+                                other.cancel()
+                        raise
+                job.chunk_ready(index, path)
+
+            if job.output_path:
+                concatenate_wav(job.chunk_paths, job.output_path)
+        except Exception as e:
+            job.finish(e)
+        else:
+            job.finish()
+        finally:
+            if self._cache is not None:
+                for _, path, future in pending.values():
+                    if future is not None and Path(path).name.startswith(".tmp-"):
+                        Path(path).unlink(missing_ok=True)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
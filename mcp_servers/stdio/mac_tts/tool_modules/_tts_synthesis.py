@@ -0,0 +1,162 @@
+"""On-disk audio cache and bounded synthesis queue for the text-to-speech tools.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class QueueFull(Exception):
+    pass
+
+
+def audio_key(backend_name, voice, extension, text):
+    """Cache key for one synthesized clip: backend, voice, file format and text hash."""
+    normalized = unicodedata.normalize("NFC", text).strip()
+    material = "\0".join((backend_name, voice or "", extension, normalized))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Directory of synthesized clips named ``<key>.<extension>``.
+
+    A hit refreshes the file's mtime; once the directory grows past
+    ``max_bytes``, the least recently used files are deleted until it is back
+    under 90% of the budget. Files are written under a temporary name and
+    renamed into place, so readers never see partial audio.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = {}
+        for path in self.directory.iterdir():
+            if path.name.startswith(".tmp-"):
+                path.unlink(missing_ok=True)
+            elif path.is_file():
+                self._sizes[path.name] = path.stat().st_size
+        self._bytes = sum(self._sizes.values())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, extension):
+        path = self.directory / f"{key}.{extension}"
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def tmp_path(self, extension):
+        """A fresh temporary path inside the cache directory, for ``adopt``."""
+        return self.directory / f".tmp-{uuid.uuid4().hex}.{extension}"
+
+    def put(self, key, extension, produce):
+        """Call ``produce(tmp_path)`` to write the clip, then move it into the cache."""
+        tmp_path = self.tmp_path(extension)
+        try:
+            produce(tmp_path)
+            return self.adopt(key, extension, tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def adopt(self, key, extension, tmp_path):
+        """Move a finished clip at ``tmp_path`` into the cache and return its cached path."""
+        path = self.directory / f"{key}.{extension}"
+        size = os.stat(tmp_path).st_size
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes += size - self._sizes.get(path.name, 0)
+            self._sizes[path.name] = size
+            if self._bytes > self.max_bytes:
+                self._evict(keep=path.name)
+        return path
+
+    def _evict(self, keep):
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for name in self._sizes:
+            try:
+                entries.append((os.stat(self.directory / name).st_mtime, name))
+            except FileNotFoundError:
+                entries.append((0.0, name))
+        for _, name in sorted(entries):
+            if self._bytes <= target:
+                break
+            if name == keep:
+                continue
+            (self.directory / name).unlink(missing_ok=True)
+            self._bytes -= self._sizes.pop(name)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "files": len(self._sizes),
+            "bytes": self._bytes,
+        }
+
+
+class SynthesisQueue:
+    """Runs synthesis jobs on ``max_workers`` threads with at most ``max_pending`` waiting.
+
+    Submitting beyond that raises ``QueueFull`` instead of growing the
+    backlog. A job whose key is already queued or running shares that job's
+    future.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def submit(self, key, func, *args):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            if not self._slots.acquire(blocking=False):
+                self.rejected += 1
+                raise QueueFull(
+                    f"Speech synthesis queue is full ({self.max_pending} waiting); try again shortly."
+                )
+            future = self._pool.submit(func, *args)
+            self._in_flight[key] = future
+            self.submitted += 1
+        future.add_done_callback(lambda _, key=key: self._finish(key))
+        return future
+
+    def _finish(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        self._slots.release()
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": len(self._in_flight),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
@@ -1,10 +1,102 @@
-import subprocess
 import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional
 
-def text_to_speech_mac(text_to_speak: str, voice: Optional[str] = None, output_file_path: Optional[str] = None) -> dict:
+from _tts_backends import SYNTHESIS_TIMEOUT, TTSError, get_backend
+from _tts_chunked import SpeechJobRunner
+from _tts_synthesis import AudioCache, QueueFull, SynthesisQueue, audio_key
+
+# Synthesis runs on a small worker pool with a bounded backlog; speaking aloud
+# is serialized separately so overlapping clips do not talk over each other.
+TTS_WORKERS = int(os.environ.get("TTS_WORKERS", "2"))
+TTS_QUEUE_SIZE = int(os.environ.get("TTS_QUEUE_SIZE", "8"))
+# Synthesized clips are cached here; set TTS_CACHE_DIR="" to disable.
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join("~", ".cache", "mcp_tts"))
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Chunked mode: sentence-packed chunks of up to TTS_CHUNK_CHARS characters are
+# synthesized on TTS_CHUNK_WORKERS threads, each driving one synthesizer
+# subprocess.
+TTS_CHUNK_WORKERS = int(os.environ.get("TTS_CHUNK_WORKERS", str(min(4, os.cpu_count() or 1))))
+TTS_CHUNK_CHARS = int(os.environ.get("TTS_CHUNK_CHARS", "400"))
+
+_queue = SynthesisQueue(TTS_WORKERS, TTS_QUEUE_SIZE)
+_cache = AudioCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES) if TTS_CACHE_DIR else None
+_playback_lock = threading.Lock()
+_jobs = SpeechJobRunner(
+    lambda: ThreadPoolExecutor(max_workers=TTS_CHUNK_WORKERS, thread_name_prefix="tts-chunk"),
+    _cache,
+)
+
+
+def _cached_clip(backend, text, voice, extension):
+    """Return (cache hit, path) for the clip, synthesizing it on the queue if needed."""
+    key = audio_key(backend.name, voice, extension, text)
+    path = _cache.get(key, extension)
+    if path is not None:
+        return True, path
+    produce = lambda tmp_path: backend.synthesize(text, voice, tmp_path)
+    return False, _queue.submit(key, _cache.put, key, extension, produce).result()
+
+
+def _synthesize(backend, text, voice, extension, output_path):
+    """Write the clip to ``output_path``; returns True when it came from the cache."""
+    if _cache is None:
+        key = f"{audio_key(backend.name, voice, extension, text)}:{output_path}"
+        _queue.submit(key, backend.synthesize, text, voice, output_path).result()
+        return False
+    hit, path = _cached_clip(backend, text, voice, extension)
+    shutil.copyfile(path, output_path)
+    return hit
+
+
+def _play_job(backend, job):
+    with _playback_lock:
+        for index in range(len(job.chunks)):
+            path = job.wait_for_chunk(index)
+            if path is None:
+                return
+            backend.play(path)
+            job.played += 1
+
+
+def _start_chunked(backend, text, voice, output_file_path):
+    if output_file_path and Path(output_file_path).suffix.lower() != ".wav":
+        return {"status": "error", "error_message": "Chunked mode writes WAV; use a .wav output_file_path."}
+    if not output_file_path and not backend.can_play:
+        return {"status": "error", "error_message": f"The {backend.name} backend cannot play chunked audio."}
+
+    job = _jobs.start(backend.name, voice, text, output_file_path, TTS_CHUNK_CHARS)
+    if not output_file_path:
+        threading.Thread(target=_play_job, args=(backend, job), daemon=True).start()
+    if job.wait_for_chunk(0, timeout=SYNTHESIS_TIMEOUT) is None:
+        status = job.status()
+        return {
+            "status": "error",
+            "error_message": status.get("error_message", "Timed out waiting for the first chunk."),
+            **status,
+        }
+    return {
+        "status": "success",
+        "message": "First chunk ready; the rest is still rendering. Poll text_to_speech_job_status.",
+        **job.status(),
+    }
+
+
+def text_to_speech_mac(
+    text_to_speak: str,
+    voice: Optional[str] = None,
+    output_file_path: Optional[str] = None,
+    backend: Optional[str] = None,
+    chunked: bool = False,
+) -> dict:
     """
-    Converts text to speech using the macOS 'say' command.
+    Converts text to speech using the macOS 'say' command, or another configured backend.
+
+    Synthesized audio is cached on disk by (backend, voice, format, text), so
+    repeating a prompt returns without running the synthesizer again.
 
     Args:
         text_to_speak (str): The text to be spoken or saved to an audio file.
@@ -15,6 +107,15 @@ def text_to_speech_mac(text_to_speak: str, voice: Optional[str] = None, output_f
             The file extension should typically be .aiff, .m4a, or .wav.
             Example: "output_audio.aiff".
             If None, the text will be spoken directly.
+        backend (str, optional): "say" (macOS), "espeak", "command" (the TTS_COMMAND
+            template) or "fake". Defaults to TTS_BACKEND, else "say" on macOS and
+            "espeak" elsewhere.
+        chunked (bool, optional): For long passages. Splits the text at sentence
+            boundaries, synthesizes the chunks in parallel and
+            returns as soon as the first chunk is ready, with a 'job_id' and
+            'first_chunk_path'. Spoken output starts playing immediately; a .wav
+            output_file_path is written once all chunks are joined. Use
+            text_to_speech_job_status to follow the job.
 
     Returns:
         dict: A dictionary containing the status of the operation.
@@ -24,15 +125,17 @@ def text_to_speech_mac(text_to_speak: str, voice: Optional[str] = None, output_f
                 {"status": "success", "message": "Audio saved to file.", "file_path": "path/to/output.aiff"}
               Example error: 
                 {"status": "error", "error_message": "Description of the error."}
+              Successes also carry "backend" and "cached".
     """
     if not text_to_speak or not text_to_speak.strip():
         return {"status": "error", "error_message": "Input text cannot be empty."}
 
     try:
-        command = ["say"]
-
-        if voice:
-            command.extend(["-v", voice])
+        tts_backend = get_backend(backend)
+        if chunked:
+            if output_file_path and os.path.dirname(output_file_path):
+                os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+            return _start_chunked(tts_backend, text_to_speak, voice, output_file_path)
 
         if output_file_path:
             output_dir = os.path.dirname(output_file_path)
@@ -42,35 +145,59 @@ def text_to_speech_mac(text_to_speak: str, voice: Optional[str] = None, output_f
                 except OSError as e:
                     return {"status": "error", "error_message": f"Could not create directory for output file: {e}"}
 
-            command.extend(["-o", output_file_path])
-
-        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = process.communicate(
-            input=text_to_speak.encode("utf-8"),
-            timeout=30,
-        )
-
-        if process.returncode == 0:
-            if output_file_path:
-                return {
-                    "status": "success", 
-                    "message": f"Audio successfully saved to {output_file_path}",
-                    "file_path": output_file_path
-                }
-            else:
-                return {"status": "success", "message": "Text spoken successfully."}
+            extension = Path(output_file_path).suffix.lstrip(".") or tts_backend.extension
+            cached = _synthesize(tts_backend, text_to_speak, voice, extension, output_file_path)
+            return {
+                "status": "success",
+                "message": f"Audio successfully saved to {output_file_path}",
+                "file_path": output_file_path,
+                "backend": tts_backend.name,
+                "cached": cached,
+            }
+
+        cached = False
+        if _cache is not None and tts_backend.can_play:
+            cached, audio_path = _cached_clip(tts_backend, text_to_speak, voice, tts_backend.extension)
+            with _playback_lock:
+                tts_backend.play(audio_path)
         else:
-            error_message = stderr.decode().strip() if stderr else "Unknown error during 'say' command execution."
-            return {"status": "error", "error_message": error_message, "return_code": process.returncode}
-
-    except FileNotFoundError:
-        return {"status": "error", "error_message": "'say' command not found. This function is for macOS only."}
-    except subprocess.TimeoutExpired:
-        process.kill()
-        return {"status": "error", "error_message": "'say' command timed out."}
+            with _playback_lock:
+                tts_backend.speak(text_to_speak, voice)
+        return {
+            "status": "success",
+            "message": "Text spoken successfully.",
+            "backend": tts_backend.name,
+            "cached": cached,
+        }
+
+    except TTSError as e:
+        result = {"status": "error", "error_message": str(e)}
+        if e.return_code is not None:
+            result["return_code"] = e.return_code
+        return result
+    except QueueFull as e:
+        return {"status": "error", "error_message": str(e)}
     except Exception as e:
         return {"status": "error", "error_message": f"An unexpected error occurred: {str(e)}"}
 
+def text_to_speech_job_status(job_id: str) -> dict:
+    """
+    Reports the progress of a chunked text_to_speech_mac job.
+
+    Args:
+        job_id (str): The 'job_id' returned by text_to_speech_mac(chunked=True).
+
+    Returns:
+        dict: The job state ("running", "done" or "failed"), chunk counts, paths and timings.
+              Example: {"status": "success", "job_id": "...", "state": "done", "chunks": 12,
+                        "chunks_ready": 12, "file_path": "story.wav", ...}
+    """
+    job = _jobs.get(job_id)
+    if job is None:
+        return {"status": "error", "error_message": f"Unknown or expired job id: {job_id}"}
+    return {"status": "success", **job.status()}
+
+
 if __name__ == '__main__':
     # Example Usage (for direct testing of this script)
     # Spoken directly
@@ -0,0 +1,237 @@
+// Mindmap renderer for markmapper's "offline" output mode. Written for this
+// project: it draws markmap's layout (root on the left, children to the right
+// of their parent, curved links, one colour per top-level branch) as SVG, but
+// shares no code with markmap and needs no network.
+//
+// Reads the pre-parsed hierarchy from <script id="mindmap-data"> ({"t": text,
+// "c": children}) and lays out and draws only expanded branches, so collapsed
+// parts of a large map cost nothing. Clicking a node's label or circle toggles
+// it. Nodes carrying a "k" chunk id have their children in <chunk base><id>.js,
+// loaded on first expand; those files call window.__mindmapChunk(id, children).
+(function () {
+  "use strict";
+
+  var SVG_NS = "http://www.w3.org/2000/svg";
+  var FONT = '14px -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif';
+  var ROW_HEIGHT = 30; // vertical space per visible leaf
+  var LINK_WIDTH = 64; // horizontal space between a label's end and its children
+  var MAX_LABEL_WIDTH = 320;
+  var LABEL_PADDING = 6;
+  var MARGIN = 24;
+  var COLORS = [
+    "#4e79a7",
+    "#f28e2b",
+    "#e15759",
+    "#76b7b2",
+    "#59a14f",
+    "#edc948",
+    "#b07aa1",
+    "#ff9da7",
+    "#9c755f",
+  ];
+
+  var dataElement = document.getElementById("mindmap-data");
+  var chunkBase = dataElement.getAttribute("data-chunk-base") || "";
+  var expandLevel = parseInt(dataElement.getAttribute("data-expand-level"), 10);
+  if (isNaN(expandLevel)) {
+    expandLevel = 2;
+  }
+  var pendingChunks = {};
+
+  window.__mindmapChunk = function (id, children) {
+    var callbacks = pendingChunks[id] || [];
+    delete pendingChunks[id];
+    callbacks.forEach(function (callback) {
+      callback(children);
+    });
+  };
+
+  function loadChunk(id, callback) {
+    if (pendingChunks[id]) {
+      pendingChunks[id].push(callback);
+      return;
+    }
+    pendingChunks[id] = [callback];
+    var script = document.createElement("script");
+    script.src = chunkBase + id + ".js";
+    script.onerror = function () {
+      window.__mindmapChunk(id, null);
+    };
+    document.head.appendChild(script);
+  }
+
+  var measureContext = document.createElement("canvas").getContext("2d");
+  measureContext.font = FONT;
+
+  function textWidth(text) {
+    return measureContext.measureText(text).width;
+  }
+
+  // Label text and width are worked out once per node, when it first shows.
+  function fitLabel(node) {
+    var label = node.t;
+    var width = textWidth(label);
+    if (width > MAX_LABEL_WIDTH) {
+      var keep = Math.floor((label.length * MAX_LABEL_WIDTH) / width);
+      while (keep > 1 && textWidth(label.slice(0, keep) + "…") > MAX_LABEL_WIDTH) {
+        keep -= 1;
+      }
+      label = label.slice(0, keep) + "…";
+      width = textWidth(label);
+    }
+    node._label = label;
+    node._width = width + 2 * LABEL_PADDING;
+  }
+
+  function hasChildren(node) {
+    return node.c ? node.c.length > 0 : node.k !== undefined;
+  }
+
+  function initOpen(node, depth) {
+    node._open = !!node.c && (expandLevel < 0 || depth < expandLevel);
+    if (node.c) {
+      node.c.forEach(function (child) {
+        initOpen(child, depth + 1);
+      });
+    }
+  }
+
+  // Places visible nodes: x from the parent's right edge, y from the running
+  // leaf row, with parents centred on their children. Returns the next row.
+  function layout(node, x, row, color, visible) {
+    if (node._label === undefined) {
+      fitLabel(node);
+    }
+    node._x = x;
+    node._color = color;
+    visible.push(node);
+    if (!node._open) {
+      node._y = row;
+      return row + ROW_HEIGHT;
+    }
+    var childX = x + node._width + LINK_WIDTH;
+    var isRoot = visible.length === 1;
+    node.c.forEach(function (child, index) {
+      row = layout(child, childX, row, isRoot ? COLORS[index % COLORS.length] : color, visible);
+    });
+    node._y = (node.c[0]._y + node.c[node.c.length - 1]._y) / 2;
+    return row;
+  }
+
+  function svgElement(name, attributes, parent) {
+    var element = document.createElementNS(SVG_NS, name);
+    Object.keys(attributes).forEach(function (key) {
+      element.setAttribute(key, attributes[key]);
+    });
+    if (parent) {
+      parent.appendChild(element);
+    }
+    return element;
+  }
+
+  var container = document.getElementById("mindmap");
+  var svg = svgElement("svg", { class: "mm-map" }, container);
+  var tree = JSON.parse(dataElement.textContent);
+  var visible = [];
+  initOpen(tree, 0);
+
+  function linkPath(parent, child) {
+    var startX = parent._x + parent._width;
+    var endX = child._x;
+    var middleX = (startX + endX) / 2;
+    return (
+      "M" + startX + "," + parent._y +
+      "C" + middleX + "," + parent._y + " " + middleX + "," + child._y + " " + endX + "," + child._y
+    );
+  }
+
+  function draw() {
+    visible = [];
+    var height = layout(tree, MARGIN, MARGIN + ROW_HEIGHT / 2, COLORS[0], visible);
+    var width = 0;
+    while (svg.firstChild) {
+      svg.removeChild(svg.firstChild);
+    }
+    var links = svgElement("g", { class: "mm-links" }, svg);
+    var nodes = svgElement("g", { class: "mm-nodes" }, svg);
+
+    visible.forEach(function (node, index) {
+      width = Math.max(width, node._x + node._width + LINK_WIDTH);
+      if (node._open) {
+        node.c.forEach(function (child) {
+          svgElement("path", { d: linkPath(node, child), stroke: child._color }, links);
+        });
+      }
+
+      var classes = "mm-node";
+      if (node._loading) {
+        classes += " mm-loading";
+      }
+      if (node._error) {
+        classes += " mm-error";
+      }
+      var group = svgElement(
+        "g",
+        { class: classes, "data-index": index, transform: "translate(" + node._x + "," + node._y + ")" },
+        nodes
+      );
+      var title = svgElement("title", {}, group);
+      title.textContent = node.t;
+      svgElement("line", { x1: 0, y1: 0, x2: node._width, y2: 0, stroke: node._color }, group);
+      var text = svgElement("text", { x: LABEL_PADDING, y: -6 }, group);
+      text.textContent = node._label;
+      if (hasChildren(node)) {
+        svgElement(
+          "circle",
+          { cx: node._width, cy: 0, r: 4.5, stroke: node._color, fill: node._open ? "#fff" : node._color },
+          group
+        );
+        if (!node._open && node.n) {
+          var count = svgElement("text", { class: "mm-count", x: node._width + 9, y: 4 }, group);
+          count.textContent = node.n;
+        }
+      }
+    });
+
+    svg.setAttribute("width", width + MARGIN);
+    svg.setAttribute("height", height + MARGIN);
+  }
+
+  function toggle(node) {
+    if (node._open) {
+      node._open = false;
+    } else if (node.c) {
+      node._open = node.c.length > 0;
+    } else if (node.k !== undefined && !node._loading) {
+      node._loading = true;
+      node._error = false;
+      loadChunk(node.k, function (children) {
+        node._loading = false;
+        if (children === null) {
+          node._error = true;
+        } else {
+          // Loaded branches start collapsed below their first level.
+          node.c = children;
+          node._open = children.length > 0;
+        }
+        draw();
+      });
+    }
+    draw();
+  }
+
+  svg.addEventListener("click", function (event) {
+    var target = event.target;
+    while (target && target !== svg && !target.hasAttribute("data-index")) {
+      target = target.parentNode;
+    }
+    if (target && target !== svg) {
+      var node = visible[parseInt(target.getAttribute("data-index"), 10)];
+      if (hasChildren(node)) {
+        toggle(node);
+      }
+    }
+  });
+
+  draw();
+})();
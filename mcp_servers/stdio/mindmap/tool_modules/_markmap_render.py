@@ -0,0 +1,175 @@
+"""Streaming markmap page rendering shared by the markmapper tools.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+Batch jobs run ``render_job`` on a thread pool.
+"""
+
+import hashlib
+import os
+
+# The page is written as head, one line per markdown line, then tail, so the
+# markdown never needs to be joined into a second copy.
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <meta http-equiv="X-UA-Compatible" content="IE=edge" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{title}</title>
+    <style>
+      svg.markmap {{
+        width: 100%;
+        height: 100vh;
+      }}
+      
+    </style>
+    <script src="https://cdn.jsdelivr.net/npm/markmap-autoloader@0.18"></script>
+  </head>
+  <body>
+    <div class="markmap">
+      <script type="text/template">
+        ---
+        markmap:
+          maxWidth: 300
+          initialExpandLevel: -1
+          spacingHorizontal: 80
+          spacingVertical: 5
+          duration: 1000
+          colorFreezeLevel: 3
+        ---
+"""
+HTML_TAIL = """      </script>
+    </div>
+  </body>
+</html>"""
+
+VALID_MARKDOWN_CHARACTERS = ("#", "-", "*", ">", "`", "=")
+HASH_READ_SIZE = 1024 * 1024
+
+
+def iter_lines(markdown_content):
+    """Yield lines without their line endings, one slice of the input at a time.
+
+    Lines end at "\n", "\r\n" or "\r", as with universal newlines. Only the
+    current line is copied, so memory stays proportional to the longest line
+    rather than to the input.
+    """
+    text = markdown_content
+    end = len(text)
+    position = 0
+    next_lf = text.find("\n")
+    next_cr = text.find("\r")
+    while position < end:
+        # Each separator is searched for again only once it has been passed,
+        # so the input is scanned once overall.
+        if 0 <= next_lf < position:
+            next_lf = text.find("\n", position)
+        if 0 <= next_cr < position:
+            next_cr = text.find("\r", position)
+        if next_lf < 0 and next_cr < 0:
+            yield text[position:]
+            return
+        stop = next_cr if next_lf < 0 or 0 <= next_cr < next_lf else next_lf
+        yield text[position:stop]
+        position = stop + 1
+        if text[stop] == "\r" and text.startswith("\n", position):
+            position += 1
+
+
+def validated_lines(lines):
+    for line in lines:
+        if not line.strip():
+            yield ""
+        elif line.lstrip() != line:
+            # Leave indented (nested) lines alone
+            yield line
+        elif line.startswith(VALID_MARKDOWN_CHARACTERS):
+            yield line
+        else:
+            yield f"- {line}"
+
+
+def html_chunks(markdown_content, title):
+    yield HTML_HEAD.format(title=title)
+    # One blank line is held back so a trailing one is dropped, as the
+    # original join/splitlines round trip did.
+    held_blank = False
+    wrote_line = False
+    for line in validated_lines(iter_lines(markdown_content)):
+        if held_blank:
+            yield "\n"
+            wrote_line = True
+        held_blank = not line.strip()
+        if not held_blank:
+            # Indent the markdown block for pretty output
+            yield "        " + line + "\n"
+            wrote_line = True
+    if not wrote_line:
+        yield "\n"
+    yield HTML_TAIL
+
+
+def _digest_chunks(chunks):
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        digest.update(data)
+        size += len(data)
+    return digest.hexdigest(), size
+
+
+def _file_digest(path, size):
+    """SHA-256 of an existing file, or None if it is missing or a different size."""
+    try:
+        if os.path.getsize(path) != size:
+            return None
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(HASH_READ_SIZE):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def write_page(chunks_factory, output_filename, skip_unchanged=False):
+    """Stream ``chunks_factory()`` to ``output_filename``.
+
+    With ``skip_unchanged`` the chunks are hashed first, and the file is left
+    untouched (mtime included) when it already holds the same bytes. Returns
+    (written, sha256).
+    """
+    content_hash = None
+    if skip_unchanged:
+        content_hash, size = _digest_chunks(chunks_factory())
+        if _file_digest(output_filename, size) == content_hash:
+            return False, content_hash
+
+    with open(output_filename, "w", encoding="utf-8", newline="\n") as f:
+        f.writelines(chunks_factory())
+    return True, content_hash
+
+
+def render_job(markdown_content, title, output_filename, output_format="markmap", chunk_depth=3):
+    """Render one page of a convert_markdown_batch call and report its status."""
+    result = {"file_path": output_filename}
+    try:
+        if output_format == "offline":
+            from _offline_mindmap import write_offline_page
+
+            written, content_hash, chunks_written, chunks = write_offline_page(
+                markdown_content, title, output_filename, chunk_depth, skip_unchanged=True
+            )
+            result.update(chunk_files=chunks, chunk_files_written=chunks_written)
+        else:
+            written, content_hash = write_page(
+                lambda: html_chunks(markdown_content, title), output_filename, skip_unchanged=True
+            )
+    except OSError as e:
+        return {**result, "status": "error", "error_message": str(e)}
+    return {
+        **result,
+        "status": "written" if written else "unchanged",
+        "sha256": content_hash,
+    }
@@ -0,0 +1,187 @@
+"""The "offline" output mode of markmapper: a mindmap page that needs no network.
+
+Private helper: the stdio runtime does not load ``_*.py`` files as tools.
+
+The markdown hierarchy is parsed here. The page embeds it as compact JSON
+(``{"t": text, "c": [children]}``) and inlines ``mindmap/assets/offline_mindmap.js``,
+a renderer written for this project that draws the map as SVG in markmap's
+layout (root on the left, curved links, one colour per branch) but shares no
+code with markmap. It lays out and draws only expanded branches, and the page
+does no markdown parsing in the browser.
+Subtrees of nodes at ``chunk_depth`` move to ``<page>_chunks/<id>.js`` files,
+which the renderer loads with a script tag when such a node is first expanded.
+Script tags work from ``file://`` URLs, unlike ``fetch``.
+"""
+
+import html
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
+
+from _markmap_render import iter_lines, validated_lines, write_page
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+RENDERER_PATH = ASSETS_DIR / "offline_mindmap.js"
+STYLESHEET_PATH = ASSETS_DIR / "offline_mindmap.css"
+
+HEADING_RE = re.compile(r"(#{1,6})\s+(.*)")
+LIST_MARKER_RE = re.compile(r"(?:[-*+]|\d+[.)])\s+")
+
+MINDMAP_HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{title}</title>
+    <style>
+{stylesheet}
+    </style>
+  </head>
+  <body>
+    <div id="mindmap"></div>
+    <script type="application/json" id="mindmap-data" data-chunk-base="{chunk_base}" data-expand-level="{expand_level}">"""
+MINDMAP_HTML_TAIL = """</script>
+    <script>
+{renderer}
+    </script>
+  </body>
+</html>"""
+
+
+@lru_cache(maxsize=None)
+def _asset(path):
+    return path.read_text(encoding="utf-8")
+
+
+_SCRIPT_ESCAPES = str.maketrans({"<": "\\u003c", ">": "\\u003e", "&": "\\u0026"})
+
+
+def _json_for_script(value):
+    # Node text such as "</script>", "<!--" or "<script" must not be able to
+    # end or re-enter the enclosing <script> element; JSON.parse and the JS
+    # parser read the \u escapes back as the same characters.
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).translate(_SCRIPT_ESCAPES)
+
+
+def parse_markdown_tree(markdown_content, title):
+    """Build the {"t", "c"} node tree from headings and indented list items."""
+    root = {"t": title, "c": []}
+    headings = [(0, root)]
+    items = []
+
+    for line in validated_lines(iter_lines(markdown_content)):
+        if not line.strip():
+            continue
+        heading = HEADING_RE.fullmatch(line)
+        if heading:
+            level = len(heading.group(1))
+            while headings[-1][0] >= level:
+                headings.pop()
+            node = {"t": heading.group(2).strip(), "c": []}
+            headings[-1][1]["c"].append(node)
+            headings.append((level, node))
+            items = []
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        text = line.strip()
+        marker = LIST_MARKER_RE.match(text)
+        if marker:
+            text = text[marker.end() :]
+        else:
+            text = text.lstrip(">`=").strip() or text
+        while items and items[-1][0] >= indent:
+            items.pop()
+        parent = items[-1][1] if items else headings[-1][1]
+        node = {"t": text, "c": []}
+        parent["c"].append(node)
+        items.append((indent, node))
+
+    # A document with a single top-level heading uses it as the root.
+    if len(root["c"]) == 1:
+        root = root["c"][0]
+    return root
+
+
+def _count(node):
+    return 1 + sum(_count(child) for child in node["c"])
+
+
+def split_chunks(node, chunk_depth, depth=0, chunks=None):
+    """Return a compact copy of ``node`` with subtrees at ``chunk_depth`` moved into ``chunks``.
+
+    Chunked nodes keep their text plus ``"k"`` (chunk id) and ``"n"`` (number
+    of nodes in the chunk).
+    """
+    if chunks is None:
+        chunks = []
+    compact = {"t": node["t"]}
+    if not node["c"]:
+        return compact, chunks
+    if chunk_depth and depth >= chunk_depth:
+        compact["k"] = len(chunks)
+        chunks.append([_compact(child) for child in node["c"]])
+        compact["n"] = _count(node) - 1
+        return compact, chunks
+    compact["c"] = [split_chunks(child, chunk_depth, depth + 1, chunks)[0] for child in node["c"]]
+    return compact, chunks
+
+
+def _compact(node):
+    compact = {"t": node["t"]}
+    if node["c"]:
+        compact["c"] = [_compact(child) for child in node["c"]]
+    return compact
+
+
+def _mindmap_page_chunks(tree, title, chunk_base, expand_level):
+    yield MINDMAP_HTML_HEAD.format(
+        title=html.escape(title),
+        stylesheet=_asset(STYLESHEET_PATH),
+        chunk_base=html.escape(chunk_base),
+        expand_level=expand_level,
+    )
+    yield _json_for_script(tree)
+    yield MINDMAP_HTML_TAIL.format(renderer=_asset(RENDERER_PATH))
+
+
+def write_offline_page(
+    markdown_content, title, output_filename, chunk_depth=3, expand_level=2, skip_unchanged=False
+):
+    """Write an offline mindmap page and its chunk files.
+
+    Returns (page written, page sha256, chunk files written, chunk files total).
+    Chunk files left over from an earlier render of the same page are removed.
+    """
+    tree, chunks = split_chunks(parse_markdown_tree(markdown_content, title), chunk_depth)
+
+    output_path = Path(output_filename)
+    chunk_dir = output_path.with_name(output_path.stem + "_chunks")
+    chunks_written = 0
+    if chunks:
+        chunk_dir.mkdir(parents=True, exist_ok=True)
+        for chunk_id, children in enumerate(chunks):
+            written, _ = write_page(
+                lambda: iter(
+                    (f"window.__mindmapChunk({chunk_id},", _json_for_script(children), ");\n")
+                ),
+                chunk_dir / f"{chunk_id}.js",
+                skip_unchanged=skip_unchanged,
+            )
+            chunks_written += written
+    if chunk_dir.is_dir():
+        for stale in chunk_dir.glob("*.js"):
+            if not stale.stem.isdigit() or int(stale.stem) >= len(chunks):
+                os.remove(stale)
+        if not chunks and not any(chunk_dir.iterdir()):
+            chunk_dir.rmdir()
+
+    written, content_hash = write_page(
+        lambda: _mindmap_page_chunks(tree, title, quote(chunk_dir.name) + "/", expand_level),
+        output_filename,
+        skip_unchanged=skip_unchanged,
+    )
+    return written, content_hash, chunks_written, len(chunks)
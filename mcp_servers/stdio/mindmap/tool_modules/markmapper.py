@@ -1,83 +1,151 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-# You can embed the template directly, or load from a file. Here it’s embedded for clarity.
-html_template = """<!DOCTYPE html>
-<html lang="en">
-  <head>
-    <meta charset="UTF-8" />
-    <meta http-equiv="X-UA-Compatible" content="IE=edge" />
-    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-    <title>{title}</title>
-    <style>
-      svg.markmap {{
-        width: 100%;
-        height: 100vh;
-      }}
-      
-    </style>
-    <script src="https://cdn.jsdelivr.net/npm/markmap-autoloader@0.18"></script>
-  </head>
-  <body>
-    <div class="markmap">
-      <script type="text/template">
-        ---
-        markmap:
-          maxWidth: 300
-          initialExpandLevel: -1
-          spacingHorizontal: 80
-          spacingVertical: 5
-          duration: 1000
-          colorFreezeLevel: 3
-        ---
-{script_content}
-      </script>
-    </div>
-  </body>
-</html>"""
-
-def convert_markdown_to_html(markdown_content: str, title: str, output_filename: Optional[str] = None) -> dict:
+from _markmap_render import html_chunks, render_job, write_page
+from _offline_mindmap import write_offline_page
+
+OUTPUT_FORMATS = ("markmap", "offline")
+
+# Batches smaller than this render on the calling thread.
+MIN_POOL_BATCH = 4
+
+
+def convert_markdown_to_html(
+    markdown_content: str,
+    title: str,
+    output_filename: Optional[str] = None,
+    output_format: str = "markmap",
+    chunk_depth: int = 3,
+) -> dict:
     """
-    Converts a markdown string into an interactive HTML mindmap using markmap.js.
+    Converts a markdown string into an interactive HTML mindmap, drawn by markmap.js by
+    default or by an inlined renderer that works offline.
     
     Args:
         markdown_content (str): The markdown text to visualize. Use headers (#) and bullets (-) for hierarchy.
         title (str): The title of the generated HTML page.
         output_filename (str): Optional. The filename to save the HTML to (e.g., 'my_mindmap.html').
                                If not provided, defaults to '{title}.html'.
+        output_format (str): "markmap" (default) embeds the markdown for markmap.js from a CDN.
+                             "offline" parses the hierarchy here and inlines this project's
+                             own mindmap renderer, which draws only expanded branches; it
+                             needs no network and suits thousands of nodes.
+        chunk_depth (int): For "offline" only. Children of nodes at this depth are written to
+                           '<output name>_chunks/' and loaded when the node is expanded;
+                           0 keeps the whole map in the page.
     
     Returns:
-        dict: A status dictionary like {"done": "good"}.
+        dict: A status dictionary like {"status": "success", "file_path": "my_mindmap.html"}.
     """
-    def validate_markdown_content(md: str) -> str:
-        valid_markdown_characters = ("#", "-", "*", ">", "`", "=")
-        output_lines = []
-        for line in md.splitlines():
-            if not line.strip():
-                output_lines.append("")
-            elif line.lstrip() != line:
-                # Leave indented (nested) lines alone
-                output_lines.append(line)
-            elif line.startswith(valid_markdown_characters):
-                output_lines.append(line)
-            else:
-                output_lines.append(f"- {line}")
-        return "\n".join(output_lines)
-
-    validated_content = validate_markdown_content(markdown_content)
-    # Indent the markdown block for pretty output
-    indented_content = "\n".join("        " + line if line.strip() else "" for line in validated_content.splitlines())
-    html_output = html_template.format(title=title, script_content=indented_content)
-
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}")
     if output_filename is None:
         output_filename = f"{title}.html"
 
     try:
-        with open(output_filename, "w", encoding="utf-8") as f:
-            f.write(html_output)
+        if output_format == "offline":
+            _, _, _, chunk_files = write_offline_page(
+                markdown_content, title, output_filename, chunk_depth
+            )
+            return {"status": "success", "file_path": output_filename, "chunk_files": chunk_files}
+        # Lines stream from the input string to the file; the page is never
+        # assembled in memory.
+        write_page(lambda: html_chunks(markdown_content, title), output_filename)
         return {"status": "success", "file_path": output_filename}
     except IOError as e:
         raise RuntimeError(f"Error writing to file {output_filename}: {e}")
 
+
+def convert_markdown_batch(
+    documents: list[dict],
+    output_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    output_format: str = "markmap",
+    chunk_depth: int = 3,
+) -> dict:
+    """
+    Converts many markdown documents into markmap HTML pages in parallel.
+
+    Pages whose rendered content is byte-for-byte identical to the existing output
+    file are not rewritten, so re-running a batch only touches changed maps.
+
+    Args:
+        documents (list[dict]): One entry per page, each with 'markdown_content' and 'title',
+                                and optionally 'output_filename' (defaults to '{title}.html').
+        output_dir (str): Optional. Directory for relative output filenames; created if missing.
+        max_workers (int): Optional. Worker threads to use; defaults to the CPU count.
+        output_format (str): "markmap" or "offline", as for convert_markdown_to_html.
+        chunk_depth (int): Chunking depth for "offline" pages, as for convert_markdown_to_html.
+
+    Returns:
+        dict: Per-page results and counts, e.g.
+              {"status": "success", "written": 3, "unchanged": 7, "failed": 0,
+               "results": [{"file_path": "a.html", "status": "written", "sha256": "..."}, ...]}
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}")
+
+    started = time.perf_counter()
+    jobs = []
+    results = [None] * len(documents)
+    for index, document in enumerate(documents):
+        if not isinstance(document, dict) or not {"markdown_content", "title"} <= document.keys():
+            results[index] = {
+                "status": "error",
+                "error_message": "Each document needs 'markdown_content' and 'title'.",
+            }
+            continue
+        output_filename = document.get("output_filename") or f"{document['title']}.html"
+        if output_dir:
+            output_filename = os.path.join(output_dir, output_filename)
+        jobs.append(
+            (
+                index,
+                (
+                    document["markdown_content"],
+                    document["title"],
+                    output_filename,
+                    output_format,
+                    chunk_depth,
+                ),
+            )
+        )
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    if len(jobs) < MIN_POOL_BATCH or workers == 1:
+        for index, args in jobs:
+            results[index] = render_job(*args)
+    else:
+        # Threads, not processes: page writes and hashing release the GIL, and
+        # worker processes would re-import the whole server to render a page.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="markmap") as pool:
+            futures = [(index, args[2], pool.submit(render_job, *args)) for index, args in jobs]
+            for index, output_filename, future in futures:
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = {
+                        "file_path": output_filename,
+                        "status": "error",
+                        "error_message": str(e),
+                    }
+
+    counts = {"written": 0, "unchanged": 0, "failed": 0}
+    for result in results:
+        counts["failed" if result["status"] == "error" else result["status"]] += 1
+    return {
+        "status": "success" if not counts["failed"] else "partial",
+        **counts,
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+
+
 if __name__ == "__main__":
     sample_markdown = """
 # Sample Markmap
@@ -95,5 +163,8 @@ Another line without a bullet
     output_filename = "test_markmap_corrected.html"
     print("Converting sample markdown to HTML with corrected logic...")
     convert_markdown_to_html(sample_markdown, title="Test_Markmap", output_filename=output_filename)
+    convert_markdown_to_html(
+        sample_markdown, title="Test_Markmap", output_filename="test_markmap_offline.html", output_format="offline"
+    )
     print(f"Successfully saved Markmap to '{output_filename}'")
     print("Open the file in a browser to see that nested items are now rendered correctly.")
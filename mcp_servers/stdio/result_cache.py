@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+
+def _content_size(contents: list[Any]) -> int:
+    size = 0
+    for content in contents:
+        text = getattr(content, "text", None)
+        size += len(text) if isinstance(text, str) else len(content.model_dump_json())
+    return size
+
+
+@dataclass
+class _CacheEntry:
+    tool_name: str
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ToolResultCache:
+    """LRU cache of encoded tool results with TTL and a byte budget.
+
+    Keys are the tool name plus the canonical JSON of the arguments. Concurrent
+    calls with the same key share one execution: the first caller computes the
+    result and the others await it. If that caller is cancelled, a waiting
+    caller takes over the computation. Failures are never cached.
+
+    ``invalidate`` bumps a per-tool generation. A result is stored only if its
+    tool's generation is unchanged since the computation started, so a call
+    that was in flight during an invalidation cannot cache what it read
+    before it; later calls do not join such a call either.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        sizeof: Callable[[Any], int] = _content_size,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._generations: dict[str | None, int] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: dict[str, Any]) -> str | None:
+        try:
+            canonical = json.dumps(
+                arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+            )
+        except (TypeError, ValueError):
+            return None
+        return f"{tool_name}\x00{canonical}"
+
+    def _generation(self, tool_name: str) -> tuple[int, int]:
+        return self._generations.get(None, 0), self._generations.get(tool_name, 0)
+
+    def _remove(self, key: str) -> _CacheEntry:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def _lookup(self, key: str) -> _CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, tool_name: str, value: Any, ttl: float) -> None:
+        size = self._sizeof(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = _CacheEntry(tool_name, value, size, self._clock() + ttl)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def get_or_compute(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        ttl: float | None = None,
+    ) -> Any:
+        key = self.make_key(tool_name, arguments)
+        if key is None:
+            return await compute()
+
+        while True:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry.value
+
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            # Unlike awaiting the future, wait() does not raise when the
+            # leader was cancelled, only when this caller is.
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                return pending.result()
+            # The leader was cancelled, not this call: compute it ourselves.
+
+        self.misses += 1
+        generation = self._generation(tool_name)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an exception nobody waited on is not logged.
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if self._generation(tool_name) == generation:
+                self._store(key, tool_name, value, self.default_ttl if ttl is None else ttl)
+            return value
+        finally:
+            # invalidate() may have detached this call already.
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def invalidate(self, tool_name: str | None = None) -> int:
+        """Drop cached results, for one tool or for all of them."""
+        self._generations[tool_name] = self._generations.get(tool_name, 0) + 1
+        for key in [
+            key
+            for key in self._in_flight
+            if tool_name is None or key.startswith(tool_name + "\x00")
+        ]:
+            del self._in_flight[key]
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if tool_name is None or entry.tool_name == tool_name
+        ]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "in_flight": len(self._in_flight),
+        }
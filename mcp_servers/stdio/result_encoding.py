@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Callable
+
+from mcp import types as mcp_types
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib encoder.
+    orjson = None
+
+
+ToolContent = mcp_types.TextContent | mcp_types.ImageContent | mcp_types.EmbeddedResource
+ResultEncoder = Callable[[str, Any], list[ToolContent]]
+
+
+def dumps_compact(value: Any) -> str:
+    """Encode JSON without whitespace, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # orjson rejects some inputs the stdlib accepts (e.g. ints > 64 bit).
+            pass
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps_pretty(value: Any) -> str:
+    return json.dumps(value, indent=2)
+
+
+def _result_uri(tool_name: str) -> str:
+    return f"tool://{tool_name}/result"
+
+
+def _encode_bytes(tool_name: str, data: bytes) -> list[ToolContent]:
+    try:
+        return [mcp_types.TextContent(type="text", text=data.decode("utf-8"))]
+    except UnicodeDecodeError:
+        return [
+            mcp_types.EmbeddedResource(
+                type="resource",
+                resource=mcp_types.BlobResourceContents(
+                    uri=_result_uri(tool_name),
+                    mimeType="application/octet-stream",
+                    blob=base64.b64encode(data).decode("ascii"),
+                ),
+            )
+        ]
+
+
+def make_result_encoder(
+    dumps: Callable[[Any], str] = dumps_compact, *, structured: bool = False
+) -> ResultEncoder:
+    """Build an encoder turning a tool's return value into MCP content.
+
+    Strings pass through unchanged and bytes are decoded as UTF-8 (or sent as a
+    base64 blob), so tools that already return JSON are not encoded twice.
+    Anything else is serialized once with ``dumps``. With ``structured=True``
+    the JSON is sent as an embedded ``application/json`` resource, which is the
+    closest the pinned MCP SDK gets to structured tool output.
+    """
+
+    def encode(tool_name: str, response: Any) -> list[ToolContent]:
+        if isinstance(response, str):
+            return [mcp_types.TextContent(type="text", text=response)]
+        if isinstance(response, (bytes, bytearray, memoryview)):
+            return _encode_bytes(tool_name, bytes(response))
+
+        text = dumps(response)
+        if structured:
+            return [
+                mcp_types.EmbeddedResource(
+                    type="resource",
+                    resource=mcp_types.TextResourceContents(
+                        uri=_result_uri(tool_name),
+                        mimeType="application/json",
+                        text=text,
+                    ),
+                )
+            ]
+        return [mcp_types.TextContent(type="text", text=text)]
+
+    return encode
+
+
+RESULT_ENCODERS: dict[str, Callable[[], ResultEncoder]] = {
+    "compact": make_result_encoder,
+    "pretty": lambda: make_result_encoder(dumps_pretty),
+    "structured": lambda: make_result_encoder(structured=True),
+}
+
+
+def get_result_encoder(name: str) -> ResultEncoder:
+    try:
+        return RESULT_ENCODERS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown result format {name!r}; expected one of {sorted(RESULT_ENCODERS)}"
+        ) from None
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The stdio runtime modules are imported as top-level modules, as the server
+# scripts do.
+STDIO_ROOT = Path(__file__).resolve().parent.parent
+if str(STDIO_ROOT) not in sys.path:
+    sys.path.insert(0, str(STDIO_ROOT))
@@ -0,0 +1,31 @@
+"""Runs a stdio runtime Server against an in-memory client session."""
+
+import asyncio
+import json
+from pathlib import Path
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+
+def run_session(app, scenario):
+    """Run ``await scenario(session)`` against ``app`` and return its result."""
+
+    async def main():
+        async with create_connected_server_and_client_session(app) as session:
+            return await scenario(session)
+
+    return asyncio.run(main())
+
+
+async def call_json(session, name, arguments=None):
+    result = await session.call_tool(name, arguments or {})
+    return json.loads(result.content[0].text)
+
+
+def write_server(root, modules):
+    """Create a server directory whose tool_modules hold ``{filename: source}``."""
+    tool_modules = Path(root) / "server" / "tool_modules"
+    tool_modules.mkdir(parents=True, exist_ok=True)
+    for filename, source in modules.items():
+        (tool_modules / filename).write_text(source)
+    return tool_modules.parent
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, Overloaded
+
+
+async def _hold(controller, tool_name, started, release, **limits):
+    async with controller.admit(tool_name, **limits):
+        started.append(tool_name)
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_new_call_does_not_overtake_waiters_that_can_run():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=2)
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(_hold(controller, "a", started, release, max_concurrency=1))]
+        await _settle()
+        tasks.append(asyncio.create_task(_hold(controller, "a", started, release, max_concurrency=1)))
+        await _settle()
+        # Raising the cap lets the queued "a" call use the free global slot.
+        tasks.append(asyncio.create_task(_hold(controller, "a", started, release, max_concurrency=3)))
+        await _settle()
+        tasks.append(asyncio.create_task(_hold(controller, "b", started, release)))
+        await _settle()
+
+        assert started == ["a", "a"]
+        assert controller.stats()["tools"]["b"]["queued"] == 1
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_freed_slots_rotate_between_tools():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1)
+        order, gate = [], asyncio.Event()
+
+        async def call(tool_name):
+            async with controller.admit(tool_name):
+                order.append(tool_name)
+                await gate.wait()
+
+        first = asyncio.create_task(call("busy"))
+        await _settle()
+        tasks = [asyncio.create_task(call("busy")) for _ in range(3)]
+        tasks += [asyncio.create_task(call("quiet")) for _ in range(2)]
+        await _settle()
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["busy", "busy", "quiet", "busy", "quiet", "busy"]
+
+
+def test_full_queue_and_long_wait_are_rejected():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, max_wait=0.05)
+        started, release = [], asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "t", started, release))
+        await _settle()
+        waiter = asyncio.create_task(_hold(controller, "t", started, release))
+        await _settle()
+
+        with pytest.raises(Overloaded) as full:
+            async with controller.admit("t"):
+                pass
+        assert full.value.reason == "queue_full"
+        with pytest.raises(Overloaded) as timed_out:
+            await waiter
+        assert timed_out.value.reason == "wait_timeout"
+
+        release.set()
+        await holder
+        stats = controller.stats()["rejected"]
+        assert (stats["queue_full"], stats["wait_timeout"]) == (1, 1)
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_no_slot_behind():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1)
+        started, release = [], asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, "t", started, release))
+        await _settle()
+        waiter = asyncio.create_task(_hold(controller, "t", started, release))
+        await _settle()
+        waiter.cancel()
+        await _settle()
+
+        release.set()
+        await holder
+        assert controller.in_flight == 0
+        assert controller.stats()["tools"]["t"]["queued"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+import json
+import sys
+from pathlib import Path
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "chromadb" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+import chroma
+
+
+def _stub_searches(monkeypatch):
+    monkeypatch.setattr(chroma, "_get_vector_store", lambda: object())
+    monkeypatch.setattr(chroma, "_vector_search", lambda store, query, k: [{"id": "vector"}])
+    monkeypatch.setattr(chroma, "_lexical_search", lambda store, query, k: [{"id": "lexical"}])
+
+
+def _ids(result):
+    return [doc["id"] for doc in json.loads(result)]
+
+
+def test_keyword_query_uses_vector_search_by_default(monkeypatch):
+    _stub_searches(monkeypatch)
+    assert _ids(chroma.retrieve_documents("pip")) == ["vector"]
+
+
+def test_auto_mode_sends_keyword_queries_to_lexical_search(monkeypatch):
+    _stub_searches(monkeypatch)
+    assert _ids(chroma.retrieve_documents("pip", mode="auto")) == ["lexical"]
+    assert _ids(chroma.retrieve_documents("how do I pin versions?", mode="auto")) == ["vector"]
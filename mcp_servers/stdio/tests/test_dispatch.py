@@ -0,0 +1,74 @@
+from server_session import call_json, run_session, write_server
+
+from dynamic_stdio_server import create_stdio_server
+from result_cache import ToolResultCache
+
+TOOLS = '''
+CALLS = []
+TOOL_OPTIONS = {
+    "lookup": {"cache": True},
+    "ingest": {"invalidates": ["lookup"]},
+}
+
+
+def lookup(name: str) -> dict:
+    """Look a name up."""
+    CALLS.append(name)
+    if name == "bad":
+        return {"status": "error", "error_message": "no such name"}
+    return {"status": "success", "name": name, "calls": len(CALLS)}
+
+
+def ingest() -> dict:
+    """Change what lookup returns."""
+    return {"status": "success"}
+'''
+
+
+def _server(tmp_path):
+    cache = ToolResultCache()
+    app, _ = create_stdio_server(
+        write_server(tmp_path, {"demo.py": TOOLS}), result_cache=cache, warmup=False
+    )
+    return app, cache
+
+
+def test_successful_results_are_cached(tmp_path):
+    app, cache = _server(tmp_path)
+
+    async def scenario(session):
+        first = await call_json(session, "lookup", {"name": "a"})
+        second = await call_json(session, "lookup", {"name": "a"})
+        return first, second
+
+    first, second = run_session(app, scenario)
+    assert first == second
+    assert cache.stats()["hits"] == 1
+
+
+def test_error_payloads_are_not_cached(tmp_path):
+    app, cache = _server(tmp_path)
+
+    async def scenario(session):
+        missing = [await call_json(session, "lookup") for _ in range(2)]
+        failed = [await call_json(session, "lookup", {"name": "bad"}) for _ in range(2)]
+        return missing, failed
+
+    missing, failed = run_session(app, scenario)
+    assert all("error" in result for result in missing)
+    assert all(result["status"] == "error" for result in failed)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["hits"] == 0
+
+
+def test_invalidating_tool_drops_cached_results(tmp_path):
+    app, cache = _server(tmp_path)
+
+    async def scenario(session):
+        before = await call_json(session, "lookup", {"name": "a"})
+        await call_json(session, "ingest")
+        after = await call_json(session, "lookup", {"name": "a"})
+        return before, after
+
+    before, after = run_session(app, scenario)
+    assert after["calls"] == before["calls"] + 1
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "chromadb" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+import _chroma_store
+from _embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class _Embeddings:
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def _fresh_store(monkeypatch, tmp_path):
+    embeddings = _Embeddings()
+    monkeypatch.setattr(_chroma_store, "OllamaEmbeddings", lambda model: embeddings)
+    monkeypatch.setattr(_chroma_store, "Chroma", lambda **kwargs: object())
+    monkeypatch.setattr(_chroma_store, "EMBEDDING_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    for name in ("_embeddings", "_query_embeddings", "_vector_store", "_query_batcher"):
+        monkeypatch.setattr(_chroma_store, name, None)
+    return embeddings
+
+
+def test_embed_query_counts_each_lookup_once(monkeypatch, tmp_path):
+    embeddings = _fresh_store(monkeypatch, tmp_path)
+
+    first = _chroma_store.embed_query("what is pip?")
+    second = _chroma_store.embed_query("what  is pip?")
+
+    cache = _chroma_store.get_query_embeddings().cache
+    assert first == second
+    assert embeddings.texts == ["what is pip?"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cached_embeddings_embed_only_missing_texts(tmp_path):
+    embeddings = _Embeddings()
+    cached = CachedEmbeddings(embeddings, EmbeddingCache(tmp_path / "cache.sqlite3"), "model")
+
+    cached.embed_documents(["a", "bb"])
+    vectors = cached.embed_documents(["bb", "ccc", "ccc"])
+
+    assert embeddings.texts == ["a", "bb", "ccc"]
+    assert vectors == [[2.0, 1.0], [3.0, 1.0], [3.0, 1.0]]
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_entries=10)
+    cache.put_many("model", [f"text {i}" for i in range(5)], [[float(i)] for i in range(5)])
+    cache.get_many("model", ["text 0"])
+    cache.put_many("model", [f"text {i}" for i in range(5, 12)], [[float(i)] for i in range(5, 12)])
+
+    assert cache.evictions > 0
+    assert cache.get_many("model", ["text 0"])[0] == [0.0]
@@ -0,0 +1,83 @@
+import sys
+import time
+from pathlib import Path
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "chromadb" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+import _chroma_store
+import ingest
+
+
+class _Collection:
+    def __init__(self):
+        self.ids = []
+
+    def get(self, ids, include):
+        return {"ids": [chunk_id for chunk_id in ids if chunk_id in self.ids]}
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.ids.extend(ids)
+
+
+class _Store:
+    def __init__(self):
+        self._collection = _Collection()
+
+
+class _Embeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+
+def _stub_store(monkeypatch):
+    store = _Store()
+    monkeypatch.setattr(_chroma_store, "get_vector_store", lambda: store)
+    monkeypatch.setattr(_chroma_store, "get_embeddings", lambda: _Embeddings())
+    monkeypatch.setattr(_chroma_store, "notify_collection_changed", lambda appended=False: None)
+    return store._collection
+
+
+def test_chunks_overlap_and_cover_the_text():
+    text = " ".join(f"word{i}" for i in range(500))
+    blocks = [text[i : i + 97] for i in range(0, len(text), 97)]
+    chunks = list(ingest._chunk_stream(blocks, 200, 20))
+
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.startswith(previous[-20:])
+    assert chunks[-1].endswith("word499")
+
+
+def test_single_large_block_chunks_in_linear_time():
+    text = "x" * 16_000_000
+    started = time.perf_counter()
+    chunks = list(ingest._chunk_stream([text], 1000, 100))
+
+    assert time.perf_counter() - started < 1
+    assert len(chunks) == 17778
+
+
+def test_binary_files_are_not_counted_as_ingested(monkeypatch, tmp_path):
+    collection = _stub_store(monkeypatch)
+    (tmp_path / "a.txt").write_text("alpha beta gamma")
+    (tmp_path / "b.bin").write_bytes(b"\0\1\2")
+
+    result = ingest.ingest_documents(str(tmp_path))
+
+    assert result["status"] == "success"
+    assert (result["files"], result["skipped_binary_files"]) == (1, 1)
+    assert len(collection.ids) == 1
+
+
+def test_repeated_chunks_are_embedded_once(monkeypatch, tmp_path):
+    collection = _stub_store(monkeypatch)
+    for i in range(5):
+        (tmp_path / f"{i}.txt").write_text("same text")
+
+    result = ingest.ingest_documents(str(tmp_path), batch_size=2)
+
+    assert result["chunks_embedded"] == 1
+    assert result["chunks_skipped_duplicate"] + result["chunks_skipped_existing"] == 4
+    assert len(collection.ids) == 1
@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+
+import chromadb
+import pytest
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "chromadb" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+from _lexical_index import LexicalIndex, tokenize
+
+
+class Writes:
+    """Stands in for collection_stamp: bumped by each write."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self):
+        return str(self.count)
+
+
+@pytest.fixture
+def collection(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    return client.create_collection("lexical", embedding_function=None)
+
+
+def _upsert(collection, writes, docs):
+    collection.upsert(
+        ids=list(docs), documents=list(docs.values()), embeddings=[[0.0, 1.0]] * len(docs)
+    )
+    writes.count += 1
+
+
+def _ids(index, query):
+    return [doc_id for doc_id, _ in index.search(query, 10)]
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("pip install langchain-chroma") == [
+        "pip", "install", "langchain-chroma", "langchain", "chroma"
+    ]
+
+
+def test_refresh_indexes_added_and_drops_removed(tmp_path, collection):
+    writes = Writes()
+    index = LexicalIndex(tmp_path / "bm25.sqlite3", stamp=writes)
+    _upsert(collection, writes, {"a": "numpy arrays", "b": "pandas frames"})
+    index.refresh(collection)
+    assert _ids(index, "numpy") == ["a"]
+
+    collection.delete(ids=["a"])
+    writes.count += 1
+    index.mark_stale()
+    index.refresh(collection)
+    assert _ids(index, "numpy") == []
+    assert index.stats()["documents"] == 1
+
+
+def test_in_place_upsert_replaces_postings(tmp_path, collection):
+    writes = Writes()
+    index = LexicalIndex(tmp_path / "bm25.sqlite3", refresh_interval=0, stamp=writes)
+    _upsert(collection, writes, {"a": "numpy arrays", "b": "pandas frames"})
+    index.refresh(collection)
+
+    _upsert(collection, writes, {"a": "polars lazy frames"})
+    assert index.refresh(collection)
+
+    assert _ids(index, "numpy") == []
+    assert _ids(index, "polars") == ["a"]
+    assert sorted(_ids(index, "frames")) == ["a", "b"]
+    assert index.stats()["documents_updated"] == 1
+    assert index.stats()["average_length"] == 2.5
+
+
+def test_reported_append_skips_the_full_check(tmp_path, collection):
+    writes = Writes()
+    index = LexicalIndex(tmp_path / "bm25.sqlite3", stamp=writes)
+    _upsert(collection, writes, {"a": "numpy arrays"})
+    index.refresh(collection)
+
+    _upsert(collection, writes, {"b": "pandas frames"})
+    index.mark_stale(appended=True)
+    index.refresh(collection)
+
+    assert _ids(index, "pandas") == ["b"]
+    assert index.stats()["documents_updated"] == 0
+
+
+def test_index_reopens_with_its_stamp(tmp_path, collection):
+    writes = Writes()
+    path = tmp_path / "bm25.sqlite3"
+    index = LexicalIndex(path, stamp=writes)
+    _upsert(collection, writes, {"a": "numpy arrays"})
+    index.refresh(collection)
+    index.close()
+
+    # Written while no server was running.
+    _upsert(collection, writes, {"a": "scipy sparse"})
+    reopened = LexicalIndex(path, stamp=writes)
+    reopened.refresh(collection)
+    assert _ids(reopened, "scipy") == ["a"]
+    assert _ids(reopened, "numpy") == []
@@ -0,0 +1,48 @@
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "mindmap" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+from markmapper import convert_markdown_batch
+
+
+def _documents(count):
+    return [
+        {"markdown_content": f"# Doc {i}\n- a\n  - b\n- c {i}\n", "title": f"doc{i}"}
+        for i in range(count)
+    ]
+
+
+def test_batch_renders_on_threads_without_child_processes(tmp_path):
+    started = time.perf_counter()
+    result = convert_markdown_batch(_documents(8), output_dir=str(tmp_path), max_workers=4)
+
+    assert time.perf_counter() - started < 2
+    assert result["written"] == 8 and result["failed"] == 0
+    assert multiprocessing.active_children() == []
+
+
+def test_batch_leaves_identical_pages_untouched(tmp_path):
+    convert_markdown_batch(_documents(6), output_dir=str(tmp_path))
+    page = tmp_path / "doc0.html"
+    mtime = page.stat().st_mtime_ns
+
+    changed = _documents(6)
+    changed[5]["markdown_content"] += "- new\n"
+    result = convert_markdown_batch(changed, output_dir=str(tmp_path))
+
+    assert (result["written"], result["unchanged"]) == (1, 5)
+    assert page.stat().st_mtime_ns == mtime
+
+
+def test_batch_reports_bad_documents_without_failing_the_rest(tmp_path):
+    documents = _documents(4) + [{"title": "missing content"}]
+    result = convert_markdown_batch(documents, output_dir=str(tmp_path), output_format="offline")
+
+    assert result["status"] == "partial"
+    assert (result["written"], result["failed"]) == (4, 1)
+    assert result["results"][4]["status"] == "error"
@@ -0,0 +1,32 @@
+import io
+import sys
+import tracemalloc
+from pathlib import Path
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "mindmap" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+from _markmap_render import iter_lines
+
+
+def test_iter_lines_matches_universal_newlines():
+    for text in ["", "a", "a\n", "a\n\n", "\n", "a\r\nb\rc\n\rd", "\r\n\r\n", "x\r", "a\n\rb"]:
+        expected = [line.rstrip("\n") for line in io.StringIO(text, newline=None)]
+        assert list(iter_lines(text)) == expected, repr(text)
+
+
+def test_iter_lines_peak_memory_is_one_line():
+    line = "- " + "x" * 998 + "\r\n"
+    markdown = line * 10_000  # ~10 MB
+    tracemalloc.start()
+    try:
+        count = 0
+        for _ in iter_lines(markdown):
+            count += 1
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert count == 10_000
+    # A copy of the input would be at least 10 MB (40 MB as UCS-4).
+    assert peak < 64 * len(line)
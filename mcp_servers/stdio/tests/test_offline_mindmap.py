@@ -0,0 +1,55 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "mindmap" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+from _offline_mindmap import write_offline_page
+
+HOSTILE = ["</script><script>alert(1)</script>", "<!-- <script>", "a & b > c"]
+
+
+def test_node_text_cannot_leave_the_data_script(tmp_path):
+    markdown = "# Root\n" + "".join(f"- {text}\n" for text in HOSTILE)
+    page = tmp_path / "page.html"
+    write_offline_page(markdown, "Title", page, chunk_depth=0)
+
+    data = re.search(
+        r'<script type="application/json" id="mindmap-data"[^>]*>(.*?)</script>',
+        page.read_text(encoding="utf-8"),
+        re.S,
+    ).group(1)
+    assert not set("<>&") & set(data)
+    assert [node["t"] for node in json.loads(data)["c"]] == HOSTILE
+
+
+def test_chunk_files_are_escaped_too(tmp_path):
+    markdown = "# Root\n- a\n  - b\n    - " + HOSTILE[0] + "\n"
+    page = tmp_path / "page.html"
+    _, _, _, chunks = write_offline_page(markdown, "Title", page, chunk_depth=1)
+    assert chunks
+    for chunk in (tmp_path / "page_chunks").glob("*.js"):
+        assert "<" not in chunk.read_text(encoding="utf-8")
+
+
+def test_page_inlines_the_renderer_and_chunks_deep_branches(tmp_path):
+    markdown = "# Root\n## A\n- a1\n  - a2\n    - a3\n## B\n- b1\n"
+    page = tmp_path / "page.html"
+    _, _, _, chunks = write_offline_page(markdown, "Title", page, chunk_depth=2)
+
+    text = page.read_text(encoding="utf-8")
+    assert "__mindmapChunk" in text and "createElementNS" in text
+    assert "http://" not in text.replace("http://www.w3.org/2000/svg", "")
+    assert "https://" not in text
+    tree = json.loads(
+        re.search(r'id="mindmap-data"[^>]*>(.*?)</script>', text, re.S).group(1)
+    )
+    a1 = tree["c"][0]["c"][0]
+    assert (a1["t"], a1["k"], a1["n"]) == ("a1", 0, 2)
+    assert chunks == 1
+    assert (tmp_path / "page_chunks" / "0.js").read_text(encoding="utf-8").startswith(
+        "window.__mindmapChunk(0,"
+    )
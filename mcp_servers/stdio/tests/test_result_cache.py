@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from mcp import types
+
+from result_cache import ToolResultCache
+
+
+RESULT = [types.TextContent(type="text", text="result")]
+
+
+def test_coalesced_calls_share_one_execution():
+    async def scenario():
+        cache = ToolResultCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return RESULT
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute("tool", {"q": 1}, compute) for _ in range(5))
+        )
+        return cache, calls, results
+
+    cache, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == [RESULT] * 5
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_follower_survives_leader_cancellation():
+    async def scenario():
+        cache = ToolResultCache()
+        started = asyncio.Event()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            started.set()
+            await asyncio.sleep(0.05)
+            return RESULT
+
+        leader = asyncio.create_task(cache.get_or_compute("tool", {}, compute))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_compute("tool", {}, compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        result = await follower
+        return cache, calls, result, follower
+
+    cache, calls, result, follower = asyncio.run(scenario())
+    assert not follower.cancelled()
+    assert result == RESULT
+    # The follower recomputed after the leader was cancelled, and cached it.
+    assert calls == 2
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_cancelled_follower_leaves_leader_running():
+    async def scenario():
+        cache = ToolResultCache()
+        started = asyncio.Event()
+
+        async def compute():
+            started.set()
+            await asyncio.sleep(0.05)
+            return RESULT
+
+        leader = asyncio.create_task(cache.get_or_compute("tool", {}, compute))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_compute("tool", {}, compute))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(scenario()) == RESULT
+
+
+def test_failures_are_not_cached():
+    async def scenario():
+        cache = ToolResultCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("backend down")
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_compute("tool", {}, compute)
+        return cache, calls
+
+    cache, calls = asyncio.run(scenario())
+    assert calls == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_result_computed_across_an_invalidation_is_not_stored():
+    async def scenario():
+        cache = ToolResultCache()
+        started = asyncio.Event()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            text = f"read {calls}"
+            started.set()
+            await asyncio.sleep(0.02)
+            return [types.TextContent(type="text", text=text)]
+
+        stale = asyncio.create_task(cache.get_or_compute("retrieve", {}, compute))
+        await started.wait()
+        cache.invalidate("retrieve")
+        # Started after the invalidation: must not join the stale call.
+        fresh = await cache.get_or_compute("retrieve", {}, compute)
+        stale_result = await stale
+        cached = await cache.get_or_compute("retrieve", {}, compute)
+        return stale_result, fresh, cached, calls, cache
+
+    stale, fresh, cached, calls, cache = asyncio.run(scenario())
+    assert stale[0].text == "read 1"
+    assert fresh[0].text == cached[0].text == "read 2"
+    assert calls == 2
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_invalidating_another_tool_keeps_the_result():
+    async def scenario():
+        cache = ToolResultCache()
+
+        async def compute():
+            cache.invalidate("other")
+            return RESULT
+
+        await cache.get_or_compute("tool", {}, compute)
+        return cache
+
+    assert asyncio.run(scenario()).stats()["entries"] == 1
+
+
+def test_invalidate_all_drops_in_flight_results():
+    async def scenario():
+        cache = ToolResultCache()
+
+        async def compute():
+            cache.invalidate()
+            return RESULT
+
+        await cache.get_or_compute("tool", {}, compute)
+        return cache
+
+    assert asyncio.run(scenario()).stats()["entries"] == 0
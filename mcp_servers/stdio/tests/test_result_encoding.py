@@ -0,0 +1,48 @@
+import base64
+import json
+
+import pytest
+
+from result_encoding import dumps_compact, get_result_encoder, make_result_encoder
+
+PAYLOAD = {"status": "success", "documents": [{"id": 1, "text": 'a "quoted" word'}]}
+
+
+def test_strings_pass_through_unencoded():
+    already_json = json.dumps(PAYLOAD, indent=2)
+    [content] = make_result_encoder()("retrieve", already_json)
+    assert content.text is already_json
+
+
+def test_values_are_encoded_once_and_compactly():
+    [content] = make_result_encoder()("tool", PAYLOAD)
+    assert json.loads(content.text) == PAYLOAD
+    assert ": " not in content.text and "\n" not in content.text
+
+
+def test_bytes_become_text_or_a_blob():
+    encode = make_result_encoder()
+    [text] = encode("tool", "héllo".encode("utf-8"))
+    [blob] = encode("tool", b"\xff\x00\x01")
+
+    assert text.text == "héllo"
+    assert blob.resource.mimeType == "application/octet-stream"
+    assert base64.b64decode(blob.resource.blob) == b"\xff\x00\x01"
+
+
+def test_structured_results_are_json_resources():
+    [content] = get_result_encoder("structured")("tool", PAYLOAD)
+    assert content.resource.mimeType == "application/json"
+    assert str(content.resource.uri) == "tool://tool/result"
+    assert json.loads(content.resource.text) == PAYLOAD
+
+
+def test_values_orjson_rejects_fall_back_to_the_stdlib():
+    assert json.loads(dumps_compact({"big": 2**70})) == {"big": 2**70}
+
+
+def test_pretty_and_unknown_formats():
+    [content] = get_result_encoder("pretty")("tool", {"a": 1})
+    assert content.text == '{\n  "a": 1\n}'
+    with pytest.raises(ValueError):
+        get_result_encoder("yaml")
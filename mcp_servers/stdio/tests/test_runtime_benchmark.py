@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "benchmarks" / "runtime_benchmark.py"
+SMALL_RUN = [
+    "--concurrency", "1", "4",
+    "--requests", "20",
+    "--sleep-requests", "8",
+    "--warmup", "2",
+    "--cpu-iterations", "100",
+    "--sleep-ms", "1",
+    "--payload-kb", "4",
+]
+
+
+def _run(*args):
+    return subprocess.run(
+        [sys.executable, str(BENCHMARK), *SMALL_RUN, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+
+
+def test_benchmark_writes_comparable_json(tmp_path):
+    output = tmp_path / "runtime.json"
+    _run("--output", str(output))
+    report = json.loads(output.read_text())
+
+    rows = {(row["scenario"], row["concurrency"]): row for row in report["results"]}
+    scenarios = {"list_tools", "trivial", "cpu_bound", "io_sleep", "large_payload"}
+    assert set(rows) == {(name, level) for name in scenarios for level in (1, 4)}
+    assert all(row["errors"] == 0 for row in rows.values())
+    assert rows["trivial", 4]["requests"] == 20 and rows["io_sleep", 4]["requests"] == 8
+    assert report["settings"]["concurrency"] == [1, 4]
+
+    compared = _run("--scenarios", "trivial", "--baseline", str(output)).stdout
+    assert "vs " in compared and compared.count("x ") >= 2
@@ -0,0 +1,136 @@
+import os
+import sys
+
+import pytest
+
+from dynamic_stdio_server import ToolSchemaRegistry, create_stdio_server
+from server_session import run_session, write_server
+from tool_manifest import ToolManifest
+
+HELPER = '''
+def greeting():
+    return "{word}"
+'''
+
+TOOLS = '''
+import _greeting_helper
+
+
+def greet(name: str) -> str:
+    """Greet someone."""
+    return f"{{_greeting_helper.greeting()}} {{name}}"
+'''
+
+
+@pytest.fixture(autouse=True)
+def _fresh_helper():
+    # Each test has its own tool_modules directory, as each server process does.
+    sys.modules.pop("_greeting_helper", None)
+    yield
+    sys.modules.pop("_greeting_helper", None)
+
+
+def _touch_later(path, source):
+    # A new size, and an mtime that differs even on coarse-grained filesystems.
+    stat = path.stat()
+    path.write_text(source)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _greet(registry, name="Ada"):
+    return registry.get_tool("greet").func(name)
+
+
+def _registry(tmp_path, **kwargs):
+    modules = {"_greeting_helper.py": HELPER.format(word="Hello"), "greeter.py": TOOLS.format()}
+    server_dir = write_server(tmp_path, modules)
+    registry = ToolSchemaRegistry(server_dir / "tool_modules", **kwargs)
+    registry.refresh()
+    return server_dir, registry
+
+
+def test_list_tools_is_served_from_cache_until_invalidated(tmp_path):
+    _, registry = _registry(tmp_path)
+    assert [tool.name for tool in registry.list_tools()] == ["greet"]
+    registry.list_tools()
+    assert registry.stats()["hits"] == 1
+    assert not registry.refresh()
+    registry.list_tools()
+    assert registry.stats()["misses"] == 1
+
+
+def test_editing_a_tool_module_rebuilds_only_it(tmp_path):
+    server_dir, registry = _registry(tmp_path)
+    rebuilds = registry.stats()["module_rebuilds"]
+    extended = TOOLS.format() + "\n\ndef wave() -> str:\n    return 'o/'\n"
+    _touch_later(server_dir / "tool_modules" / "greeter.py", extended)
+
+    assert registry.refresh()
+    assert registry.stats()["module_rebuilds"] == rebuilds + 1
+    assert {tool.name for tool in registry.list_tools()} == {"greet", "wave"}
+
+
+def test_removing_a_module_drops_its_tools(tmp_path):
+    server_dir, registry = _registry(tmp_path)
+    (server_dir / "tool_modules" / "greeter.py").unlink()
+
+    assert registry.refresh()
+    assert registry.list_tools() == []
+    assert registry.get_tool("greet") is None
+    assert registry.stats()["modules"] == 0
+
+
+def test_session_lists_cached_schemas_and_picks_up_new_modules(tmp_path):
+    server_dir, registry = _registry(tmp_path)
+    app, _ = create_stdio_server(server_dir, registry=registry, warmup=False)
+
+    async def scenario(session):
+        first = await session.list_tools()
+        second = await session.list_tools()
+        (server_dir / "tool_modules" / "waver.py").write_text(
+            "def wave() -> str:\n    \"\"\"Wave.\"\"\"\n    return 'o/'\n"
+        )
+        third = await session.list_tools()
+        return first, second, third
+
+    first, second, third = run_session(app, scenario)
+    assert first.tools == second.tools
+    assert [tool.name for tool in third.tools] == ["greet", "wave"]
+    assert registry.stats()["hits"] == 1
+    assert registry.stats()["misses"] == 2
+
+
+def test_editing_a_helper_reloads_it(tmp_path):
+    server_dir, registry = _registry(tmp_path)
+    assert _greet(registry) == "Hello Ada"
+
+    _touch_later(server_dir / "tool_modules" / "_greeting_helper.py", HELPER.format(word="Howdy"))
+    assert registry.refresh()
+
+    assert _greet(registry) == "Howdy Ada"
+    assert sys.modules["_greeting_helper"].greeting() == "Howdy"
+
+
+def test_lazy_registry_serves_schemas_from_the_manifest(tmp_path):
+    manifest = ToolManifest(tmp_path / "manifest.json")
+    server_dir, registry = _registry(tmp_path, manifest=manifest, lazy=True)
+    assert registry.stats()["module_rebuilds"] == 1
+
+    lazy = ToolSchemaRegistry(
+        server_dir / "tool_modules", manifest=ToolManifest(tmp_path / "manifest.json"), lazy=True
+    )
+    lazy.refresh()
+    assert lazy.stats()["module_rebuilds"] == 0
+    assert [tool.name for tool in lazy.list_tools()] == ["greet"]
+    assert lazy.tools == {}
+
+    assert _greet(lazy) == "Hello Ada"
+    assert lazy.stats()["lazy_imports"] == 1
+
+
+def test_manifest_entry_is_stale_after_a_helper_edit(tmp_path):
+    server_dir, _ = _registry(tmp_path, manifest=ToolManifest(tmp_path / "manifest.json"))
+    _touch_later(server_dir / "tool_modules" / "_greeting_helper.py", HELPER.format(word="Howdy"))
+
+    manifest = ToolManifest(tmp_path / "manifest.json")
+    assert manifest.lookup(server_dir / "tool_modules" / "greeter.py") is None
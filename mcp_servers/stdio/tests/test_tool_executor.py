@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+
+from google.adk.tools.function_tool import FunctionTool
+
+from tool_executor import ToolExecutor
+
+
+def _blocking(seconds: float) -> str:
+    """Sleep on the calling thread."""
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+async def _awaiting(seconds: float) -> str:
+    """Sleep on the event loop."""
+    await asyncio.sleep(seconds)
+    return threading.current_thread().name
+
+
+def test_sync_tools_run_on_worker_threads_without_blocking_the_loop():
+    async def scenario():
+        executor = ToolExecutor(max_workers=4)
+        tool = FunctionTool(_blocking)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        names = await asyncio.gather(*(executor.run(tool, {"seconds": 0.2}) for _ in range(4)))
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        executor.shutdown()
+        return names, elapsed, ticks
+
+    names, elapsed, ticks = asyncio.run(scenario())
+    assert all(name.startswith("mcp-tool") for name in names)
+    assert elapsed < 0.6
+    assert ticks >= 10
+
+
+def test_async_tools_are_awaited_on_the_loop():
+    async def scenario():
+        executor = ToolExecutor(max_workers=1)
+        name = await executor.run(FunctionTool(_awaiting), {"seconds": 0})
+        executor.shutdown()
+        return name
+
+    assert asyncio.run(scenario()) == threading.main_thread().name
+
+
+def test_missing_arguments_come_back_as_adk_errors_and_counts_settle():
+    async def scenario():
+        executor = ToolExecutor(max_workers=1)
+        response = await executor.run(FunctionTool(_blocking), {})
+        stats = executor.stats()
+        executor.shutdown()
+        return response, stats
+
+    response, stats = asyncio.run(scenario())
+    assert "error" in response
+    assert stats["tools"]["_blocking"]["running"] == 0
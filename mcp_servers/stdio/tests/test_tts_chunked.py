@@ -0,0 +1,71 @@
+import sys
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "mac_tts" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+from _tts_chunked import FIRST_CHUNK_CHARS, SpeechJobRunner, split_sentences
+from _tts_synthesis import AudioCache
+
+TEXT = " ".join(f"Sentence number {i} is here." for i in range(60))
+
+
+def _frames(path):
+    with wave.open(str(path), "rb") as f:
+        return f.getnframes()
+
+
+def _finished(job):
+    with job._condition:
+        assert job._condition.wait_for(lambda: job.state != "running", 10)
+    return job
+
+
+def _runner(cache):
+    return SpeechJobRunner(lambda: ThreadPoolExecutor(max_workers=3), cache)
+
+
+def test_split_sentences_keeps_first_chunk_short_and_loses_no_text():
+    chunks = split_sentences(TEXT, chunk_chars=200)
+    assert len(chunks[0]) <= FIRST_CHUNK_CHARS
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert " ".join(chunks).split() == TEXT.split()
+
+
+def test_job_joins_chunks_in_order(tmp_path):
+    runner = _runner(AudioCache(tmp_path / "cache"))
+    output = tmp_path / "out.wav"
+    job = runner.start("fake", None, TEXT, str(output), 200)
+    _finished(job)
+    runner.shutdown()
+
+    assert job.state == "done", job.error
+    assert _frames(output) == sum(_frames(path) for path in job.chunk_paths)
+
+
+def test_second_job_uses_cached_chunks(tmp_path):
+    cache = AudioCache(tmp_path / "cache")
+    runner = _runner(cache)
+    first = runner.start("fake", None, TEXT, None, 200)
+    _finished(first)
+    second = runner.start("fake", None, TEXT, None, 200)
+    _finished(second)
+    runner.shutdown()
+
+    assert second.cached_chunks == len(second.chunks)
+
+
+def test_chunk_paths_survive_cache_eviction(tmp_path):
+    # A budget smaller than one clip evicts every chunk as soon as it lands.
+    cache = AudioCache(tmp_path / "cache", max_bytes=1)
+    runner = _runner(cache)
+    job = runner.start("fake", None, TEXT, None, 200)
+    _finished(job)
+    runner.shutdown()
+
+    assert job.state == "done", job.error
+    assert cache.evictions > 0
+    assert all(Path(path).exists() for path in job.chunk_paths)
@@ -0,0 +1,80 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "mac_tts" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+import tts
+from _tts_backends import CommandBackend, TTSError, _expand, get_backend
+from _tts_synthesis import AudioCache, QueueFull, SynthesisQueue, audio_key
+
+
+def test_audio_key_covers_backend_voice_format_and_normalized_text():
+    key = audio_key("say", "Alex", "aiff", "Café ")
+    assert key == audio_key("say", "Alex", "aiff", "Café")
+    assert len({key, audio_key("espeak", "Alex", "aiff", "Café"),
+                audio_key("say", None, "aiff", "Café"), audio_key("say", "Alex", "wav", "Café")}) == 4
+
+
+def test_cache_evicts_least_recently_used_clips(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=250)
+    for name in ("a", "b"):
+        cache.put(name, "wav", lambda path: path.write_bytes(b"x" * 100))
+    os.utime(tmp_path / "a.wav", (1, 1))
+    os.utime(tmp_path / "b.wav", (2, 2))
+    assert cache.get("a", "wav") is not None  # Now the most recently used.
+
+    cache.put("c", "wav", lambda path: path.write_bytes(b"x" * 100))
+
+    assert cache.get("b", "wav") is None
+    assert cache.get("a", "wav") is not None and cache.get("c", "wav") is not None
+    assert cache.stats()["bytes"] == 200
+
+
+def test_cache_discards_partial_files_left_by_a_crash(tmp_path):
+    (tmp_path / ".tmp-dead.wav").write_bytes(b"partial")
+    AudioCache(tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_queue_coalesces_same_key_and_rejects_overflow():
+    queue = SynthesisQueue(max_workers=1, max_pending=1)
+    gate = threading.Event()
+    first = queue.submit("a", gate.wait)
+    assert queue.submit("a", gate.wait) is first
+    queue.submit("b", gate.wait)
+    with pytest.raises(QueueFull):
+        queue.submit("c", gate.wait)
+
+    gate.set()
+    first.result(timeout=5)
+    queue.submit("c", lambda: None).result(timeout=5)
+    assert queue.stats()["coalesced"] == 1 and queue.stats()["rejected"] == 1
+
+
+def test_command_backend_drops_unset_voice_and_passes_text_on_stdin(tmp_path):
+    template = ["sh", "-c", "cat > \"$0\"", "{output}", ("-v", "{voice}")]
+    assert _expand(template, voice=None, output="o.wav") == ["sh", "-c", "cat > \"$0\"", "o.wav"]
+
+    backend = CommandBackend("cat", template)
+    backend.synthesize("hello", None, tmp_path / "out.wav")
+    assert (tmp_path / "out.wav").read_text() == "hello"
+
+    with pytest.raises(TTSError):
+        CommandBackend("missing", ["no-such-tts-binary", "{output}"]).synthesize("x", None, "o")
+    with pytest.raises(TTSError):
+        get_backend("nope")
+
+
+def test_repeated_prompt_is_served_from_the_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(tts, "_cache", AudioCache(tmp_path / "cache"))
+    first = tts.text_to_speech_mac("Hello there", output_file_path=str(tmp_path / "1.wav"), backend="fake")
+    second = tts.text_to_speech_mac("Hello there", output_file_path=str(tmp_path / "2.wav"), backend="fake")
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert (tmp_path / "1.wav").read_bytes() == (tmp_path / "2.wav").read_bytes()
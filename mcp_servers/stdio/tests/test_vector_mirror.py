@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+import chromadb
+import numpy as np
+import pytest
+
+TOOL_MODULES = Path(__file__).resolve().parent.parent / "chromadb" / "tool_modules"
+if str(TOOL_MODULES) not in sys.path:
+    sys.path.insert(0, str(TOOL_MODULES))
+
+from _vector_mirror import VectorMirror
+
+
+class Writes:
+    """Stands in for collection_stamp: bumped by each write."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self):
+        return str(self.count)
+
+
+@pytest.fixture
+def collection(tmp_path):
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    return client.create_collection("mirror", embedding_function=None)
+
+
+def _upsert(collection, writes, vectors):
+    collection.upsert(ids=list(vectors), embeddings=[v.tolist() for v in vectors.values()])
+    writes.count += 1
+
+
+def _random_vectors(count, dimensions=16, seed=0, prefix="d"):
+    rng = np.random.default_rng(seed)
+    return {f"{prefix}{i}": rng.normal(size=dimensions).astype(np.float32) for i in range(count)}
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_search_matches_brute_force_cosine(tmp_path, collection, dtype):
+    writes = Writes()
+    vectors = _random_vectors(300)
+    _upsert(collection, writes, vectors)
+    mirror = VectorMirror(tmp_path / "mirror", dtype=dtype, stamp=writes)
+    mirror.refresh(collection)
+
+    query = np.random.default_rng(1).normal(size=16)
+    ids = list(vectors)
+    matrix = np.stack(list(vectors.values()))
+    scores = matrix @ query / np.linalg.norm(matrix, axis=1) / np.linalg.norm(query)
+    expected = [ids[row] for row in np.argsort(-scores)[:5]]
+
+    [found] = mirror.search_many([query], 5)
+    assert [doc_id for doc_id, _ in found] == expected
+    assert found[0][1] == pytest.approx(scores.max(), abs=1e-2)
+
+
+def test_appends_new_rows_and_compacts_after_deletes(tmp_path, collection):
+    writes = Writes()
+    mirror = VectorMirror(tmp_path / "mirror", stamp=writes)
+    _upsert(collection, writes, _random_vectors(10))
+    mirror.refresh(collection)
+    compactions = mirror.stats()["compactions"]
+
+    new = _random_vectors(5, seed=2, prefix="n")
+    _upsert(collection, writes, new)
+    mirror.mark_stale(appended=True)
+    assert mirror.refresh(collection)
+    assert (mirror.stats()["rows_appended"], mirror.stats()["compactions"]) == (5, compactions)
+    assert mirror.search_many([new["n3"]], 1)[0][0][0] == "n3"
+
+    collection.delete(ids=["n3"])
+    writes.count += 1
+    mirror.mark_stale()
+    mirror.refresh(collection)
+    assert mirror.stats()["rows"] == 14
+    assert mirror.stats()["compactions"] == compactions + 1
+    assert mirror.search_many([new["n3"]], 1)[0][0][0] != "n3"
+
+
+def test_in_place_upsert_replaces_the_vector(tmp_path, collection):
+    writes = Writes()
+    vectors = _random_vectors(10)
+    _upsert(collection, writes, vectors)
+    mirror = VectorMirror(tmp_path / "mirror", stamp=writes)
+    mirror.refresh(collection)
+
+    target = vectors["d4"]
+    _upsert(collection, writes, {"d7": target})
+    mirror.mark_stale()
+    mirror.refresh(collection)
+
+    top = {doc_id for doc_id, _ in mirror.search_many([target], 2)[0]}
+    assert top == {"d4", "d7"}
+
+
+def test_mirror_reloads_from_disk_without_exporting(tmp_path, collection):
+    writes = Writes()
+    vectors = _random_vectors(20)
+    _upsert(collection, writes, vectors)
+    VectorMirror(tmp_path / "mirror", stamp=writes).refresh(collection)
+
+    reopened = VectorMirror(tmp_path / "mirror", stamp=writes)
+    assert not reopened.refresh(collection)
+    assert reopened.search_many([vectors["d9"]], 1)[0][0][0] == "d9"
+    assert reopened.stats()["compactions"] == 0
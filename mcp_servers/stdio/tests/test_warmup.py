@@ -0,0 +1,48 @@
+import time
+
+from server_session import call_json, run_session, write_server
+
+from dynamic_stdio_server import create_stdio_server
+
+TOOLS = '''
+import time
+
+WARMUPS = []
+
+
+def _warmup():
+    time.sleep(0.3)
+    WARMUPS.append(time.monotonic())
+
+
+def status() -> dict:
+    """Report whether the warm-up has run."""
+    return {"warmups": len(WARMUPS)}
+'''
+
+
+def test_call_during_warmup_waits_for_it_instead_of_repeating_it(tmp_path):
+    app, _ = create_stdio_server(write_server(tmp_path, {"warm.py": TOOLS}))
+
+    async def scenario(session):
+        started = time.perf_counter()
+        first = await call_json(session, "status")
+        waited = time.perf_counter() - started
+        second = await call_json(session, "status")
+        return first, second, waited
+
+    first, second, waited = run_session(app, scenario)
+    assert first == second == {"warmups": 1}
+    assert waited >= 0.2
+
+
+def test_lazy_module_is_imported_by_its_warmup(tmp_path):
+    server_dir = write_server(tmp_path, {"warm.py": TOOLS})
+    create_stdio_server(server_dir, lazy_tools=True, warmup=False)
+    app, adk_tools = create_stdio_server(server_dir, lazy_tools=True)
+    assert adk_tools == {}
+
+    async def scenario(session):
+        return await call_json(session, "status")
+
+    assert run_session(app, scenario) == {"warmups": 1}
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from google.adk.tools.function_tool import FunctionTool
+
+
+def _is_async_tool(adk_tool: FunctionTool) -> bool:
+    func = adk_tool.func
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(
+        getattr(func, "__call__", None)
+    )
+
+
+def _run_sync_tool(adk_tool: FunctionTool, arguments: dict[str, Any]) -> Any:
+    # FunctionTool.run_async only awaits when the wrapped function is a
+    # coroutine function, so for sync tools the coroutine finishes on its first
+    # step. Driving it here keeps ADK's argument checks while the function body
+    # runs on a worker thread.
+    coroutine = adk_tool.run_async(args=arguments, tool_context=None)
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError(f"Tool {adk_tool.name} tried to await on a worker thread")
+
+
+class ToolExecutor:
+    """Runs tool calls without blocking the event loop.
+
+    Synchronous tools run on a bounded thread pool; coroutine tools are awaited
+    directly. Per-tool ``max_concurrency`` caps are enforced before a call
+    gets here, by the dispatcher's AdmissionController, so calls beyond a cap
+    wait in its queue instead of occupying a worker thread.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mcp-tool"
+        )
+        self.max_workers = self._pool._max_workers
+        self._running: dict[str, int] = {}
+
+    async def run(self, adk_tool: FunctionTool, arguments: dict[str, Any]) -> Any:
+        tool_name = adk_tool.name
+        self._running[tool_name] = self._running.get(tool_name, 0) + 1
+        try:
+            if _is_async_tool(adk_tool):
+                return await adk_tool.run_async(args=arguments, tool_context=None)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool, _run_sync_tool, adk_tool, arguments
+            )
+        finally:
+            self._running[tool_name] -= 1
+
+    async def run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a plain callable on the tool thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, func, *args)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "tools": {
+                tool_name: {"running": running}
+                for tool_name, running in sorted(self._running.items())
+            },
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+
+MANIFEST_FILENAME = ".tool_manifest.json"
+MANIFEST_VERSION = 2
+
+
+def _source_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _signature(path: Path) -> dict[str, Any]:
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": _source_hash(path)}
+
+
+def helper_paths(tool_modules_dir: Path) -> list[Path]:
+    """The private ``_*.py`` helpers (_chroma_store.py, ...) that tool modules import.
+
+    They are not tool modules themselves, so they have no entries of their own.
+    """
+    return sorted(path for path in tool_modules_dir.glob("_*.py") if path.name != "__init__.py")
+
+
+class ToolManifest:
+    """On-disk record of each tool module's tool names, docstrings and schemas.
+
+    Entries are keyed by module file name and validated against the source's
+    (mtime_ns, size) first; when those differ, the SHA-256 of the source
+    decides whether the entry is still usable. The private ``_*.py`` helpers
+    next to the module are checked the same way, so editing a helper a tool
+    module imports also invalidates its entry. This lets a server answer
+    ``list_tools`` without importing any tool module, and know which modules
+    define a ``_warmup`` hook.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._modules: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logging.warning("Ignoring unreadable tool manifest %s: %s", self.path, exc)
+            return
+
+        if data.get("version") != MANIFEST_VERSION:
+            logging.info("Tool manifest %s has an old format, rebuilding", self.path)
+            return
+        self._modules = data.get("modules", {})
+
+    def lookup(self, module_path: Path) -> dict[str, Any] | None:
+        """Return a module's recorded entry, or None if it is missing or stale."""
+        entry = self._modules.get(module_path.name)
+        if entry is None:
+            return None
+
+        if not self._unchanged(entry, module_path):
+            return None
+
+        helpers = entry.get("helpers", {})
+        helpers_now = helper_paths(module_path.parent)
+        if sorted(helpers) != [path.name for path in helpers_now]:
+            return None
+        if not all(self._unchanged(helpers[path.name], path) for path in helpers_now):
+            return None
+        return entry
+
+    def _unchanged(self, recorded: dict[str, Any], path: Path) -> bool:
+        stat = path.stat()
+        if recorded["mtime_ns"] == stat.st_mtime_ns and recorded["size"] == stat.st_size:
+            return True
+
+        if recorded["size"] != stat.st_size or recorded["sha256"] != _source_hash(path):
+            return False
+
+        # Touched but unchanged: refresh the cheap key so the next start skips hashing.
+        recorded["mtime_ns"] = stat.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def record(
+        self, module_path: Path, tools: list[dict[str, Any]], *, warmup: bool = False
+    ) -> None:
+        self._modules[module_path.name] = {
+            **_signature(module_path),
+            "helpers": {path.name: _signature(path) for path in helper_paths(module_path.parent)},
+            "tools": tools,
+            "warmup": warmup,
+        }
+        self._dirty = True
+
+    def forget(self, module_name: str) -> None:
+        if self._modules.pop(module_name, None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        payload = {"version": MANIFEST_VERSION, "modules": self._modules}
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as exc:
+            logging.warning("Could not write tool manifest %s: %s", self.path, exc)
@@ -0,0 +1,212 @@
+"""Pre-fork master that serves one ASGI app factory from several worker processes.
+
+The master binds the listening socket and hands it to each worker, so the
+kernel spreads connections across them. With ``reuse_port`` every worker
+binds its own SO_REUSEPORT socket instead. Workers are started with the
+"spawn" method, so each imports the server code afresh.
+
+Signals to the master:
+    SIGHUP            graceful reload: start a new set of workers, wait until
+                      they are serving, then stop the old ones, which finish
+                      their in-flight requests first
+    SIGTERM, SIGINT   graceful shutdown
+    SIGTTIN, SIGTTOU  one worker more / fewer
+
+Workers that exit unexpectedly are replaced.
+
+Unless ``MCP_METRICS_DIR`` is already set, the master points it at a fresh
+temporary directory for its workers, so ``/metrics`` sums all of them (see
+``tool_metrics.MetricsSpool``), and removes the directory on shutdown. The
+master also sets ``MCP_METRICS_GROUP`` to its pid, which keeps the counters of
+exited workers in the sum until the master itself is gone.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+READY_TIMEOUT = 30.0
+POLL_INTERVAL = 0.2
+
+
+def bind_socket(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _load_factory(path: str):
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _worker(factory_path, sock, host, port, graceful_timeout, log_level, ready):
+    # A terminal hangup is for the master; it decides when workers go.
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    if sock is None:
+        sock = bind_socket(host, port, reuse_port=True)
+    app = _load_factory(factory_path)()
+    config = uvicorn.Config(
+        app,
+        log_level=log_level,
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+    server = uvicorn.Server(config)
+
+    async def serve():
+        task = asyncio.create_task(server.serve(sockets=[sock]))
+        while not server.started and not task.done():
+            await asyncio.sleep(0.05)
+        ready.set()
+        await task
+
+    asyncio.run(serve())
+
+
+class PreforkMaster:
+    """Keeps ``workers`` processes serving ``factory_path`` ("module:function") on host:port."""
+
+    def __init__(
+        self,
+        factory_path: str,
+        host: str,
+        port: int,
+        workers: int,
+        reuse_port: bool = False,
+        graceful_timeout: float = 30.0,
+        log_level: str = "info",
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.factory_path = factory_path
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.reuse_port = reuse_port
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self._context = multiprocessing.get_context("spawn")
+        self._socket = None
+        self._processes = []
+        self._retiring = []
+        self._signals = []
+
+    def _spawn(self):
+        ready = self._context.Event()
+        process = self._context.Process(
+            target=_worker,
+            args=(
+                self.factory_path,
+                self._socket,
+                self.host,
+                self.port,
+                self.graceful_timeout,
+                self.log_level,
+                ready,
+            ),
+            name="mcp-http-worker",
+        )
+        process.start()
+        return process, ready
+
+    def _spawn_ready(self, count):
+        started = [self._spawn() for _ in range(count)]
+        deadline = time.monotonic() + READY_TIMEOUT
+        for process, ready in started:
+            if not ready.wait(max(0.0, deadline - time.monotonic())):
+                logger.warning("Worker %s did not report ready in time", process.pid)
+        return [process for process, _ in started]
+
+    def _retire(self, processes):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+            self._retiring.append((process, time.monotonic() + self.graceful_timeout + 5))
+
+    def _reap(self):
+        for process, deadline in list(self._retiring):
+            if not process.is_alive():
+                process.join()
+                self._retiring.remove((process, deadline))
+            elif time.monotonic() > deadline:
+                process.kill()
+        for process in list(self._processes):
+            if not process.is_alive():
+                process.join()
+                self._processes.remove(process)
+                logger.warning("Worker %s exited with %s; replacing it", process.pid, process.exitcode)
+                self._processes.extend(self._spawn_ready(1))
+
+    def reload(self):
+        old = self._processes
+        self._processes = self._spawn_ready(self.workers)
+        self._retire(old)
+        logger.info("Reloaded: %d new workers, %d retiring", len(self._processes), len(old))
+
+    def _on_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def run(self):
+        metrics_directory = None
+        os.environ["MCP_METRICS_GROUP"] = str(os.getpid())
+        if not os.environ.get("MCP_METRICS_DIR"):
+            # Spawned workers inherit the environment.
+            metrics_directory = tempfile.mkdtemp(prefix="mcp-metrics-")
+            os.environ["MCP_METRICS_DIR"] = metrics_directory
+        if not self.reuse_port:
+            self._socket = bind_socket(self.host, self.port)
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(signum, self._on_signal)
+        self._processes = self._spawn_ready(self.workers)
+        logger.info(
+            "Serving on %s:%d with %d workers (%s)",
+            self.host,
+            self.port,
+            self.workers,
+            "SO_REUSEPORT" if self.reuse_port else "shared socket",
+        )
+        try:
+            while True:
+                while self._signals:
+                    signum = self._signals.pop(0)
+                    if signum in (signal.SIGTERM, signal.SIGINT):
+                        return
+                    if signum == signal.SIGHUP:
+                        self.reload()
+                    elif signum == signal.SIGTTIN:
+                        self.workers += 1
+                        self._processes.extend(self._spawn_ready(1))
+                    elif signum == signal.SIGTTOU and self.workers > 1:
+                        self.workers -= 1
+                        self._retire([self._processes.pop()])
+                self._reap()
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self._retire(self._processes)
+            self._processes = []
+            while self._retiring:
+                self._reap()
+                time.sleep(POLL_INTERVAL)
+            if self._socket is not None:
+                self._socket.close()
+            os.environ.pop("MCP_METRICS_GROUP", None)
+            if metrics_directory is not None:
+                del os.environ["MCP_METRICS_DIR"]
+                shutil.rmtree(metrics_directory, ignore_errors=True)
@@ -12,38 +12,81 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
+import logging
 import os
 from pathlib import Path
 import sys
 
 from mcp.server.fastmcp import FastMCP
+import uvicorn
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "common"))
+from filesystem_tools import register_filesystem_tools  # noqa: E402
+from http_compression import compressed  # noqa: E402
 
-mcp = FastMCP("Filesystem Server", host="localhost", port=3000)
+HOST = "localhost"
+PORT = 3000
+# Worker processes for the multi-process mode; 0 runs the single-process server.
+WORKERS = int(os.environ.get("MCP_HTTP_WORKERS", "0"))
 
 
-@mcp.tool(description="Read contents of a file")
-def read_file(filepath: str) -> str:
-    """Read and return the contents of a file."""
-    with open(filepath, "r", encoding="utf-8") as f:
-        return f.read()
+def build_server(**settings) -> FastMCP:
+    server = FastMCP("Filesystem Server", host=HOST, port=PORT, **settings)
+    register_filesystem_tools(server)
+    return server
 
 
-@mcp.tool(description="List contents of a directory")
-def list_directory(dirpath: str) -> list:
-    """List all files and directories in the given directory."""
-    return os.listdir(dirpath)
+mcp = build_server()
 
 
-@mcp.tool(description="Get current working directory")
-def get_cwd() -> str:
-    """Return the current working directory."""
-    return str(Path.cwd())
+def create_stateless_app():
+    """ASGI app for one worker of the multi-process mode.
+
+    Sessions are stateless (no Mcp-Session-Id, nothing kept between
+    requests), so any worker can answer any request.
+    """
+    return compressed(build_server(stateless_http=True, json_response=True).streamable_http_app())
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Filesystem MCP server over streamable HTTP")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="run N stateless worker processes behind one socket (default: MCP_HTTP_WORKERS, else single process)",
+    )
+    parser.add_argument(
+        "--reuse-port",
+        action="store_true",
+        default=os.environ.get("MCP_HTTP_REUSE_PORT") == "1",
+        help="give each worker its own SO_REUSEPORT socket instead of sharing the master's",
+    )
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
     try:
-        mcp.run(transport="streamable-http")
+        if args.workers:
+            from prefork import PreforkMaster
+
+            logging.basicConfig(level=logging.INFO, format="%(levelname)s: [master] %(message)s")
+            PreforkMaster(
+                "server:create_stateless_app",
+                HOST,
+                args.port,
+                args.workers,
+                reuse_port=args.reuse_port,
+                log_level=mcp.settings.log_level.lower(),
+            ).run()
+        else:
+            # Same as mcp.run(transport="streamable-http"), with responses compressed per Accept-Encoding.
+            uvicorn.run(
+                compressed(mcp.streamable_http_app()),
+                host=HOST,
+                port=args.port,
+                log_level=mcp.settings.log_level.lower(),
+            )
     except KeyboardInterrupt:
         print("\nServer shutting down gracefully...")
     except Exception as e:
@@ -0,0 +1,176 @@
+"""Measure how the multi-process streamable-HTTP server scales with worker count.
+
+For each worker count, starts ``server.py --workers N`` on a free port and
+drives it with stateless ``tools/call`` requests from several client
+processes (keep-alive connections, a fixed number of threads each) for a
+fixed duration. Reports requests per second, latency percentiles and the
+speedup over one worker. The single-process (stateful) server is not part of
+the run; its sessions pin a client to one process.
+
+Load generation shares the machine with the server, so run it on a host
+with more cores than workers and clients need. The CPU count is printed.
+
+Usage:
+    python mcp_servers/streamablehttp/benchmarks/worker_scaling_benchmark.py --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+SERVER = Path(__file__).resolve().parents[1] / "agent" / "server.py"
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(workers: int, port: int, reuse_port: bool) -> subprocess.Popen:
+    command = [sys.executable, str(SERVER), "--workers", str(workers), "--port", str(port)]
+    if reuse_port:
+        command.append("--reuse-port")
+    env = dict(os.environ, FASTMCP_LOG_LEVEL="WARNING", MCP_FS_SEARCH_INDEX="0")
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.post(f"http://localhost:{port}/mcp/", headers=HEADERS, json=_payload("get_cwd", {}), timeout=2)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"server with {workers} workers did not start")
+
+
+def _payload(tool: str, arguments: dict) -> dict:
+    return {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": tool, "arguments": arguments}}
+
+
+def _client(url, payload, threads, duration, start_at, results):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def run():
+        nonlocal errors
+        local = []
+        with httpx.Client(headers=HEADERS, timeout=30) as client:
+            while time.time() < start_at:
+                time.sleep(0.001)
+            end = start_at + duration
+            while time.time() < end:
+                started = time.perf_counter()
+                try:
+                    response = client.post(url, json=payload)
+                    ok = response.status_code == 200 and "error" not in response.json()
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    local.append(time.perf_counter() - started)
+                else:
+                    with lock:
+                        errors += 1
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((latencies, errors))
+
+
+def _load(url, payload, processes, threads, duration):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    start_at = time.time() + 2.0
+    clients = [
+        context.Process(target=_client, args=(url, payload, threads, duration, start_at, results))
+        for _ in range(processes)
+    ]
+    for client in clients:
+        client.start()
+    latencies, errors = [], 0
+    for _ in clients:
+        client_latencies, client_errors = results.get()
+        latencies.extend(client_latencies)
+        errors += client_errors
+    for client in clients:
+        client.join()
+    return sorted(latencies), errors
+
+
+def _percentile(latencies, fraction):
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else float("nan")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--client-processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="connections per client process")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--file-kb", type=int, default=64, help="size of the file each read_file call returns")
+    parser.add_argument("--reuse-port", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}, clients: {args.client_processes} processes x {args.threads} connections")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "payload.txt"
+        target.write_text(("lorem ipsum dolor sit amet " * 40 + "\n") * (args.file_kb * 1024 // 1081 + 1))
+        payload = _payload("read_file", {"filepath": str(target)})
+
+        print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            port = _free_port()
+            server = _start_server(workers, port, args.reuse_port)
+            try:
+                latencies, errors = _load(
+                    f"http://localhost:{port}/mcp/", payload, args.client_processes, args.threads, args.duration
+                )
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(60)
+            rps = len(latencies) / args.duration
+            baseline = baseline or rps
+            row = {
+                "workers": workers,
+                "requests_per_second": round(rps, 1),
+                "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+                "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+                "errors": errors,
+                "speedup": round(rps / baseline, 2) if baseline else None,
+            }
+            rows.append(row)
+            print(
+                f"{workers:>7} {row['requests_per_second']:>9} {row['p50_ms']:>8} "
+                f"{row['p99_ms']:>8} {errors:>7} {row['speedup']:>7}x"
+            )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"cpus": os.cpu_count(), "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
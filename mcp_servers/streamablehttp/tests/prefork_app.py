@@ -0,0 +1,15 @@
+"""A tiny app for the prefork tests: answers with its worker's pid and metrics group."""
+
+import os
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+
+async def whoami(request):
+    return PlainTextResponse(f"{os.getpid()} {os.environ.get('MCP_METRICS_GROUP')}")
+
+
+def create_app():
+    return Starlette(routes=[Route("/", whoami)])
@@ -0,0 +1,85 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+TESTS_DIR = Path(__file__).resolve().parent
+AGENT_ROOT = TESTS_DIR.parent / "agent"
+MASTER = """
+import sys
+from prefork import PreforkMaster
+
+PreforkMaster(
+    "prefork_app:create_app", "127.0.0.1", int(sys.argv[1]), 2,
+    reuse_port=True, graceful_timeout=1, log_level="warning",
+).run()
+"""
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _whoami(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as response:
+        pid, group = response.read().decode().split()
+        return int(pid), group
+
+
+def _wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.fixture
+def master():
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(AGENT_ROOT), str(TESTS_DIR)])}
+    env.pop("MCP_METRICS_DIR", None)
+    process = subprocess.Popen([sys.executable, "-c", MASTER, str(port)], env=env)
+    try:
+        _wait_for(lambda: _whoami(port))
+        yield process, port
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def test_workers_share_the_port_and_reload_gracefully(master):
+    process, port = master
+    answers = {_whoami(port) for _ in range(40)}
+    first_pids = {pid for pid, _ in answers}
+    assert len(first_pids) == 2
+    assert {group for _, group in answers} == {str(process.pid)}
+
+    process.send_signal(signal.SIGHUP)
+    _wait_for(lambda: _whoami(port)[0] not in first_pids)
+    _wait_for(lambda: not any(_alive(pid) for pid in first_pids))
+    assert len({_whoami(port)[0] for _ in range(40)} - first_pids) == 2
+
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=30) == 0